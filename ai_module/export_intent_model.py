@@ -0,0 +1,95 @@
+"""
+의도 분류 모델 내보내기
+model.ipynb 또는 train_intent_model.py에서 저장한 intent_model.pkl / vectorizer.pkl을 컴파일된 NumPy 형식으로 변환하고,
+intent_dataset.csv 문장으로 scikit-learn 확률과 일치하는지 검증합니다.
+
+    python export_intent_model.py
+    python export_intent_model.py --model intent_model.pkl --vectorizer vectorizer.pkl --out intent_model_compiled
+"""
+
+import argparse
+import csv
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+from intent_predictor import DEFAULT_COMPILED_DIR, CompiledIntentModel, _idf_weights, export_compiled_model
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_texts(csv_path: str):
+    """검증용 문장 목록"""
+    with open(csv_path, encoding="utf-8-sig") as f:
+        return [row["text"] for row in csv.DictReader(f)]
+
+
+def verify(vectorizer, classifier, compiled: CompiledIntentModel, texts) -> float:
+    """scikit-learn과 컴파일된 모델의 확률 최대 오차"""
+    transformer = vectorizer._tfidf
+    if vectorizer.use_idf and "idf_" not in transformer.__dict__:
+        # scikit-learn 1.2 이하에서 저장된 벡터라이저는 최신 버전에서 IDF 없이 변환되므로 복원
+        transformer.idf_ = _idf_weights(vectorizer)
+    expected = classifier.predict_proba(vectorizer.transform(texts))
+    actual = compiled.predict_proba(texts)
+    return float(np.max(np.abs(expected - actual))) if len(texts) else 0.0
+
+
+def replace_dir(staged: str, target: str):
+    """검증이 끝난 디렉토리로 교체 (기존 디렉토리는 이름을 바꾼 뒤 삭제)
+
+    디렉토리는 한 번의 rename으로 덮어쓸 수 없어 두 rename 사이에 잠깐 경로가 없을 수 있으며,
+    이때 로드하는 서버는 pickle 모델로 대체합니다. 기존 파일을 덮어쓰지 않으므로 mmap으로
+    열어 둔 실행 중인 서버의 배열은 그대로 유효합니다.
+    """
+    backup = None
+    if os.path.exists(target):
+        backup = f"{target}.old-{os.getpid()}"
+        os.rename(target, backup)
+    os.rename(staged, target)
+    if backup:
+        shutil.rmtree(backup, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="의도 분류 모델을 pickle 없는 형식으로 내보내기")
+    parser.add_argument("--model", default=os.path.join(BASE_DIR, "intent_model.pkl"))
+    parser.add_argument("--vectorizer", default=os.path.join(BASE_DIR, "vectorizer.pkl"))
+    parser.add_argument("--out", default=DEFAULT_COMPILED_DIR)
+    parser.add_argument("--dataset", default=os.path.join(BASE_DIR, "..", "intent_dataset.csv"))
+    parser.add_argument("--tolerance", type=float, default=1e-9)
+    args = parser.parse_args()
+
+    import joblib  # 내보내기 단계에서만 scikit-learn 필요
+
+    classifier = joblib.load(args.model)
+    vectorizer = joblib.load(args.vectorizer)
+
+    # 같은 파일 시스템의 임시 디렉토리에 내보내고 검증한 뒤에만 서버가 로드하는 디렉토리와 교체
+    out_dir = os.path.abspath(args.out)
+    os.makedirs(os.path.dirname(out_dir), exist_ok=True)
+    staged = tempfile.mkdtemp(prefix=".intent_model_compiled-", dir=os.path.dirname(out_dir))
+    try:
+        export_compiled_model(vectorizer, classifier, staged)
+        compiled = CompiledIntentModel.load(staged)
+        print(f"✓ 내보내기 완료 (어휘 {compiled.meta['vocab_size']}개, {compiled.nbytes:,} bytes)")
+
+        if os.path.exists(args.dataset):
+            texts = load_texts(args.dataset)
+            max_diff = verify(vectorizer, classifier, compiled, texts)
+            print(f"검증: {len(texts)}개 문장, 확률 최대 오차 {max_diff:.2e}")
+            if max_diff > args.tolerance:
+                print(f"✗ scikit-learn 결과와 일치하지 않습니다. 기존 {out_dir}는 그대로 둡니다.")
+                sys.exit(1)
+            print("✓ scikit-learn 결과와 일치합니다.")
+
+        replace_dir(staged, out_dir)
+        print(f"✓ 저장: {out_dir}")
+    finally:
+        shutil.rmtree(staged, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
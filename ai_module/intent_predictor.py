@@ -1,9 +1,367 @@
-import joblib
+"""
+컴파일된 의도 분류기
+TF-IDF + LogisticRegression 모델을 NumPy 배열(어휘 해시 테이블, IDF, 가중치 행렬)로 내보내고,
+scikit-learn/pickle 없이 메모리 매핑으로 불러와 동일한 확률을 계산합니다.
 
-clf = joblib.load("intent_model.pkl")
-vectorizer = joblib.load("vectorizer.pkl")
+내보내기:
+    python export_intent_model.py
+사용:
+    from intent_predictor import CompiledIntentModel
+    model = CompiledIntentModel.load("intent_model_compiled")
+    model.predict_proba(["여권 만들고 싶어요"])
+"""
 
-def predict_intent(text):
-    vec = vectorizer.transform([text])
-    pred = clf.predict(vec)[0]
-    return pred
\ No newline at end of file
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+# 기본 경로 (이 파일과 같은 디렉토리)
+DEFAULT_COMPILED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_model_compiled")
+
+_FNV_OFFSET = 0xCBF29CE484222325
+_FNV_PRIME = 0x100000001B3
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+# scikit-learn의 문자 n-gram 공백 정규화와 동일
+_WHITE_SPACES = re.compile(r"\s\s+")
+
+
+def fnv1a(data: bytes) -> int:
+    """64bit FNV-1a 해시 (프로세스마다 달라지는 hash()와 달리 고정값)"""
+    h = _FNV_OFFSET
+    for byte in data:
+        h = ((h ^ byte) * _FNV_PRIME) & _MASK64
+    return h
+
+
+def build_vocab_table(terms: Sequence[str]):
+    """어휘 목록으로 (UTF-8 바이트 묶음, 오프셋, 개방 주소법 해시 테이블) 생성"""
+    encoded = [term.encode("utf-8") for term in terms]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8).copy()
+
+    size = 1
+    while size < max(2, len(encoded) * 2):
+        size <<= 1
+    table = np.full(size, -1, dtype=np.int32)
+    mask = size - 1
+    for index, data in enumerate(encoded):
+        slot = fnv1a(data) & mask
+        while table[slot] != -1:
+            slot = (slot + 1) & mask
+        table[slot] = index
+    return blob, offsets, table
+
+
+class CompiledIntentModel:
+    """scikit-learn TfidfVectorizer + LogisticRegression과 같은 결과를 내는 경량 분류기"""
+
+    def __init__(self, meta: dict, arrays: Dict[str, np.ndarray], source: str = ""):
+        self.meta = meta
+        self.source = source
+        self._blob = arrays["vocab_blob"]
+        self._offsets = arrays["vocab_offsets"]
+        self._table = arrays["vocab_table"]
+        self._mask = len(self._table) - 1
+        self._idf = arrays.get("idf")
+        self._coef = arrays["coef"]          # (어휘 수, 클래스 수)
+        self._intercept = arrays["intercept"]
+        self.classes_ = arrays["classes"]
+
+        self._lowercase = meta["lowercase"]
+        self._analyzer = meta["analyzer"]
+        self._min_n, self._max_n = meta["ngram_range"]
+        self._token_re = re.compile(meta["token_pattern"]) if meta["analyzer"] == "word" else None
+        self._stop_words = frozenset(meta["stop_words"]) if meta.get("stop_words") else None
+        self._term_cache: Dict[str, int] = {}
+
+    # ---- 로드 ----
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_COMPILED_DIR, mmap: bool = True) -> "CompiledIntentModel":
+        """내보낸 디렉토리에서 로드 (mmap=True면 배열을 복사하지 않고 메모리 매핑)"""
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 모델 포맷입니다: {meta.get('format_version')}")
+
+        mode = "r" if mmap else None
+        arrays = {}
+        for name in meta["arrays"]:
+            arrays[name] = np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode, allow_pickle=False)
+        return cls(meta, arrays, source=path)
+
+    @property
+    def nbytes(self) -> int:
+        """배열 메모리 크기 (바이트)"""
+        arrays = [self._blob, self._offsets, self._table, self._coef, self._intercept, self.classes_]
+        if self._idf is not None:
+            arrays.append(self._idf)
+        return int(sum(a.nbytes for a in arrays))
+
+    # ---- 분석기 (scikit-learn과 동일한 토큰/n-gram 생성) ----
+
+    def _analyze(self, text: str) -> List[str]:
+        if self._lowercase:
+            text = text.lower()
+
+        if self._analyzer == "word":
+            tokens = self._token_re.findall(text)
+            if self._stop_words is not None:
+                tokens = [t for t in tokens if t not in self._stop_words]
+            return self._word_ngrams(tokens)
+        if self._analyzer == "char":
+            return self._char_ngrams(text)
+        return self._char_wb_ngrams(text)
+
+    def _word_ngrams(self, tokens: List[str]) -> List[str]:
+        min_n, max_n = self._min_n, self._max_n
+        if max_n == 1:
+            return tokens
+        original = tokens
+        if min_n == 1:
+            tokens = list(original)
+            min_n += 1
+        else:
+            tokens = []
+        for n in range(min_n, min(max_n + 1, len(original) + 1)):
+            for i in range(len(original) - n + 1):
+                tokens.append(" ".join(original[i:i + n]))
+        return tokens
+
+    def _char_ngrams(self, text: str) -> List[str]:
+        text = _WHITE_SPACES.sub(" ", text)
+        min_n, max_n = self._min_n, self._max_n
+        if min_n == 1:
+            ngrams = list(text)
+            min_n += 1
+        else:
+            ngrams = []
+        for n in range(min_n, min(max_n + 1, len(text) + 1)):
+            for i in range(len(text) - n + 1):
+                ngrams.append(text[i:i + n])
+        return ngrams
+
+    def _char_wb_ngrams(self, text: str) -> List[str]:
+        text = _WHITE_SPACES.sub(" ", text)
+        ngrams = []
+        for word in text.split():
+            word = " " + word + " "
+            for n in range(self._min_n, self._max_n + 1):
+                offset = 0
+                ngrams.append(word[offset:offset + n])
+                while offset + n < len(word):
+                    offset += 1
+                    ngrams.append(word[offset:offset + n])
+                if offset == 0:  # 짧은 단어는 한 번만 셈
+                    break
+        return ngrams
+
+    # ---- 어휘 조회 ----
+
+    def term_index(self, term: str) -> int:
+        """어휘 인덱스 반환, 없으면 -1"""
+        index = self._term_cache.get(term)
+        if index is not None:
+            return index
+
+        data = term.encode("utf-8")
+        slot = fnv1a(data) & self._mask
+        index = -1
+        while True:
+            candidate = int(self._table[slot])
+            if candidate == -1:
+                break
+            start, end = self._offsets[candidate], self._offsets[candidate + 1]
+            if end - start == len(data) and self._blob[start:end].tobytes() == data:
+                index = candidate
+                break
+            slot = (slot + 1) & self._mask
+
+        if len(self._term_cache) < 100_000:
+            self._term_cache[term] = index
+        return index
+
+    # ---- 예측 ----
+
+    def _features(self, text: str):
+        """TF-IDF 희소 벡터 (인덱스, 값)"""
+        counts: Dict[int, int] = {}
+        for term in self._analyze(text):
+            index = self.term_index(term)
+            if index >= 0:
+                counts[index] = counts.get(index, 0) + 1
+
+        indices = np.fromiter(sorted(counts), dtype=np.int64, count=len(counts))
+        values = np.array([counts[i] for i in indices], dtype=np.float64)
+        if len(values) == 0:
+            return indices, values
+
+        if self.meta["binary"]:
+            values[:] = 1.0
+        if self.meta["sublinear_tf"]:
+            values = np.log(values) + 1.0
+        if self._idf is not None:
+            values = values * self._idf[indices]
+
+        norm = self.meta["norm"]
+        if norm == "l2":
+            length = np.sqrt(np.dot(values, values))
+        elif norm == "l1":
+            length = np.abs(values).sum()
+        else:
+            length = 0.0
+        if length > 0:
+            values = values / length
+        return indices, values
+
+    def transform(self, texts: Iterable[str]) -> List[tuple]:
+        """텍스트별 TF-IDF 희소 벡터 목록 (vectorizer.transform에 해당)"""
+        return [self._features(text) for text in texts]
+
+    def decision_function(self, texts: Iterable[str]) -> np.ndarray:
+        """클래스별 선형 점수 (N, 클래스 수 또는 1)"""
+        return self._decision(self.transform(texts))
+
+    def _decision(self, features: List[tuple]) -> np.ndarray:
+        rows = [values @ self._coef[indices] + self._intercept for indices, values in features]
+        if not rows:
+            return np.zeros((0, len(self._intercept)))
+        return np.vstack(rows)
+
+    def predict_proba(self, texts: Iterable[str]) -> np.ndarray:
+        """클래스별 확률 (LogisticRegression.predict_proba와 동일)"""
+        return self.predict_proba_features(self.transform(texts))
+
+    def predict_proba_features(self, features: List[tuple]) -> np.ndarray:
+        """transform 결과로 클래스별 확률 계산"""
+        scores = self._decision(features)
+        mode = self.meta["proba"]
+
+        if mode in ("binary", "binary_softmax"):
+            # binary_softmax: 다항 로지스틱 회귀의 이진 분류 (softmax([-d, d]) = sigmoid(2d))
+            decision = scores[:, 0] * (2.0 if mode == "binary_softmax" else 1.0)
+            positive = 1.0 / (1.0 + np.exp(-decision))
+            return np.column_stack([1.0 - positive, positive])
+        if mode == "ovr":
+            proba = 1.0 / (1.0 + np.exp(-scores))
+            return proba / proba.sum(axis=1, keepdims=True)
+
+        # multinomial: softmax
+        scores = scores - scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        return scores / scores.sum(axis=1, keepdims=True)
+
+    def predict(self, texts: Iterable[str]) -> np.ndarray:
+        """가장 확률이 높은 의도"""
+        return self.classes_[np.argmax(self.predict_proba(texts), axis=1)]
+
+
+def _detect_proba_mode(classifier, n_features: int) -> str:
+    """분류기의 predict_proba가 어떤 방식(softmax/OvR/이진)인지 임의 입력으로 확인
+
+    scikit-learn 버전과 학습 옵션에 따라 확률 계산 방식이 다르므로 규칙 대신 실제 출력과 비교합니다.
+    """
+    rng = np.random.default_rng(0)
+    X = rng.random((4, n_features))
+    expected = classifier.predict_proba(X)
+    decision = np.asarray(classifier.decision_function(X), dtype=np.float64)
+
+    candidates = {}
+    if decision.ndim == 1:
+        for mode, scale in (("binary", 1.0), ("binary_softmax", 2.0)):
+            positive = 1.0 / (1.0 + np.exp(-decision * scale))
+            candidates[mode] = np.column_stack([1.0 - positive, positive])
+    else:
+        shifted = np.exp(decision - decision.max(axis=1, keepdims=True))
+        candidates["multinomial"] = shifted / shifted.sum(axis=1, keepdims=True)
+        ovr = 1.0 / (1.0 + np.exp(-decision))
+        candidates["ovr"] = ovr / ovr.sum(axis=1, keepdims=True)
+
+    for mode, proba in candidates.items():
+        if np.allclose(proba, expected, rtol=0, atol=1e-10):
+            return mode
+    raise ValueError("분류기의 확률 계산 방식을 확인할 수 없습니다.")
+
+
+def _idf_weights(vectorizer) -> np.ndarray:
+    """IDF 가중치 (scikit-learn 1.2 이하로 저장된 모델은 대각 행렬로 보관)"""
+    transformer = vectorizer._tfidf
+    if "idf_" in transformer.__dict__:
+        return np.asarray(transformer.__dict__["idf_"], dtype=np.float64)
+    if "_idf_diag" in transformer.__dict__:
+        return np.asarray(transformer._idf_diag.diagonal(), dtype=np.float64)
+    return np.asarray(vectorizer.idf_, dtype=np.float64)
+
+
+def export_compiled_model(vectorizer, classifier, out_dir: str = DEFAULT_COMPILED_DIR) -> str:
+    """학습된 TfidfVectorizer + LogisticRegression을 컴파일된 형식으로 저장"""
+    for option in ("tokenizer", "preprocessor"):
+        if getattr(vectorizer, option, None) is not None:
+            raise ValueError(f"사용자 정의 {option}는 내보낼 수 없습니다.")
+    if callable(vectorizer.analyzer) or vectorizer.analyzer not in ("word", "char", "char_wb"):
+        raise ValueError(f"지원하지 않는 analyzer입니다: {vectorizer.analyzer}")
+    if vectorizer.strip_accents is not None:
+        raise ValueError("strip_accents 옵션은 지원하지 않습니다.")
+
+    stop_words = vectorizer.get_stop_words()
+    terms = [None] * len(vectorizer.vocabulary_)
+    for term, index in vectorizer.vocabulary_.items():
+        terms[index] = term
+    blob, offsets, table = build_vocab_table(terms)
+
+    coef = np.asarray(classifier.coef_, dtype=np.float64)
+    classes = np.asarray(classifier.classes_)
+    if classes.dtype == object:
+        classes = classes.astype(str)
+    proba = _detect_proba_mode(classifier, coef.shape[1])
+
+    arrays = {
+        "vocab_blob": blob,
+        "vocab_offsets": offsets,
+        "vocab_table": table,
+        "coef": np.ascontiguousarray(coef.T),
+        "intercept": np.asarray(classifier.intercept_, dtype=np.float64),
+        "classes": classes,
+    }
+    if vectorizer.use_idf:
+        arrays["idf"] = _idf_weights(vectorizer)
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "analyzer": vectorizer.analyzer,
+        "ngram_range": list(vectorizer.ngram_range),
+        "lowercase": bool(vectorizer.lowercase),
+        "token_pattern": vectorizer.token_pattern,
+        "stop_words": sorted(stop_words) if stop_words else None,
+        "binary": bool(vectorizer.binary),
+        "sublinear_tf": bool(vectorizer.sublinear_tf),
+        "norm": vectorizer.norm,
+        "proba": proba,
+        "vocab_size": len(terms),
+        "arrays": sorted(arrays),
+    }
+
+    os.makedirs(out_dir, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(os.path.join(out_dir, f"{name}.npy"), array, allow_pickle=False)
+    with open(os.path.join(out_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return out_dir
+
+
+_default_model: Optional[CompiledIntentModel] = None
+
+
+def predict_intent(text: str) -> int:
+    """텍스트의 의도 예측 (기본 경로의 컴파일된 모델 사용)"""
+    global _default_model
+    if _default_model is None:
+        _default_model = CompiledIntentModel.load(DEFAULT_COMPILED_DIR)
+    return int(_default_model.predict([text])[0])
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+의도 분류 모델 학습
+model.ipynb의 단일 train/test 분할 대신 intent_dataset.csv로 층화 K-fold 교차 검증을 하며
+벡터라이저(문자/단어 n-gram, sublinear tf)와 분류기(C, class_weight) 조합을 CPU 코어에 나누어 탐색합니다.
+가장 좋은 조합을 전체 데이터로 다시 학습하여 서버가 로드하는 파일을 만듭니다.
+
+- intent_model.pkl / vectorizer.pkl (pickle 경로)
+- intent_model_compiled/ (컴파일된 모델, scikit-learn 결과와 일치 검증)
+- intent_model_report.json (후보별 교차 검증 점수, 혼동 행렬, 문장 1개 예측 지연 시간)
+
+벡터라이저는 fold마다 한 번만 학습하고 같은 특징 행렬로 모든 분류기 후보를 학습합니다.
+--cache-dir를 주면 특징 행렬을 디스크에 저장하여, 데이터셋이 바뀌지 않은 조합은 다음 실행에서 다시 계산하지 않습니다.
+
+    python train_intent_model.py
+    python train_intent_model.py --folds 5 --jobs 4 --cache-dir ../.cache/intent_features
+"""
+
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List
+
+import numpy as np
+
+from export_intent_model import replace_dir, verify
+from intent_predictor import CompiledIntentModel, export_compiled_model
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 벡터라이저 탐색 범위 (컴파일된 모델이 지원하는 analyzer만 사용)
+VECTORIZER_GRID = [
+    {"analyzer": "word", "ngram_range": (1, 1)},
+    {"analyzer": "word", "ngram_range": (1, 2)},
+    {"analyzer": "char_wb", "ngram_range": (1, 3)},
+    {"analyzer": "char_wb", "ngram_range": (2, 4)},
+    {"analyzer": "char", "ngram_range": (1, 3)},
+    {"analyzer": "char", "ngram_range": (2, 4)},
+]
+SUBLINEAR_TF = (False, True)
+
+# 분류기 탐색 범위
+CLASSIFIER_GRID = [
+    {"C": C, "class_weight": class_weight}
+    for C, class_weight in itertools.product((1.0, 10.0, 100.0), (None, "balanced"))
+]
+
+
+def load_dataset(csv_path: str):
+    """(문장 목록, 의도 번호 배열)"""
+    with open(csv_path, encoding="utf-8-sig") as f:
+        rows = [row for row in csv.DictReader(f) if row["text"].strip()]
+    return [row["text"] for row in rows], np.array([int(row["intent"]) for row in rows])
+
+
+def vectorizer_candidates() -> List[dict]:
+    return [dict(params, sublinear_tf=sublinear) for params in VECTORIZER_GRID for sublinear in SUBLINEAR_TF]
+
+
+def describe(params: dict) -> str:
+    """후보 이름 (예: char_wb(1,3)+sublinear / C=10,balanced)"""
+    if "analyzer" in params:
+        low, high = params["ngram_range"]
+        return f"{params['analyzer']}({low},{high})" + ("+sublinear" if params["sublinear_tf"] else "")
+    return f"C={params['C']:g}" + (f",{params['class_weight']}" if params["class_weight"] else "")
+
+
+def build_vectorizer(params: dict):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    return TfidfVectorizer(**params)
+
+
+def build_classifier(params: dict, seed: int):
+    from sklearn.linear_model import LogisticRegression
+
+    return LogisticRegression(max_iter=1000, random_state=seed, **params)
+
+
+def fit_features(params: dict, train_texts: List[str], test_texts: List[str]):
+    """fold 하나의 특징 행렬 (학습 fold로만 어휘/IDF 학습)"""
+    vectorizer = build_vectorizer(params)
+    return vectorizer.fit_transform(train_texts), vectorizer.transform(test_texts)
+
+
+def evaluate_fold(memory, vec_params: dict, texts: List[str], labels: np.ndarray,
+                  train_index: np.ndarray, test_index: np.ndarray, seed: int) -> List[dict]:
+    """벡터라이저 후보 하나 × fold 하나: 특징 행렬을 한 번 만들고 모든 분류기 후보를 학습/평가 (워커에서 실행)"""
+    from sklearn.metrics import accuracy_score, f1_score, log_loss
+
+    start = time.perf_counter()
+    X_train, X_test = memory.cache(fit_features)(
+        vec_params, [texts[i] for i in train_index], [texts[i] for i in test_index]
+    )
+    feature_s = time.perf_counter() - start
+
+    y_train, y_test = labels[train_index], labels[test_index]
+    results = []
+    for clf_index, clf_params in enumerate(CLASSIFIER_GRID):
+        start = time.perf_counter()
+        classifier = build_classifier(clf_params, seed).fit(X_train, y_train)
+        proba = classifier.predict_proba(X_test)
+        predicted = classifier.classes_[np.argmax(proba, axis=1)]
+        results.append({
+            "classifier": clf_index,
+            "accuracy": float(accuracy_score(y_test, predicted)),
+            "macro_f1": float(f1_score(y_test, predicted, average="macro")),
+            "log_loss": float(log_loss(y_test, proba, labels=classifier.classes_)),
+            "fit_s": time.perf_counter() - start,
+            "predicted": predicted,
+        })
+    return [dict(result, feature_s=feature_s, features=X_train.shape[1]) for result in results]
+
+
+def search(texts: List[str], labels: np.ndarray, folds: int, jobs: int, seed: int, cache_dir: str = None):
+    """교차 검증 탐색, (점수순 후보 목록, 후보별 out-of-fold 예측)"""
+    import joblib
+    from sklearn.model_selection import StratifiedKFold
+
+    memory = joblib.Memory(cache_dir or None, verbose=0)
+    splits = list(StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed).split(texts, labels))
+    vec_grid = vectorizer_candidates()
+    tasks = [(vec_index, fold) for vec_index in range(len(vec_grid)) for fold in range(folds)]
+
+    outputs = joblib.Parallel(n_jobs=jobs)(
+        joblib.delayed(evaluate_fold)(memory, vec_grid[vec_index], texts, labels, *splits[fold], seed)
+        for vec_index, fold in tasks
+    )
+
+    scores: Dict[tuple, dict] = {}
+    oof: Dict[tuple, np.ndarray] = {}
+    for (vec_index, fold), results in zip(tasks, outputs):
+        for result in results:
+            key = (vec_index, result["classifier"])
+            entry = scores.setdefault(key, {"accuracy": [], "macro_f1": [], "log_loss": [], "fit_s": [], "feature_s": [], "features": []})
+            for name in entry:
+                entry[name].append(result[name])
+            oof.setdefault(key, np.empty_like(labels))[splits[fold][1]] = result["predicted"]
+
+    candidates = []
+    for (vec_index, clf_index), entry in scores.items():
+        vec_params, clf_params = vec_grid[vec_index], CLASSIFIER_GRID[clf_index]
+        candidates.append({
+            "name": f"{describe(vec_params)} / {describe(clf_params)}",
+            "vectorizer": dict(vec_params, ngram_range=list(vec_params["ngram_range"])),
+            "classifier": clf_params,
+            "macro_f1": round(statistics.fmean(entry["macro_f1"]), 4),
+            "macro_f1_std": round(statistics.pstdev(entry["macro_f1"]), 4),
+            "accuracy": round(statistics.fmean(entry["accuracy"]), 4),
+            "accuracy_std": round(statistics.pstdev(entry["accuracy"]), 4),
+            "log_loss": round(statistics.fmean(entry["log_loss"]), 4),
+            "features": int(statistics.fmean(entry["features"])),
+            "fit_s": round(statistics.fmean(entry["fit_s"]), 4),
+            "feature_s": round(statistics.fmean(entry["feature_s"]), 4),
+            "_key": (vec_index, clf_index),
+        })
+    # 점수가 같으면 신뢰도가 정확한 쪽(log loss, 저신뢰 재확인 기준에 영향), 그다음 어휘가 작은 쪽
+    candidates.sort(key=lambda c: (-c["macro_f1"], -c["accuracy"], c["log_loss"], c["features"], c["name"]))
+    return candidates, oof
+
+
+def fold_report(labels: np.ndarray, predicted: np.ndarray) -> dict:
+    """out-of-fold 예측으로 만든 혼동 행렬과 의도별 점수"""
+    from sklearn.metrics import confusion_matrix, precision_recall_fscore_support
+
+    classes = np.unique(labels)
+    precision, recall, f1, support = precision_recall_fscore_support(labels, predicted, labels=classes, zero_division=0)
+    return {
+        "labels": classes.tolist(),
+        "confusion_matrix": confusion_matrix(labels, predicted, labels=classes).tolist(),
+        "per_intent": {
+            str(label): {"precision": round(float(p), 4), "recall": round(float(r), 4), "f1": round(float(f), 4), "support": int(s)}
+            for label, p, r, f, s in zip(classes, precision, recall, f1, support)
+        },
+    }
+
+
+def measure_latency(predict, texts: List[str], warmup: int = 20) -> dict:
+    """문장 1개씩 예측할 때의 지연 시간 (서버 요청과 같은 조건)"""
+    for text in texts[:warmup]:
+        predict(text)
+    timings = []
+    for text in texts:
+        start = time.perf_counter()
+        predict(text)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "samples": len(timings),
+        "p50_ms": round(timings[len(timings) // 2], 4),
+        "p99_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.99))], 4),
+        "mean_ms": round(statistics.fmean(timings), 4),
+    }
+
+
+def file_sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="의도 분류 모델 교차 검증 탐색 및 학습")
+    parser.add_argument("--dataset", default=os.path.join(BASE_DIR, "..", "intent_dataset.csv"))
+    parser.add_argument("--out-dir", default=BASE_DIR, help="intent_model.pkl / vectorizer.pkl 저장 위치")
+    parser.add_argument("--compiled", default=None, help="컴파일된 모델 경로 (기본: <out-dir>/intent_model_compiled)")
+    parser.add_argument("--report", default=None, help="학습 리포트 경로 (기본: <out-dir>/intent_model_report.json)")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=-1, help="병렬 프로세스 수 (-1=CPU 코어 수)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cache-dir", default=None, help="fold별 특징 행렬 디스크 캐시 (비우면 실행 중에만 재사용)")
+    parser.add_argument("--latency-samples", type=int, default=500, help="지연 시간 측정 문장 수")
+    parser.add_argument("--tolerance", type=float, default=1e-9, help="컴파일된 모델 확률 허용 오차")
+    args = parser.parse_args()
+
+    import joblib
+
+    texts, labels = load_dataset(args.dataset)
+    counts = Counter(labels.tolist())
+    if not texts or min(counts.values()) < args.folds:
+        sys.exit(f"의도마다 최소 {args.folds}개 문장이 필요합니다: {dict(sorted(counts.items()))}")
+    print(f"데이터셋: {len(texts)}개 문장, 의도 {len(counts)}개, {args.folds}-fold, "
+          f"후보 {len(vectorizer_candidates()) * len(CLASSIFIER_GRID)}개")
+
+    start = time.perf_counter()
+    candidates, oof = search(texts, labels, args.folds, args.jobs, args.seed, args.cache_dir)
+    search_s = time.perf_counter() - start
+    best = candidates[0]
+    print(f"탐색 완료 ({search_s:.1f}초)")
+    for candidate in candidates[:5]:
+        print(f"  {candidate['name']:<36} macro-F1 {candidate['macro_f1']:.4f} ± {candidate['macro_f1_std']:.4f}"
+              f"  정확도 {candidate['accuracy']:.4f}  log loss {candidate['log_loss']:.4f}  어휘 {candidate['features']}")
+
+    # 가장 좋은 조합을 전체 데이터로 다시 학습
+    vec_params = dict(best["vectorizer"], ngram_range=tuple(best["vectorizer"]["ngram_range"]))
+    start = time.perf_counter()
+    vectorizer = build_vectorizer(vec_params)
+    classifier = build_classifier(best["classifier"], args.seed).fit(vectorizer.fit_transform(texts), labels)
+    refit_s = time.perf_counter() - start
+
+    # 같은 파일 시스템의 임시 위치에 저장하고 검증한 뒤에만 서버가 로드하는 파일과 교체
+    model_path = os.path.join(args.out_dir, "intent_model.pkl")
+    vectorizer_path = os.path.join(args.out_dir, "vectorizer.pkl")
+    compiled_path = os.path.abspath(args.compiled or os.path.join(args.out_dir, "intent_model_compiled"))
+    os.makedirs(args.out_dir, exist_ok=True)
+    os.makedirs(os.path.dirname(compiled_path), exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".intent_model-", dir=args.out_dir)
+    staged_compiled = tempfile.mkdtemp(prefix=".intent_model_compiled-", dir=os.path.dirname(compiled_path))
+    try:
+        staged_model = os.path.join(staging, "intent_model.pkl")
+        staged_vectorizer = os.path.join(staging, "vectorizer.pkl")
+        joblib.dump(classifier, staged_model)
+        joblib.dump(vectorizer, staged_vectorizer)
+        export_compiled_model(vectorizer, classifier, staged_compiled)
+
+        # 저장된 파일을 다시 읽어 검증 (메모리의 객체가 아니라 서버가 로드할 내용)
+        compiled = CompiledIntentModel.load(staged_compiled)
+        max_diff = verify(joblib.load(staged_vectorizer), joblib.load(staged_model), compiled, texts)
+        pickle_bytes = os.path.getsize(staged_model) + os.path.getsize(staged_vectorizer)
+
+        latency_texts = texts[:args.latency_samples]
+        latency = {
+            "sklearn": measure_latency(lambda text: classifier.predict_proba(vectorizer.transform([text])), latency_texts),
+            "compiled": measure_latency(lambda text: compiled.predict_proba([text]), latency_texts),
+        }
+
+        report = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "dataset": {
+                "path": os.path.abspath(args.dataset),
+                "sha256": file_sha256(args.dataset),
+                "rows": len(texts),
+                "per_intent": {str(label): count for label, count in sorted(counts.items())},
+            },
+            "search": {
+                "folds": args.folds,
+                "seed": args.seed,
+                "jobs": args.jobs,
+                "candidates": len(candidates),
+                "search_s": round(search_s, 2),
+                "refit_s": round(refit_s, 2),
+            },
+            "best": {key: value for key, value in best.items() if key != "_key"},
+            "cross_validation": fold_report(labels, oof[best["_key"]]),
+            "model": {
+                "vocab_size": compiled.meta["vocab_size"],
+                "pickle_bytes": pickle_bytes,
+                "compiled_bytes": compiled.nbytes,
+                "compiled_max_proba_diff": max_diff,
+                "installed": max_diff <= args.tolerance,
+            },
+            "latency": latency,
+            "candidates": [{key: value for key, value in c.items() if key != "_key"} for c in candidates],
+        }
+        report_path = args.report or os.path.join(args.out_dir, "intent_model_report.json")
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+        print(f"교차 검증 macro-F1 {best['macro_f1']:.4f}, 정확도 {best['accuracy']:.4f}")
+        for name, stats in latency.items():
+            print(f"예측 지연 ({name}): p50 {stats['p50_ms']:.3f}ms, p99 {stats['p99_ms']:.3f}ms")
+        print(f"리포트 저장: {report_path}")
+
+        if max_diff > args.tolerance:
+            print(f"✗ 컴파일된 모델이 scikit-learn 결과와 일치하지 않습니다 (확률 최대 오차 {max_diff:.2e}). "
+                  f"기존 모델 파일은 그대로 둡니다.")
+            sys.exit(1)
+
+        os.replace(staged_model, model_path)
+        os.replace(staged_vectorizer, vectorizer_path)
+        replace_dir(staged_compiled, compiled_path)
+        print(f"✓ 저장: {model_path}, {vectorizer_path}, {compiled_path} (확률 최대 오차 {max_diff:.2e})")
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+        shutil.rmtree(staged_compiled, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,275 @@
+"""
+키오스크 음성 녹음
+마이크 입력 콜백이 미리 할당한 링 버퍼에 16bit PCM을 채우고, 별도 스레드가 발화 구간만
+조각 단위로 출력(파일, 대기열, 네트워크 등)에 넘깁니다.
+
+- 발화 시작 전 pre_roll_ms만큼의 소리를 함께 넘겨 첫 음절이 잘리지 않습니다.
+- 발화 후 silence_ms 동안 조용하면 바로 녹음을 끝냅니다 (고정 5초 대기 없음).
+- 출력에는 링 버퍼의 배열 뷰를 그대로 넘기므로 전체 녹음을 복사하지 않습니다.
+
+사용:
+    from voice_saver import AudioCapture, WavFileSink
+    with AudioCapture([WavFileSink("kiosk_input.wav")]) as capture:
+        capture.wait()
+"""
+
+import logging
+import queue
+import threading
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
 import sounddevice as sd
 import soundfile as sf
 
-def record_audio(filename="kiosk_input.wav", duration=5, samplerate=16000):
-    audio = sd.rec(int(duration * samplerate), samplerate=samplerate, channels=1)
-    sd.wait()  # 녹음이 끝날 때까지 대기
-    sf.write(filename, audio, samplerate)
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+
+class RingBuffer:
+    """고정 크기 int16 링 버퍼 (위치는 녹음 시작부터의 누적 샘플 수)"""
+
+    def __init__(self, capacity: int, channels: int = 1):
+        self.capacity = capacity
+        self.written = 0
+        self._data = np.zeros((capacity, channels), dtype=np.int16)
+
+    def write(self, frames: np.ndarray):
+        """입력 콜백에서 호출 (할당 없이 미리 만든 배열에 복사)"""
+        n = len(frames)
+        if n > self.capacity:
+            self.written += n - self.capacity
+            frames, n = frames[-self.capacity:], self.capacity
+        start = self.written % self.capacity
+        first = min(n, self.capacity - start)
+        self._data[start:start + first] = frames[:first]
+        self._data[:n - first] = frames[first:]
+        self.written += n
+
+    def oldest(self) -> int:
+        """아직 덮어쓰이지 않은 가장 오래된 위치"""
+        return max(0, self.written - self.capacity)
+
+    def views(self, start: int, end: int) -> List[np.ndarray]:
+        """[start, end) 구간의 배열 뷰 (복사 없음, 버퍼 끝에서 나뉘면 2개)"""
+        start = max(start, self.oldest())
+        if end <= start:
+            return []
+        begin, stop = start % self.capacity, (end - 1) % self.capacity + 1
+        if begin < stop:
+            return [self._data[begin:stop]]
+        return [self._data[begin:], self._data[:stop]]
+
+
+class WavFileSink:
+    """발화 구간을 WAV 파일로 저장 (첫 조각이 올 때 파일을 열고, 조각마다 이어서 기록)"""
+
+    def __init__(self, filename: str = "kiosk_input.wav", samplerate: int = SAMPLE_RATE, channels: int = 1):
+        self.filename = filename
+        self.samplerate = samplerate
+        self.channels = channels
+        self._file = None
+
+    def write(self, chunk: np.ndarray):
+        if self._file is None:
+            self._file = sf.SoundFile(self.filename, "w", samplerate=self.samplerate,
+                                      channels=self.channels, subtype="PCM_16")
+        self._file.write(chunk)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class QueueSink:
+    """조각을 bytes로 대기열에 넣음 (녹음이 끝나면 None)"""
+
+    def __init__(self, chunks: queue.Queue):
+        self.chunks = chunks
+
+    def write(self, chunk: np.ndarray):
+        # 링 버퍼는 계속 덮어쓰이므로 대기열에는 조각만 복사해서 넣음
+        self.chunks.put(chunk.tobytes())
+
+    def close(self):
+        self.chunks.put(None)
+
+
+class CallbackSink:
+    """조각을 16bit little-endian PCM bytes로 함수에 전달 (예: 소켓 sendall, 웹소켓 전송)"""
+
+    def __init__(self, send: Callable[[bytes], None], on_close: Optional[Callable[[], None]] = None):
+        self.send = send
+        self.on_close = on_close
+
+    def write(self, chunk: np.ndarray):
+        self.send(chunk.tobytes())
+
+    def close(self):
+        if self.on_close is not None:
+            self.on_close()
+
+
+class AudioCapture:
+    """콜백 방식 마이크 녹음 (발화 감지, pre-roll, 무음 시 종료)
+
+    입력 콜백(오디오 스레드)은 링 버퍼 쓰기와 블록 에너지 계산만 하고,
+    출력(sink) 호출은 전달 스레드에서 하므로 느린 파일/네트워크 출력이 녹음을 끊지 않습니다.
+    sink는 write(chunk)/close()를 가진 객체이며, chunk는 호출 중에만 유효한 (샘플 수, 채널) int16 뷰입니다.
+    """
+
+    def __init__(self, sinks: Sequence, samplerate: int = SAMPLE_RATE, channels: int = 1, device=None,
+                 block_ms: int = 30, threshold: float = 0.01, start_ms: int = 90, pre_roll_ms: int = 300,
+                 silence_ms: int = 800, tail_ms: int = 200, max_seconds: float = 10.0,
+                 wait_seconds: Optional[float] = 10.0, buffer_seconds: float = 5.0):
+        self.sinks = list(sinks)
+        self.samplerate = samplerate
+        self.channels = channels
+        self.device = device
+        self.block_size = int(samplerate * block_ms / 1000)
+        self.threshold = threshold
+        self.start_blocks = max(1, round(start_ms / block_ms))
+        self.pre_roll = int(samplerate * pre_roll_ms / 1000)
+        self.silence_blocks = max(1, round(silence_ms / block_ms))
+        self.tail = int(samplerate * min(tail_ms, silence_ms) / 1000)
+        self.max_samples = int(samplerate * max_seconds)
+        self.wait_samples = int(samplerate * wait_seconds) if wait_seconds else None
+        # pre-roll + 전달 스레드가 밀릴 수 있는 시간만큼만 보관
+        self.ring = RingBuffer(self.pre_roll + int(samplerate * buffer_seconds), channels)
+
+        self.speech_start: Optional[int] = None  # 발화 구간 시작 위치 (pre-roll 포함)
+        self.speech_end: Optional[int] = None
+        self.overruns = 0  # 전달이 밀려 덮어쓰인 횟수
+        self.input_errors = 0  # 입력 오버플로 등 콜백 상태 경고 수
+        self._voiced_run = 0
+        self._silent_run = 0
+        self._marks: "queue.SimpleQueue[Optional[int]]" = queue.SimpleQueue()
+        self._done = threading.Event()
+        self._stream = None
+        self._sender: Optional[threading.Thread] = None
+
+    @property
+    def speech_detected(self) -> bool:
+        return self.speech_start is not None
+
+    @property
+    def duration(self) -> float:
+        """전달한 발화 구간 길이 (초)"""
+        if self.speech_start is None:
+            return 0.0
+        end = self.speech_end if self.speech_end is not None else self.ring.written
+        return (end - self.speech_start) / self.samplerate
+
+    def start(self):
+        self._sender = threading.Thread(target=self._send_loop, name="audio-capture-sender", daemon=True)
+        self._sender.start()
+        try:
+            self._stream = sd.InputStream(
+                samplerate=self.samplerate, channels=self.channels, dtype="int16", blocksize=self.block_size,
+                device=self.device, latency="low", callback=self._callback, finished_callback=self._finish,
+            )
+            self._stream.start()
+        except Exception:
+            self._marks.put(None)  # 마이크를 열지 못하면 전달 스레드도 종료
+            self._sender.join()
+            raise
+        return self
+
+    def _callback(self, indata: np.ndarray, frames: int, time_info, status):
+        """오디오 스레드: 링 버퍼에 쓰고 발화 시작/끝만 판단 (블로킹 호출 없음)"""
+        if status:
+            self.input_errors += 1
+        self.ring.write(indata)
+        written = self.ring.written
+        rms = np.sqrt(np.mean(np.square(indata, dtype=np.float32))) / 32768.0
+        voiced = rms >= self.threshold
+
+        if self.speech_start is None:
+            self._voiced_run = self._voiced_run + 1 if voiced else 0
+            if self._voiced_run >= self.start_blocks:
+                first_voiced = written - self._voiced_run * frames
+                self.speech_start = max(self.ring.oldest(), first_voiced - self.pre_roll)
+                self._marks.put(written)
+            elif self.wait_samples and written >= self.wait_samples:
+                raise sd.CallbackStop  # 대기 시간 안에 발화 없음
+            return
+
+        self._silent_run = 0 if voiced else self._silent_run + 1
+        # 무음은 tail_ms까지만 넘기고 나머지는 발화가 이어질 때까지 보류 (끝나면 버림)
+        available = written - max(0, self._silent_run * frames - self.tail)
+        if self._silent_run >= self.silence_blocks:
+            self.speech_end = available
+        elif written - self.speech_start >= self.max_samples:
+            self.speech_end = min(available, self.speech_start + self.max_samples)
+        if self.speech_end is not None:
+            self._marks.put(self.speech_end)
+            raise sd.CallbackStop
+        self._marks.put(available)
+
+    def _finish(self):
+        """스트림 종료 (무음, 최대 길이, 대기 시간 초과, stop 호출)"""
+        self._marks.put(None)
+
+    def _send_loop(self):
+        """전달 스레드: 표시된 위치까지의 새 조각을 sink로 전달"""
+        position = None
+        try:
+            while True:
+                mark = self._marks.get()
+                if mark is None:
+                    break
+                if position is None:
+                    position = self.speech_start
+                if position < self.ring.oldest():
+                    self.overruns += 1
+                    logger.warning("녹음 전달이 밀려 %d샘플을 건너뜁니다.", self.ring.oldest() - position)
+                    position = self.ring.oldest()
+                for chunk in self.ring.views(position, mark):
+                    for sink in self.sinks:
+                        sink.write(chunk)
+                position = max(position, mark)
+        except Exception:
+            logger.exception("녹음 전달 실패")
+        finally:
+            for sink in self.sinks:
+                try:
+                    sink.close()
+                except Exception:
+                    logger.exception("녹음 출력 닫기 실패")
+            self._done.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """녹음과 전달이 모두 끝날 때까지 대기"""
+        return self._done.wait(timeout)
+
+    def stop(self):
+        """녹음을 즉시 끝내고 지금까지의 발화를 전달한 뒤 sink를 닫음"""
+        if self._stream is not None:
+            self._stream.stop()  # 이미 끝난 스트림이 아니면 finished_callback 호출
+            self._stream.close()
+            self._stream = None
+        if self._sender is not None:
+            self._sender.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def record_audio(filename="kiosk_input.wav", duration=5, samplerate=16000, **options) -> Optional[str]:
+    """말이 끝나면 바로 멈추는 녹음 (최대 duration초), 발화가 없으면 파일을 만들지 않고 None"""
+    with AudioCapture([WavFileSink(filename, samplerate)], samplerate=samplerate,
+                      max_seconds=duration, **options) as capture:
+        capture.wait()
+    if not capture.speech_detected:
+        return None
+    logger.info("녹음 완료: %s (%.1f초)", filename, capture.duration)
+    return filename
+
 
-record_audio(duration=5)
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    record_audio(duration=5)
@@ -0,0 +1,179 @@
+"""
+비동기 구조화 로깅
+요청 경로에서는 로그 레코드를 메모리 대기열에 넣기만 하고, 문자열 포맷팅과 디스크 쓰기는
+백그라운드 스레드가 처리합니다. 느린 eMMC 저장소에서도 로그 쓰기가 응답 시간에 포함되지 않습니다.
+
+- 파일 로그는 JSON lines 형식이며 크기 기준으로 교체(rotation)됩니다.
+- 요청 이벤트(kiosk.requests)는 비율 샘플링할 수 있으며, 실패/느린 요청은 항상 기록합니다.
+- 대기열이 가득 차면 기다리지 않고 버린 뒤 개수만 셉니다.
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+from typing import List, Optional
+
+REQUEST_LOGGER = "kiosk.requests"
+
+# LogRecord 기본 속성 (extra로 넘긴 필드와 구분)
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """로그 레코드 → JSON 한 줄 (extra로 넘긴 필드 포함)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(_extra_fields(record))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def _extra_fields(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in record.__dict__.items()
+            if key not in _RECORD_ATTRS and not key.startswith("_")}
+
+
+class ConsoleFormatter(logging.Formatter):
+    """콘솔용 한 줄 형식 (extra 필드는 key=value로 덧붙임)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = _extra_fields(record)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items() if key != "event")
+        return line
+
+
+class RequestSampler(logging.Filter):
+    """요청 이벤트 샘플링 (경고 이상, 실패, 느린 요청은 항상 통과)"""
+
+    def __init__(self, rate: float = 1.0, slow_ms: float = 0.0):
+        super().__init__()
+        self.rate = min(1.0, max(0.0, rate))
+        self.slow_ms = slow_ms
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1.0 or record.levelno > logging.INFO or record.name != REQUEST_LOGGER:
+            return True
+        if getattr(record, "success", True) is False:
+            return True
+        if self.slow_ms and getattr(record, "duration_ms", 0) >= self.slow_ms:
+            return True
+        return random.random() < self.rate
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """레코드를 포맷하지 않고 그대로 대기열에 넣는 핸들러 (가득 차면 버림)"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 같은 프로세스 안에서만 전달하므로 포맷팅은 백그라운드 스레드에 맡김
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class AsyncLogWriter:
+    """루트 로거에 대기열 핸들러를 달고 백그라운드 스레드에서 콘솔/파일로 기록"""
+
+    def __init__(self, level: int = logging.INFO, log_file: str = "", max_bytes: int = 10 * 1024 * 1024,
+                 backup_count: int = 5, queue_size: int = 10000, sample_rate: float = 1.0,
+                 slow_ms: float = 0.0, console: bool = True,
+                 console_format: str = "%(levelname)s:%(name)s:%(message)s"):
+        self.level = level
+        self.log_file = log_file
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.queue_size = queue_size
+        self.console = console
+        self.console_format = console_format
+        self.handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+        self.handler.addFilter(RequestSampler(sample_rate, slow_ms))
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        self._lock = threading.Lock()
+        self._fork_hook = False
+
+    def _build_handlers(self) -> List[logging.Handler]:
+        handlers: List[logging.Handler] = []
+        if self.console:
+            console = logging.StreamHandler()
+            console.setFormatter(ConsoleFormatter(self.console_format))
+            handlers.append(console)
+        if self.log_file:
+            # 멀티 프로세스 모드에서는 {pid}로 워커별 파일을 나누어 교체 시 충돌하지 않도록 함
+            path = self.log_file.format(pid=os.getpid())
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding="utf-8"
+            )
+            file_handler.setFormatter(JsonLinesFormatter())
+            handlers.append(file_handler)
+        return handlers
+
+    def start(self):
+        """루트 로거 설정 후 기록 스레드 시작 (기존 루트 핸들러는 교체)"""
+        with self._lock:
+            if self._listener is not None:
+                return
+            root = logging.getLogger()
+            for existing in list(root.handlers):
+                root.removeHandler(existing)
+            root.addHandler(self.handler)
+            root.setLevel(self.level)
+            self._listener = logging.handlers.QueueListener(
+                self.handler.queue, *self._build_handlers(), respect_handler_level=True
+            )
+            self._listener.start()
+        if hasattr(os, "register_at_fork") and not self._fork_hook:
+            os.register_at_fork(after_in_child=self._restart_in_child)
+            self._fork_hook = True
+
+    def _restart_in_child(self):
+        """fork된 워커에는 기록 스레드가 없으므로 새 대기열/스레드/파일 핸들러로 다시 시작"""
+        self._lock = threading.Lock()
+        if self._listener is None:
+            return
+        self.handler.queue = queue.Queue(maxsize=self.queue_size)
+        self.handler.dropped = 0
+        self._listener = logging.handlers.QueueListener(
+            self.handler.queue, *self._build_handlers(), respect_handler_level=True
+        )
+        self._listener.start()
+
+    def stop(self):
+        """남은 레코드를 모두 기록하고 스레드 종료"""
+        with self._lock:
+            listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+            # 이후 로그는 기본 stderr 출력(logging.lastResort)으로
+            logging.getLogger().removeHandler(self.handler)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.handler.queue.qsize(),
+            "queue_size": self.queue_size,
+            "dropped": self.handler.dropped,
+            "file": self.log_file.format(pid=os.getpid()) if self.log_file else None,
+        }
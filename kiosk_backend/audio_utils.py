@@ -0,0 +1,288 @@
+"""
+오디오 디코딩 유틸리티
+업로드된 WAV/PCM 데이터를 임시 파일 없이 메모리에서 바로 Whisper 입력(16kHz mono float32)으로 변환합니다.
+WAV와 원시 PCM은 16kHz가 아니면 메모리에서 리샘플링합니다 (원시 PCM은 헤더가 없어 ffmpeg로 넘길 수 없음).
+FLAC/Ogg(Opus, Vorbis)는 compressed_audio.py에서 메모리 디코딩하고, 그 외 압축 포맷(mp3, m4a, webm 등)만 ffmpeg 경로를 사용합니다.
+"""
+
+import io
+import os
+import struct
+import subprocess
+import tempfile
+import wave
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+# Whisper 입력 샘플레이트
+SAMPLE_RATE = 16000
+
+# 메모리에서 바로 디코딩하는 원시 PCM Content-Type
+RAW_PCM_TYPES = {
+    "audio/pcm": "<",   # 16bit little-endian
+    "audio/l16": ">",   # RFC 2586: 16bit big-endian
+}
+
+# 원시 PCM으로 받는 샘플레이트/채널 범위
+PCM_RATE_RANGE = (8000, 48000)
+PCM_MAX_CHANNELS = 8
+
+# Content-Type → 포맷 이름 (브라우저/녹음 앱마다 다른 MIME 이름을 하나로 묶음)
+AUDIO_MIME_FORMATS = {
+    "audio/wav": "wav", "audio/wave": "wav", "audio/x-wav": "wav", "audio/vnd.wave": "wav",
+    "audio/mp3": "mp3", "audio/mpeg": "mp3",
+    "audio/m4a": "m4a", "audio/mp4": "m4a", "audio/x-m4a": "m4a", "audio/aac": "m4a",
+    "audio/ogg": "ogg", "audio/opus": "ogg",
+    "audio/webm": "webm",
+    "audio/flac": "flac", "audio/x-flac": "flac",
+    "audio/pcm": "pcm", "audio/l16": "pcm",
+}
+
+# 일괄 처리 스크립트에서 음성 파일로 취급할 확장자
+AUDIO_FILE_SUFFIXES = {".wav", ".mp3", ".m4a", ".ogg", ".opus", ".webm", ".flac"}
+
+
+class AudioDecodeError(Exception):
+    """오디오 데이터를 디코딩할 수 없을 때 발생"""
+
+
+def parse_content_type(content_type: Optional[str]) -> tuple:
+    """'audio/L16; rate=16000' 형태의 Content-Type을 (소문자 MIME, 파라미터 dict)로 분리"""
+    if not content_type:
+        return "", {}
+    parts = [p.strip() for p in content_type.split(";")]
+    params = {}
+    for part in parts[1:]:
+        if "=" in part:
+            key, value = part.split("=", 1)
+            params[key.strip().lower()] = value.strip().strip('"')
+    return parts[0].lower(), params
+
+
+def parse_pcm_params(params: dict) -> tuple:
+    """원시 PCM Content-Type 파라미터 → (샘플레이트, 채널 수), 지원 범위를 벗어나면 AudioDecodeError"""
+    try:
+        rate, channels = int(params.get("rate", SAMPLE_RATE)), int(params.get("channels", 1))
+    except ValueError:
+        raise AudioDecodeError(f"원시 PCM 파라미터가 올바르지 않습니다: rate={params.get('rate')}, channels={params.get('channels')}")
+    low, high = PCM_RATE_RANGE
+    if not low <= rate <= high:
+        raise AudioDecodeError(f"지원하지 않는 원시 PCM 샘플레이트입니다: {rate}Hz (지원: {low}~{high}Hz, 권장 {SAMPLE_RATE}Hz)")
+    if not 1 <= channels <= PCM_MAX_CHANNELS:
+        raise AudioDecodeError(f"지원하지 않는 원시 PCM 채널 수입니다: {channels} (지원: 1~{PCM_MAX_CHANNELS})")
+    return rate, channels
+
+
+def is_wav(data: bytes) -> bool:
+    """RIFF/WAVE 헤더 여부 확인"""
+    return len(data) >= 12 and data[:4] == b"RIFF" and data[8:12] == b"WAVE"
+
+
+def sniff_audio_format(head: bytes) -> Optional[str]:
+    """파일 앞부분의 매직 바이트로 포맷 판별 (알 수 없으면 None, 헤더가 없는 원시 PCM도 None)"""
+    if is_wav(head):
+        return "wav"
+    if head[:4] == b"OggS":
+        return "ogg"
+    if head[:4] == b"fLaC":
+        return "flac"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if head[4:8] == b"ftyp":
+        return "m4a"
+    if head[:3] == b"ID3" or (len(head) >= 2 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return "mp3"
+    return None
+
+
+@dataclass
+class WavHeader:
+    """WAV 헤더 정보 (data_size는 녹음 중 기록된 파일처럼 길이를 모르면 None)"""
+    channels: int
+    sample_rate: int
+    sample_width: int
+    byte_rate: int
+    data_size: Optional[int]
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.data_size is None or self.byte_rate <= 0:
+            return None
+        return self.data_size / self.byte_rate
+
+
+def parse_wav_header(head: bytes) -> Optional[WavHeader]:
+    """RIFF 청크를 따라가며 fmt/data 청크 정보를 읽음 (앞부분만 있어도 됨, 형식이 잘못되면 None)"""
+    if not is_wav(head):
+        return None
+    offset = 12
+    fmt = None
+    while offset + 8 <= len(head):
+        chunk_id, chunk_size = head[offset:offset + 4], struct.unpack_from("<I", head, offset + 4)[0]
+        body = offset + 8
+        if chunk_id == b"fmt " and body + 16 <= len(head):
+            _, channels, sample_rate, byte_rate, _, bits = struct.unpack_from("<HHIIHH", head, body)
+            fmt = (channels, sample_rate, byte_rate, (bits + 7) // 8)
+        elif chunk_id == b"data":
+            if fmt is None:
+                return None
+            channels, sample_rate, byte_rate, sample_width = fmt
+            # 스트리밍 녹음기는 길이를 0 또는 0xFFFFFFFF로 남김
+            data_size = chunk_size if 0 < chunk_size < 0xFFFFFFFF else None
+            return WavHeader(channels, sample_rate, sample_width, byte_rate, data_size)
+        offset = body + chunk_size + (chunk_size & 1)  # 청크는 짝수 바이트 단위로 정렬
+    return None
+
+
+@dataclass
+class StreamInfo:
+    """압축 포맷 헤더에서 읽은 정보 (frames는 길이를 알 수 없으면 None)"""
+    sample_rate: int
+    channels: int
+    frames: Optional[int]
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.frames is None or self.sample_rate <= 0:
+            return None
+        return self.frames / self.sample_rate
+
+
+def parse_flac_streaminfo(head: bytes) -> Optional[StreamInfo]:
+    """FLAC STREAMINFO 블록(항상 첫 메타데이터 블록)에서 샘플레이트/채널/전체 샘플 수를 읽음"""
+    if len(head) < 8 + 34 or head[:4] != b"fLaC" or head[4] & 0x7F != 0:
+        return None
+    info = int.from_bytes(head[8 + 10:8 + 18], "big")  # 샘플레이트 20bit, 채널-1 3bit, 비트수-1 5bit, 샘플 수 36bit
+    sample_rate = info >> 44
+    channels = ((info >> 41) & 0x7) + 1
+    frames = info & 0xFFFFFFFFF
+    return StreamInfo(sample_rate, channels, frames or None)
+
+
+def parse_ogg_info(data) -> Optional[StreamInfo]:
+    """Ogg Opus/Vorbis 길이 계산 (첫 페이지의 코덱 헤더 + 마지막 페이지의 granule position, bytes/bytearray)"""
+    if len(data) < 28 or data[:4] != b"OggS":
+        return None
+    payload = data[27 + data[26]:]
+    if payload[:8] == b"OpusHead" and len(payload) >= 12:
+        # Opus는 항상 48kHz로 디코딩되며, 앞부분 pre-skip 샘플은 버려짐
+        sample_rate, channels, skip = 48000, payload[9], struct.unpack_from("<H", payload, 10)[0]
+    elif payload[:7] == b"\x01vorbis" and len(payload) >= 16:
+        channels, sample_rate, skip = payload[11], struct.unpack_from("<I", payload, 12)[0], 0
+    else:
+        return None
+    last = data.rfind(b"OggS", max(0, len(data) - 65536))  # 페이지 최대 크기 약 64KB
+    frames = None
+    if last >= 0 and last + 14 <= len(data):
+        granule = struct.unpack_from("<q", data, last + 6)[0]
+        frames = granule - skip if granule > skip else None
+    return StreamInfo(sample_rate, channels, frames)
+
+
+def pcm_to_float32(frames: bytes, sample_width: int, channels: int = 1, byteorder: str = "<") -> np.ndarray:
+    """정수 PCM 바이트를 [-1, 1] 범위의 mono float32 배열로 변환"""
+    if sample_width > 0:
+        # 잘린 마지막 샘플은 버림
+        frames = frames[:len(frames) - len(frames) % sample_width]
+
+    if sample_width == 1:
+        # 8bit WAV는 unsigned
+        audio = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        audio = np.frombuffer(frames, dtype=f"{byteorder}i2").astype(np.float32) / 32768.0
+    elif sample_width == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        if byteorder == ">":
+            raw = raw[:, ::-1]
+        values = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        values = np.where(values >= 1 << 23, values - (1 << 24), values)
+        audio = values.astype(np.float32) / float(1 << 23)
+    elif sample_width == 4:
+        audio = np.frombuffer(frames, dtype=f"{byteorder}i4").astype(np.float32) / float(1 << 31)
+    else:
+        raise AudioDecodeError(f"지원하지 않는 샘플 크기입니다: {sample_width}바이트")
+
+    if channels > 1:
+        audio = audio[:len(audio) - len(audio) % channels].reshape(-1, channels).mean(axis=1)
+    return np.ascontiguousarray(audio, dtype=np.float32)
+
+
+def decode_wav(data: bytes) -> Optional[np.ndarray]:
+    """PCM WAV를 메모리에서 디코딩 (16kHz가 아니면 리샘플링), wave 모듈이 읽지 못하는 포맷이면 None"""
+    try:
+        with wave.open(io.BytesIO(data), "rb") as wav:
+            rate, width, channels = wav.getframerate(), wav.getsampwidth(), wav.getnchannels()
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError):
+        # float WAV 등 wave 모듈이 읽지 못하는 포맷은 ffmpeg로 처리
+        return None
+    if rate <= 0:
+        raise AudioDecodeError(f"WAV 샘플레이트가 올바르지 않습니다: {rate}")
+    return resample(pcm_to_float32(frames, width, channels), rate)
+
+
+def encode_wav(audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """mono float32 배열을 16bit PCM WAV 바이트로 변환"""
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def resample(audio: np.ndarray, src_rate: int) -> np.ndarray:
+    """mono float32 배열을 16kHz로 리샘플링 (1초 블록 단위로 처리하여 임시 메모리 제한)"""
+    if src_rate == SAMPLE_RATE:
+        return audio
+    from compressed_audio import SincResampler  # compressed_audio가 이 모듈을 import하므로 지연 import
+
+    resampler = SincResampler(src_rate)
+    blocks = [resampler.process(audio[i:i + src_rate]) for i in range(0, len(audio), src_rate)]
+    blocks.append(resampler.flush())
+    return np.concatenate(blocks)
+
+
+def decode_in_memory(data: bytes, content_type: Optional[str] = None) -> Optional[np.ndarray]:
+    """WAV/원시 PCM 업로드를 float32 배열로 변환, 메모리에서 처리할 수 없으면 None
+
+    원시 PCM은 ffmpeg로 넘길 수 없으므로 지원하지 않는 파라미터면 AudioDecodeError를 냅니다.
+    """
+    if is_wav(data):
+        return decode_wav(data)
+
+    mime, params = parse_content_type(content_type)
+    if mime in RAW_PCM_TYPES:
+        rate, channels = parse_pcm_params(params)
+        return resample(pcm_to_float32(data, 2, channels, RAW_PCM_TYPES[mime]), rate)
+
+    return None
+
+
+def decode_with_ffmpeg(data: bytes, suffix: str = "") -> np.ndarray:
+    """압축 포맷을 ffmpeg로 16kHz mono float32 배열로 변환 (블로킹 호출)"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+        temp_file.write(data)
+        temp_file_path = temp_file.name
+
+    try:
+        cmd = [
+            "ffmpeg", "-nostdin", "-threads", "0",
+            "-i", temp_file_path,
+            "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE),
+            "-",
+        ]
+        try:
+            out = subprocess.run(cmd, capture_output=True, check=True).stdout
+        except FileNotFoundError:
+            raise AudioDecodeError("ffmpeg가 설치되어 있지 않습니다.")
+        except subprocess.CalledProcessError as e:
+            raise AudioDecodeError(f"오디오 디코딩 실패: {e.stderr.decode(errors='ignore')[-200:]}")
+        return pcm_to_float32(out, 2)
+    finally:
+        if os.path.exists(temp_file_path):
+            os.unlink(temp_file_path)
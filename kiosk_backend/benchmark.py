@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+키오스크 API 부하 테스트 / 벤치마크
+intent_dataset.csv 문장과 WAV 파일 디렉토리를 /text-to-intent, /voice-to-intent 로 재생하여
+처리량과 p50/p95/p99 지연 시간을 측정하고, 릴리스 간 비교할 수 있도록 JSON으로 저장합니다.
+
+사용 예:
+    # 동시 요청 8개로 30초간 (닫힌 루프: 응답을 받으면 바로 다음 요청)
+    python benchmark.py --endpoint text --concurrency 8 --duration 30
+
+    # 초당 5건 도착 (열린 루프, 포아송 도착), 음성 파일 재생
+    python benchmark.py --endpoint voice --wav-dir ../recordings --rate 5 --duration 60 --output results/v1.json
+
+    # 이전 결과와 비교
+    python benchmark.py --endpoint mixed --wav-dir ../recordings --rate 10 --compare results/v1.json
+
+같은 문장/파일을 반복해서 보내므로 서버 결과 캐시가 켜져 있으면 LRU 조회 시간을 재게 됩니다.
+서버를 INTENT_CACHE_SIZE=0 AUDIO_CACHE_SIZE=0 으로 실행하세요. 측정 전 /admin/cache 를 비우고,
+측정 중 캐시 적중이 있으면 결과에 기록하고 종료 코드 3으로 끝납니다 (--allow-cache-hits 로 허용).
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+TEXT_PATH = "/text-to-intent"
+VOICE_PATH = "/voice-to-intent"
+
+CACHE_PATH = "/admin/cache"
+
+# 비교 시 회귀로 표시할 기준 (지연 시간 증가율 / 처리량 감소율)
+REGRESSION_THRESHOLD = 0.10
+
+
+@dataclass
+class EndpointResult:
+    """엔드포인트 하나의 측정 결과"""
+    latencies_ms: List[float] = field(default_factory=list)
+    status_codes: Dict[str, int] = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+    correct: int = 0
+    labeled: int = 0
+
+    def record(self, latency_ms: float, status: Optional[int], error: Optional[str] = None):
+        self.latencies_ms.append(latency_ms)
+        key = str(status) if status is not None else "error"
+        self.status_codes[key] = self.status_codes.get(key, 0) + 1
+        if error:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def summary(self, elapsed: float) -> dict:
+        total = len(self.latencies_ms)
+        ok = self.status_codes.get("200", 0)
+        result = {
+            "requests": total,
+            "ok": ok,
+            "error_rate": round(1 - ok / total, 4) if total else 0.0,
+            "throughput_rps": round(ok / elapsed, 2) if elapsed > 0 else 0.0,
+            "status_codes": self.status_codes,
+            "errors": self.errors,
+        }
+        if self.labeled:
+            result["accuracy"] = round(self.correct / self.labeled, 4)
+        if total:
+            latencies = np.asarray(self.latencies_ms)
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            result["latency_ms"] = {
+                "mean": round(float(latencies.mean()), 1),
+                "p50": round(float(p50), 1),
+                "p95": round(float(p95), 1),
+                "p99": round(float(p99), 1),
+                "max": round(float(latencies.max()), 1),
+            }
+        return result
+
+
+def load_texts(dataset_path: str) -> List[dict]:
+    """데이터셋 문장과 정답 의도"""
+    with open(dataset_path, encoding="utf-8-sig") as f:
+        return [{"text": row["text"], "intent": int(row["intent"])} for row in csv.DictReader(f)]
+
+
+def load_wavs(wav_dir: str) -> List[dict]:
+    """WAV 파일 목록 (파일명이 '<의도>_...' 형식이면 정답 의도로 사용)"""
+    clips = []
+    for path in sorted(Path(wav_dir).glob("**/*.wav")):
+        prefix = path.stem.split("_", 1)[0]
+        clips.append({
+            "name": path.name,
+            "content": path.read_bytes(),
+            "intent": int(prefix) if prefix.isdigit() else None,
+        })
+    return clips
+
+
+class Benchmark:
+    """닫힌 루프(동시 요청 수 고정) 또는 열린 루프(도착률 고정) 부하 생성기"""
+
+    def __init__(self, client: httpx.AsyncClient, texts: List[dict], clips: List[dict],
+                 endpoint: str, voice_ratio: float = 0.5, profile: Optional[str] = None):
+        self.client = client
+        self.texts = texts
+        self.clips = clips
+        self.endpoint = endpoint
+        self.voice_ratio = voice_ratio
+        self.profile = profile
+        self.results = {TEXT_PATH: EndpointResult(), VOICE_PATH: EndpointResult()}
+        self._index = 0
+
+    def next_request(self) -> tuple:
+        """다음에 보낼 (경로, 항목)을 데이터셋 순서대로 순환하며 선택"""
+        self._index += 1
+        if self.endpoint == "voice" or (self.endpoint == "mixed" and random.random() < self.voice_ratio):
+            return VOICE_PATH, self.clips[self._index % len(self.clips)]
+        return TEXT_PATH, self.texts[self._index % len(self.texts)]
+
+    async def send(self, path: str, item: dict, scheduled: float, record: bool = True):
+        """요청 1건 전송 (지연 시간은 예정 시각부터 측정하여 클라이언트 측 대기도 포함)"""
+        status, error, body = None, None, None
+        try:
+            if path == TEXT_PATH:
+                response = await self.client.post(path, json={"text": item["text"]})
+            else:
+                response = await self.client.post(
+                    path,
+                    files={"audio": (item["name"], item["content"], "audio/wav")},
+                    params={"profile": self.profile} if self.profile else None,
+                )
+            status = response.status_code
+            if status == 200:
+                body = response.json()
+        except httpx.HTTPError as e:
+            error = type(e).__name__
+        latency_ms = (time.perf_counter() - scheduled) * 1000
+        if not record:
+            return
+        result = self.results[path]
+        result.record(latency_ms, status, error)
+        if body is not None and item.get("intent") is not None:
+            result.labeled += 1
+            result.correct += int(body.get("predicted_intent") == item["intent"])
+
+    async def run_closed(self, concurrency: int, duration: float, total: Optional[int]):
+        """동시 요청 수 고정: 각 가상 사용자가 응답을 받으면 바로 다음 요청"""
+        deadline = time.perf_counter() + duration
+        remaining = [total] if total else None
+
+        async def user():
+            while time.perf_counter() < deadline:
+                if remaining is not None:
+                    if remaining[0] <= 0:
+                        return
+                    remaining[0] -= 1
+                path, item = self.next_request()
+                await self.send(path, item, time.perf_counter())
+
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+
+    async def run_open(self, rate: float, concurrency: int, duration: float, total: Optional[int]):
+        """도착률 고정: 포아송 간격으로 요청 생성 (최대 동시 요청 수 초과분은 클라이언트에서 대기)"""
+        semaphore = asyncio.Semaphore(concurrency)
+        tasks = []
+        start = time.perf_counter()
+        scheduled = start
+        sent = 0
+
+        async def fire(path, item, at):
+            async with semaphore:
+                await self.send(path, item, at)
+
+        while scheduled - start < duration and (not total or sent < total):
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            path, item = self.next_request()
+            tasks.append(asyncio.create_task(fire(path, item, scheduled)))
+            sent += 1
+            scheduled += random.expovariate(rate)
+        await asyncio.gather(*tasks)
+
+    async def warmup(self, count: int):
+        """모델 지연 로드/캐시 생성 영향을 줄이기 위한 사전 요청 (결과에서 제외)"""
+        for _ in range(count):
+            path, item = self.next_request()
+            await self.send(path, item, time.perf_counter(), record=False)
+
+
+async def cache_request(client: httpx.AsyncClient, method: str, token: str) -> Optional[dict]:
+    """서버 결과 캐시 통계 조회/비우기 (관리자 API를 쓸 수 없으면 None)"""
+    try:
+        response = await client.request(method, CACHE_PATH, headers={"X-Admin-Token": token} if token else None)
+        return response.json() if response.status_code == 200 else None
+    except (httpx.HTTPError, ValueError):
+        return None
+
+
+def cache_usage(before: Optional[dict], after: Optional[dict]) -> Optional[dict]:
+    """측정 구간의 캐시별 적중/실패 수 (통계 차이)"""
+    if before is None or after is None:
+        return None
+    usage = {}
+    for name, stats in after.items():
+        hits = stats["hits"] - before.get(name, {}).get("hits", 0)
+        misses = stats["misses"] - before.get(name, {}).get("misses", 0)
+        usage[name] = {
+            "enabled": stats["enabled"],
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        }
+    return usage
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: dict, baseline: dict) -> List[str]:
+    """이전 결과 대비 변화 (처리량 감소/지연 증가가 기준을 넘으면 회귀로 표시)"""
+    lines = []
+    keys = ("endpoint", "mode", "rate", "concurrency", "profile")
+    changed = [key for key in keys if current["config"].get(key) != baseline.get("config", {}).get(key)]
+    if changed:
+        lines.append(f"참고: 부하 설정이 다릅니다 ({', '.join(changed)}) — 같은 조건의 결과끼리 비교하세요.")
+    for path, result in current["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(path)
+        if not before or not result.get("latency_ms") or not before.get("latency_ms"):
+            continue
+        lines.append(f"{path}")
+        metrics = [("throughput_rps", result["throughput_rps"], before["throughput_rps"], False)]
+        metrics += [
+            (f"latency {key}", result["latency_ms"][key], before["latency_ms"][key], True)
+            for key in ("p50", "p95", "p99")
+        ]
+        for name, now, then, lower_is_better in metrics:
+            change = (now - then) / then if then else 0.0
+            worse = change > REGRESSION_THRESHOLD if lower_is_better else change < -REGRESSION_THRESHOLD
+            lines.append(f"  {name:<16} {then:>9} → {now:>9} ({change:+.1%}){'  ⚠️ 회귀' if worse else ''}")
+    return lines
+
+
+async def run(args) -> dict:
+    texts = load_texts(args.dataset) if args.endpoint in ("text", "mixed") else []
+    clips = load_wavs(args.wav_dir) if args.endpoint in ("voice", "mixed") and args.wav_dir else []
+    if args.endpoint in ("voice", "mixed") and not clips:
+        raise SystemExit("음성 벤치마크에는 WAV 파일이 있는 --wav-dir 가 필요합니다.")
+    if args.endpoint == "text" and not texts:
+        raise SystemExit(f"데이터셋에 문장이 없습니다: {args.dataset}")
+    if args.shuffle:
+        random.shuffle(texts)
+        random.shuffle(clips)
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        server_health = None
+        try:
+            server_health = (await client.get("/health")).json()
+        except (httpx.HTTPError, ValueError):
+            raise SystemExit(f"서버에 연결할 수 없습니다: {args.url}")
+
+        # 이전 실행/워밍업 결과가 캐시에 남아 측정에 섞이지 않도록 비움
+        cleared = await cache_request(client, "DELETE", args.admin_token) is not None
+        bench = Benchmark(client, texts, clips, args.endpoint, args.voice_ratio, args.profile)
+        await bench.warmup(args.warmup)
+        if cleared:
+            await cache_request(client, "DELETE", args.admin_token)
+        cache_before = await cache_request(client, "GET", args.admin_token)
+        start = time.perf_counter()
+        if args.rate > 0:
+            await bench.run_open(args.rate, args.concurrency, args.duration, args.requests)
+        else:
+            await bench.run_closed(args.concurrency, args.duration, args.requests)
+        elapsed = time.perf_counter() - start
+        cache_after = await cache_request(client, "GET", args.admin_token)
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "host": {"platform": platform.platform(), "python": platform.python_version()},
+        "config": {
+            "url": args.url,
+            "endpoint": args.endpoint,
+            "mode": "open" if args.rate > 0 else "closed",
+            "rate": args.rate,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "voice_ratio": args.voice_ratio if args.endpoint == "mixed" else None,
+            "profile": args.profile,
+            "texts": len(texts),
+            "clips": len(clips),
+        },
+        "server": {
+            key: server_health.get(key)
+            for key in ("role", "models_loaded", "inference", "batching")
+            if key in server_health
+        },
+        "cache": {"cleared": cleared, "usage": cache_usage(cache_before, cache_after)},
+        "elapsed_s": round(elapsed, 2),
+        "endpoints": {
+            path: result.summary(elapsed)
+            for path, result in bench.results.items()
+            if result.latencies_ms
+        },
+    }
+
+
+def print_report(report: dict):
+    config = report["config"]
+    mode = f"도착률 {config['rate']}/s" if config["mode"] == "open" else f"동시 요청 {config['concurrency']}"
+    print(f"=== 벤치마크 결과 ({mode}, {report['elapsed_s']}초) ===")
+    for path, result in report["endpoints"].items():
+        latency = result.get("latency_ms", {})
+        print(f"{path}")
+        print(f"  요청 {result['requests']}건, 성공 {result['ok']}건, 오류율 {result['error_rate']:.2%}")
+        print(f"  처리량 {result['throughput_rps']} req/s")
+        if latency:
+            print(f"  지연 시간(ms) p50 {latency['p50']} / p95 {latency['p95']} / p99 {latency['p99']} / max {latency['max']}")
+        if "accuracy" in result:
+            print(f"  의도 정확도 {result['accuracy']:.2%}")
+        if result["errors"]:
+            print(f"  연결 오류 {result['errors']}")
+
+    usage = report["cache"]["usage"]
+    if usage is None:
+        print("⚠️  /admin/cache 통계를 읽지 못해 캐시 적중 여부를 확인할 수 없습니다 (--admin-token 확인).")
+        return
+    for name, stats in usage.items():
+        if stats["hits"]:
+            print(f"⚠️  {name} 캐시 적중 {stats['hits']}건 (적중률 {stats['hit_rate']:.1%}) — "
+                  f"결과에 캐시 조회 시간이 섞였습니다. 서버를 {name.upper()}_CACHE_SIZE=0 으로 실행하세요.")
+
+
+def cache_hits(report: dict) -> int:
+    usage = report["cache"]["usage"] or {}
+    return sum(stats["hits"] for stats in usage.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="키오스크 API 벤치마크")
+    parser.add_argument("--url", default="http://localhost:8000", help="서버 주소")
+    parser.add_argument("--endpoint", choices=["text", "voice", "mixed"], default="text")
+    parser.add_argument("--dataset", default="../intent_dataset.csv", help="문장 데이터셋 (text, intent 열)")
+    parser.add_argument("--wav-dir", help="재생할 WAV 파일 디렉토리 (파일명 '<의도>_*.wav'면 정확도도 측정)")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시 요청 수 (열린 루프에서는 최대 동시 요청 수)")
+    parser.add_argument("--rate", type=float, default=0.0, help="초당 도착 요청 수 (0이면 닫힌 루프)")
+    parser.add_argument("--duration", type=float, default=30.0, help="측정 시간(초)")
+    parser.add_argument("--requests", type=int, help="최대 요청 수 (지정 시 측정 시간 전에 끝날 수 있음)")
+    parser.add_argument("--warmup", type=int, default=5, help="결과에서 제외할 사전 요청 수")
+    parser.add_argument("--voice-ratio", type=float, default=0.5, help="mixed 모드에서 음성 요청 비율")
+    parser.add_argument("--profile", help="음성 요청 디코딩 프로필")
+    parser.add_argument("--timeout", type=float, default=60.0, help="요청 제한 시간(초)")
+    parser.add_argument("--admin-token", default=os.getenv("ADMIN_TOKEN", ""), help="/admin/cache 관리자 토큰 (기본: ADMIN_TOKEN)")
+    parser.add_argument("--allow-cache-hits", action="store_true", help="측정 중 서버 캐시 적중을 허용 (캐시 포함 성능 측정)")
+    parser.add_argument("--shuffle", action="store_true", help="재생 순서 무작위")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    if args.concurrency < 1:
+        parser.error("--concurrency는 1 이상이어야 합니다.")
+    random.seed(args.seed)
+
+    report = asyncio.run(run(args))
+    print_report(report)
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n결과 저장: {output}")
+
+    if cache_hits(report) and not args.allow_cache_hits:
+        print("\n✗ 측정 중 서버 캐시 적중이 있어 모델 성능 결과로 비교할 수 없습니다.")
+        sys.exit(3)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        print(f"\n=== 비교: {baseline.get('revision') or baseline.get('timestamp')} → {report.get('revision') or report['timestamp']} ===")
+        lines = compare(report, baseline)
+        print("\n".join(lines) if lines else "비교할 공통 엔드포인트가 없습니다.")
+        if any("회귀" in line for line in lines):
+            sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+녹음 파일 일괄 음성 인식 / 의도 라벨링
+디렉토리 아래의 녹음 파일(voice_saver.py가 만든 kiosk_input.wav 등)을 프로세스 풀에 나누어
+Whisper로 인식하고, 서버와 같은 의도 분류 단계(키워드 → 모델)로 라벨을 붙여 CSV/JSONL로 저장합니다.
+프로세스마다 모델을 한 번만 로드하며, 결과는 파일 하나를 끝낼 때마다 바로 기록합니다.
+
+중단되어도 다시 실행하면 체크포인트({output}.checkpoint)를 읽어 끝난 파일은 건너뛰고 이어서 처리합니다.
+디코딩/인식에 실패한 파일은 {output}.errors.jsonl에 기록되며 다음 실행 때 다시 시도합니다.
+
+사용 예:
+    python bulk_transcribe.py ../recordings --output labels/recordings.csv --workers 8
+"""
+
+import argparse
+import csv
+import io
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_FIELDS = [
+    "path", "transcribed_text", "predicted_intent", "intent_description", "confidence", "tier",
+    "duration_s", "speech_s", "avg_logprob", "no_speech_prob", "model_size", "elapsed_ms",
+]
+
+# 워커 프로세스별 모델/설정 (초기화 함수에서 한 번만 설정)
+_worker: Dict = {}
+
+
+def find_clips(root: Path, pattern: str) -> List[str]:
+    """root 아래 음성 파일의 상대 경로 목록 (정렬)"""
+    from audio_utils import AUDIO_FILE_SUFFIXES
+
+    return sorted(
+        path.relative_to(root).as_posix() for path in root.glob(pattern)
+        if path.is_file() and path.suffix.lower() in AUDIO_FILE_SUFFIXES
+    )
+
+
+class Checkpoint:
+    """완료된 파일과 그 시점의 출력 파일 크기 기록 (JSON lines, 첫 줄은 실행 설정)
+
+    출력 파일은 마지막으로 기록된 크기로 잘라낸 뒤 이어 쓰므로,
+    중단 시점에 반쯤 쓰인 줄이나 체크포인트에 기록되지 못한 결과가 중복되지 않습니다.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.meta: Optional[dict] = None
+        self.done: Set[str] = set()
+        self.offset = 0
+        self._valid_bytes = 0
+        self._file = None
+
+    def load(self):
+        if not self.path.exists():
+            return
+        data = self.path.read_bytes()
+        # 기록 도중 중단된 마지막 줄은 버림 (이어 쓰기 전에 잘라냄)
+        self._valid_bytes = data.rfind(b"\n") + 1
+        for line in data[:self._valid_bytes].decode("utf-8").splitlines():
+            entry = json.loads(line)
+            if "path" not in entry:
+                self.meta = entry
+                continue
+            self.done.add(entry["path"])
+            self.offset = max(self.offset, entry["offset"])
+
+    def start(self, meta: dict, resume: bool):
+        if resume:
+            self._file = open(self.path, "r+", encoding="utf-8")
+            self._file.truncate(self._valid_bytes)
+            self._file.seek(self._valid_bytes)
+            return
+        self.meta, self.done, self.offset = meta, set(), 0
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write(json.dumps(meta, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def mark(self, path: str, offset: int):
+        self._file.write(json.dumps({"path": path, "offset": offset}, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.done.add(path)
+        self.offset = offset
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class ResultWriter:
+    """결과 한 줄씩 기록 (CSV 또는 JSONL, 줄마다 flush하여 현재 파일 크기 반환)"""
+
+    def __init__(self, path: Path, output_format: str, offset: int):
+        self.format = output_format
+        exists = path.exists() and offset > 0
+        self._file = open(path, "r+b" if exists else "wb")
+        if exists:
+            self._file.truncate(offset)
+            self._file.seek(offset)
+        elif output_format == "csv":
+            # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+            self._file.write(b"\xef\xbb\xbf" + self._encode_csv(OUTPUT_FIELDS))
+
+    @staticmethod
+    def _encode_csv(values: list) -> bytes:
+        line = io.StringIO()
+        csv.writer(line, lineterminator="\n").writerow(values)
+        return line.getvalue().encode("utf-8")
+
+    def write(self, row: dict) -> int:
+        if self.format == "csv":
+            data = self._encode_csv([row.get(field, "") for field in OUTPUT_FIELDS])
+        else:
+            data = (json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8")
+        self._file.write(data)
+        self._file.flush()
+        return self._file.tell()
+
+    def close(self):
+        self._file.close()
+
+
+def _init_worker(options: dict):
+    """워커 프로세스 초기화: 연산 스레드 제한, Whisper/의도 분류 모델 로드 (프로세스당 한 번)"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C는 부모 프로세스가 처리
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s:%(processName)s:%(message)s")
+
+    from config import get_config
+    from decoding_profiles import build_domain_prompt, build_profiles
+    from intent_cascade import build_intent_cascade
+    from keyword_matcher import KeywordMatcher
+    from model_loader import load_whisper_model
+    from prefork import pin_threads
+
+    pin_threads(options["threads"])
+    settings = get_config()
+    profiles = build_profiles(
+        language=settings.WHISPER_LANGUAGE,
+        prompt=settings.WHISPER_PROMPT or build_domain_prompt(settings.INTENT_DATASET_PATH),
+        max_tokens=settings.WHISPER_MAX_TOKENS,
+    )
+    _worker.update(
+        settings=settings,
+        options=options,
+        profile=profiles[options["profile"]],
+        model=load_whisper_model(
+            options["size"], cache_dir=options["cache_dir"], device=options["device"],
+            quantize=settings.WHISPER_QUANTIZE,
+        ),
+        intent_model=load_intent_model(settings),
+        intent_escalation=load_escalation_model(settings),
+        keyword_matcher=KeywordMatcher(settings.INTENT_KEYWORDS),
+    )
+    # 서버와 같은 단계/임계값 (키워드 → 모델 → 저신뢰 재분류)
+    _worker["intent_cascade"] = build_intent_cascade(
+        settings, _worker["keyword_matcher"],
+        get_intent=lambda: _worker["intent_model"],
+        get_escalation=lambda: _worker["intent_escalation"],
+    )
+
+
+def load_intent_model(settings):
+    """서버와 같은 순서로 의도 분류 모델 로드 (컴파일된 모델 우선), 없으면 None (키워드로만 분류)"""
+    from model_loader import load_compiled_intent_model, load_pickle
+    from model_registry import IntentModel
+
+    compiled = os.path.join(settings.INTENT_COMPILED_PATH, "meta.json")
+    if settings.INTENT_MODEL_FORMAT != "pickle" and os.path.exists(compiled):
+        return IntentModel(load_compiled_intent_model(settings.INTENT_COMPILED_PATH), None,
+                           source=settings.INTENT_COMPILED_PATH, version=1)
+    if settings.INTENT_MODEL_FORMAT != "compiled" and os.path.exists(settings.INTENT_MODEL_PATH) \
+            and os.path.exists(settings.VECTORIZER_PATH):
+        return IntentModel(load_pickle(settings.INTENT_MODEL_PATH), load_pickle(settings.VECTORIZER_PATH),
+                           source=settings.INTENT_MODEL_PATH, version=1)
+    logger.warning("의도 분류 모델을 찾을 수 없어 키워드로만 분류합니다.")
+    return None
+
+
+def load_escalation_model(settings):
+    """저신뢰 문장용 컴파일된 모델 (INTENT_ESCALATION_PATH, 설정되지 않았으면 None)"""
+    from model_loader import load_compiled_intent_model
+    from model_registry import IntentModel
+
+    if not settings.INTENT_ESCALATION_PATH:
+        return None
+    return IntentModel(load_compiled_intent_model(settings.INTENT_ESCALATION_PATH), None,
+                       source=settings.INTENT_ESCALATION_PATH, version=1)
+
+
+def classify_intent(text: str) -> tuple:
+    """(의도, 신뢰도, 결정 단계) — 서버 predict_intent_with_confidence와 같은 규칙"""
+    matcher = _worker["keyword_matcher"]
+    # 서버도 의도 분류 모델이 없으면 캐스케이드 없이 키워드 점수로 응답
+    classified = _worker["intent_cascade"].classify(text) if _worker["intent_model"] is not None else None
+    return classified if classified is not None else (*matcher.predict(text), "keyword")
+
+
+def process_clip(relative_path: str) -> tuple:
+    """파일 하나 인식/분류 → (상대 경로, 결과 행 또는 None, 오류 메시지 또는 None)"""
+    import numpy as np
+    import torch
+    import whisper
+
+    from audio_utils import SAMPLE_RATE, decode_in_memory, decode_with_ffmpeg, sniff_audio_format
+    from compressed_audio import IN_PROCESS_FORMATS, decode_compressed
+    from vad import trim_silence
+
+    settings, options, profile, model = _worker["settings"], _worker["options"], _worker["profile"], _worker["model"]
+    start = time.perf_counter()
+    try:
+        path = Path(options["root"]) / relative_path
+        data = path.read_bytes()
+        audio = decode_in_memory(data)
+        if audio is None and sniff_audio_format(data[:64]) in IN_PROCESS_FORMATS:
+            audio = decode_compressed(data)
+        if audio is None:
+            audio = decode_with_ffmpeg(data, path.suffix)
+        duration = len(audio) / SAMPLE_RATE
+
+        # 서버와 같은 전처리 (앞뒤 무음 제거, 최대 길이 제한)
+        if settings.TRIM_SILENCE:
+            audio = trim_silence(audio, threshold=settings.VAD_THRESHOLD)
+        audio = audio[:int(settings.MAX_TRANSCRIBE_SECONDS * SAMPLE_RATE)]
+
+        text, avg_logprob, no_speech_prob = "", None, None
+        if len(audio):
+            fp16 = model.device.type != "cpu"
+            with torch.inference_mode():
+                # 서버와 같이 30초 이하는 한 번에 디코딩하고, 온도 폴백이 필요하면 transcribe로 다시 디코딩
+                decoded = None
+                if len(audio) <= whisper.audio.N_SAMPLES:
+                    mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels=model.dims.n_mels)
+                    decoded = whisper.decode(model, mel.to(model.device), whisper.DecodingOptions(**profile.decoding_options(fp16)))
+                    if profile.needs_fallback(decoded):
+                        decoded = None
+                if decoded is not None:
+                    text, avg_logprob, no_speech_prob = decoded.text.strip(), decoded.avg_logprob, decoded.no_speech_prob
+                else:
+                    result = model.transcribe(audio, **profile.transcribe_options(fp16))
+                    segments = result.get("segments") or []
+                    text = result["text"].strip()
+                    if segments:
+                        avg_logprob = float(np.mean([seg["avg_logprob"] for seg in segments]))
+                        no_speech_prob = float(np.mean([seg["no_speech_prob"] for seg in segments]))
+
+        # 무음/빈 인식 결과는 의도 없이 기록 (라벨링 시 걸러낼 수 있도록)
+        intent, confidence, tier = classify_intent(text) if text else (None, None, None)
+        row = {
+            "path": relative_path,
+            "transcribed_text": text,
+            "predicted_intent": intent,
+            "intent_description": settings.INTENT_MAPPING.get(intent, "알 수 없음") if intent is not None else "",
+            "confidence": round(confidence, 4) if confidence is not None else None,
+            "tier": tier,
+            "duration_s": round(duration, 2),
+            "speech_s": round(len(audio) / SAMPLE_RATE, 2),
+            "avg_logprob": round(avg_logprob, 4) if avg_logprob is not None else None,
+            "no_speech_prob": round(no_speech_prob, 4) if no_speech_prob is not None else None,
+            "model_size": options["size"],
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+        return relative_path, row, None
+    except Exception as e:
+        return relative_path, None, f"{type(e).__name__}: {e}"
+
+
+def warm_model_cache(size: str, cache_dir: Optional[str], device: Optional[str]):
+    """모델 다운로드/캐시 생성을 한 프로세스에서 먼저 수행 (워커들이 같은 파일을 동시에 쓰지 않도록)"""
+    from config import get_config
+    from model_loader import load_whisper_model
+
+    load_whisper_model(size, cache_dir=cache_dir, device=device, quantize=get_config().WHISPER_QUANTIZE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="녹음 파일 일괄 음성 인식 / 의도 라벨링")
+    parser.add_argument("input", help="녹음 파일 디렉토리")
+    parser.add_argument("--output", required=True, help="결과 파일 (.csv 또는 .jsonl)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="출력 형식 (기본: 확장자로 판단)")
+    parser.add_argument("--pattern", default="**/*", help="파일 검색 패턴 (기본: 하위 디렉토리 전체)")
+    parser.add_argument("--workers", type=int, default=0, help="워커 프로세스 수 (0=CPU 코어 수 / 스레드 수)")
+    parser.add_argument("--threads", type=int, default=1, help="워커당 연산 스레드 수")
+    parser.add_argument("--size", default=None, help="Whisper 크기 (기본: WHISPER_MODEL_SIZE)")
+    parser.add_argument("--profile", default=None, help="디코딩 프로필 (기본: WHISPER_DECODING_PROFILE)")
+    parser.add_argument("--cache-dir", default=None, help="체크포인트 캐시 경로 (기본: WHISPER_CACHE_DIR)")
+    parser.add_argument("--device", default=None, help="cpu 또는 cuda (기본: 자동)")
+    parser.add_argument("--limit", type=int, default=0, help="이번 실행에서 처리할 최대 파일 수")
+    parser.add_argument("--restart", action="store_true", help="체크포인트를 무시하고 처음부터 다시 처리")
+    args = parser.parse_args()
+
+    from config import get_config
+    from decoding_profiles import build_profiles
+    from prefork import set_thread_env
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(name)s:%(message)s")
+    settings = get_config()
+    root = Path(args.input).resolve()
+    if not root.is_dir():
+        sys.exit(f"디렉토리가 없습니다: {args.input}")
+    output = Path(args.output)
+    output_format = args.format or ("jsonl" if output.suffix.lower() in (".jsonl", ".json") else "csv")
+    size = args.size or settings.WHISPER_MODEL_SIZE
+    profile = args.profile or settings.WHISPER_DECODING_PROFILE
+    if profile not in build_profiles():
+        sys.exit(f"알 수 없는 디코딩 프로필입니다: {profile}")
+    cache_dir = args.cache_dir if args.cache_dir is not None else (settings.WHISPER_CACHE_DIR or None)
+    threads = max(1, args.threads)
+    workers = args.workers or max(1, (os.cpu_count() or 1) // threads)
+
+    meta = {"input": str(root), "size": size, "profile": profile, "format": output_format,
+            "quantize": settings.WHISPER_QUANTIZE, "started": datetime.now().isoformat(timespec="seconds")}
+    checkpoint = Checkpoint(Path(f"{output}.checkpoint"))
+    if not args.restart:
+        checkpoint.load()
+    resume = bool(checkpoint.done) and output.exists()
+    if resume:
+        for key in ("size", "profile", "format", "quantize"):
+            if checkpoint.meta and checkpoint.meta.get(key) != meta[key]:
+                sys.exit(f"체크포인트의 설정({key}={checkpoint.meta.get(key)})이 현재 설정({meta[key]})과 다릅니다. "
+                         f"--restart로 처음부터 다시 처리하세요.")
+
+    clips = find_clips(root, args.pattern)
+    pending = [clip for clip in clips if clip not in checkpoint.done] if resume else clips
+    if args.limit:
+        pending = pending[:args.limit]
+    print(f"음성 파일 {len(clips)}개 중 {len(checkpoint.done) if resume else 0}개 완료, {len(pending)}개 처리 예정"
+          f" (워커 {workers}개 × 스레드 {threads}, Whisper {size}, 프로필 {profile})")
+    if not pending:
+        return
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    checkpoint.start(meta, resume)
+    writer = ResultWriter(output, output_format, checkpoint.offset if resume else 0)
+    errors_path = Path(f"{output}.errors.jsonl")
+    errors = open(errors_path, "a", encoding="utf-8")
+
+    # spawn: 워커는 torch 스레드 풀을 새로 만들며, 스레드 수 환경 변수를 물려받음
+    set_thread_env(threads)
+    context = multiprocessing.get_context("spawn")
+    cache_file = f"whisper-{size}-int8.pt" if settings.WHISPER_QUANTIZE == "int8" else f"whisper-{size}.pt"
+    if cache_dir is None or not os.path.exists(os.path.join(cache_dir, cache_file)):
+        with context.Pool(1) as pool:
+            pool.apply(warm_model_cache, (size, cache_dir, args.device))
+
+    options = {"root": str(root), "size": size, "profile": profile, "cache_dir": cache_dir,
+               "device": args.device, "threads": threads}
+    started = time.perf_counter()
+    completed = failed = 0
+    last_report = started
+    pool = context.Pool(workers, initializer=_init_worker, initargs=(options,))
+    try:
+        for relative_path, row, error in pool.imap_unordered(process_clip, pending):
+            if error is not None:
+                failed += 1
+                errors.write(json.dumps({"path": relative_path, "error": error,
+                                         "ts": datetime.now().isoformat(timespec="seconds")}, ensure_ascii=False) + "\n")
+                errors.flush()
+            else:
+                completed += 1
+                checkpoint.mark(relative_path, writer.write(row))
+
+            now = time.perf_counter()
+            if now - last_report >= 10 or completed + failed == len(pending):
+                last_report = now
+                rate = (completed + failed) / (now - started)
+                remaining = (len(pending) - completed - failed) / rate if rate else 0
+                print(f"  {completed + failed}/{len(pending)} ({rate:.2f}개/초, 실패 {failed}, "
+                      f"남은 시간 {remaining / 60:.1f}분)", flush=True)
+    except KeyboardInterrupt:
+        print(f"\n중단되었습니다. 다시 실행하면 남은 {len(pending) - completed - failed}개부터 이어서 처리합니다.")
+    finally:
+        # 모든 결과를 받은 뒤이거나 중단된 경우이므로 남은 워커는 바로 종료
+        pool.terminate()
+        pool.join()
+        writer.close()
+        checkpoint.close()
+        errors.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"완료 {completed}개, 실패 {failed}개 ({elapsed:.1f}초) → {output}")
+    if failed:
+        print(f"실패 목록: {errors_path} (다시 실행하면 재시도)")
+
+
+if __name__ == "__main__":
+    main()
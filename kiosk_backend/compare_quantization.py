@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Whisper fp32 / int8 양자화 비교 리포트
+로컬 음성 파일 묶음으로 두 방식의 로드 시간, 메모리(RSS), 인코더/전체 인식 시간,
+인식 결과 일치율(문장 일치, 문자 오류율)을 측정합니다.
+메모리를 공정하게 비교하기 위해 방식마다 별도 프로세스에서 측정합니다.
+
+사용 예:
+    python compare_quantization.py --clips ../recordings --size base --output reports/quantize-base.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+def edit_distance(a: str, b: str) -> int:
+    """문자 단위 편집 거리"""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def load_clip(path: Path):
+    """음성 파일 → 16kHz mono float32 (WAV/FLAC/Ogg는 메모리에서, 나머지는 ffmpeg)"""
+    from audio_utils import decode_in_memory, decode_with_ffmpeg, sniff_audio_format
+    from compressed_audio import IN_PROCESS_FORMATS, decode_compressed
+
+    data = path.read_bytes()
+    audio = decode_in_memory(data)
+    if audio is None and sniff_audio_format(data[:64]) in IN_PROCESS_FORMATS:
+        audio = decode_compressed(data)
+    return audio if audio is not None else decode_with_ffmpeg(data, path.suffix)
+
+
+def peak_rss_bytes() -> int:
+    """현재 프로세스의 최대 RSS (ru_maxrss는 Linux에서 KB, macOS에서 바이트)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def measure(size: str, quantize: str, cache_dir: Optional[str], clip_paths: List[str],
+            threads: int, runs: int, profile_options: dict) -> dict:
+    """한 가지 방식으로 모델을 로드하고 클립별 인식 시간/결과 측정 (별도 프로세스에서 실행)"""
+    import psutil
+    import torch
+    import whisper
+
+    from model_loader import load_whisper_model
+    from model_registry import torch_module_bytes
+
+    torch.set_num_threads(threads)
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+
+    start = time.perf_counter()
+    model = load_whisper_model(size, cache_dir=cache_dir, device="cpu", quantize=quantize)
+    load_s = time.perf_counter() - start
+    rss_loaded = process.memory_info().rss
+
+    options = whisper.DecodingOptions(**profile_options)
+    clips = []
+    with torch.inference_mode():
+        for index, clip_path in enumerate(clip_paths):
+            audio = whisper.pad_or_trim(load_clip(Path(clip_path)))
+            mel = whisper.log_mel_spectrogram(audio, n_mels=model.dims.n_mels).unsqueeze(0)
+            if index == 0:
+                whisper.decode(model, mel, options)  # 첫 실행의 스레드 풀/메모리 할당 비용 제외
+
+            encoder_ms, total_ms = [], []
+            for _ in range(runs):
+                start = time.perf_counter()
+                model.embed_audio(mel)
+                encoder_ms.append((time.perf_counter() - start) * 1000)
+                start = time.perf_counter()
+                result = whisper.decode(model, mel, options)[0]
+                total_ms.append((time.perf_counter() - start) * 1000)
+            clips.append({
+                "clip": Path(clip_path).name,
+                "text": result.text.strip(),
+                "avg_logprob": result.avg_logprob,
+                "encoder_ms": round(statistics.median(encoder_ms), 1),
+                "total_ms": round(statistics.median(total_ms), 1),
+            })
+
+    return {
+        "quantize": quantize,
+        "load_s": round(load_s, 2),
+        "model_mb": round(torch_module_bytes(model) / 1024 ** 2, 1),
+        "rss_mb": round(rss_loaded / 1024 ** 2, 1),
+        "rss_model_mb": round((rss_loaded - rss_before) / 1024 ** 2, 1),
+        "peak_rss_mb": round(peak_rss_bytes() / 1024 ** 2, 1),  # 방식마다 새 프로세스이므로 이 방식의 최대값
+        "clips": clips,
+    }
+
+
+def summarize(result: dict) -> dict:
+    encoder = [clip["encoder_ms"] for clip in result["clips"]]
+    total = [clip["total_ms"] for clip in result["clips"]]
+    return {
+        "load_s": result["load_s"],
+        "model_mb": result["model_mb"],
+        "rss_model_mb": result["rss_model_mb"],
+        "peak_rss_mb": result["peak_rss_mb"],
+        "encoder_ms_p50": round(statistics.median(encoder), 1),
+        "total_ms_p50": round(statistics.median(total), 1),
+        "total_ms_mean": round(statistics.fmean(total), 1),
+    }
+
+
+def agreement(reference: dict, candidate: dict) -> dict:
+    """fp32 결과 대비 인식 결과 일치율"""
+    from result_cache import normalize_text
+
+    exact, errors, characters, differences = 0, 0, 0, []
+    for ref, cand in zip(reference["clips"], candidate["clips"]):
+        ref_text, cand_text = normalize_text(ref["text"]), normalize_text(cand["text"])
+        exact += ref_text == cand_text
+        distance = edit_distance(ref_text.replace(" ", ""), cand_text.replace(" ", ""))
+        errors += distance
+        characters += len(ref_text.replace(" ", ""))
+        if ref_text != cand_text:
+            differences.append({"clip": ref["clip"], "fp32": ref["text"], candidate["quantize"]: cand["text"]})
+    count = len(reference["clips"])
+    return {
+        "clips": count,
+        "exact_match_rate": round(exact / count, 4) if count else 0.0,
+        "cer_vs_fp32": round(errors / characters, 4) if characters else 0.0,
+        "differences": differences,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Whisper fp32 / int8 양자화 비교")
+    parser.add_argument("--clips", required=True, help="음성 파일 디렉토리")
+    parser.add_argument("--size", default=None, help="Whisper 크기 (기본: WHISPER_MODEL_SIZE)")
+    parser.add_argument("--cache-dir", default=None, help="체크포인트 캐시 경로 (기본: WHISPER_CACHE_DIR)")
+    parser.add_argument("--profile", default=None, help="디코딩 프로필 (기본: WHISPER_DECODING_PROFILE)")
+    parser.add_argument("--threads", type=int, default=0, help="연산 스레드 수 (0=CPU 코어 수)")
+    parser.add_argument("--runs", type=int, default=3, help="클립당 반복 횟수 (중앙값 사용)")
+    parser.add_argument("--limit", type=int, default=0, help="사용할 최대 클립 수")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    from audio_utils import AUDIO_FILE_SUFFIXES
+    from config import get_config
+    from decoding_profiles import build_domain_prompt, build_profiles
+
+    settings = get_config()
+    size = args.size or settings.WHISPER_MODEL_SIZE
+    cache_dir = args.cache_dir if args.cache_dir is not None else (settings.WHISPER_CACHE_DIR or None)
+    threads = args.threads or os.cpu_count() or 1
+
+    clip_paths = sorted(str(path) for path in Path(args.clips).glob("**/*") if path.suffix.lower() in AUDIO_FILE_SUFFIXES)
+    if args.limit:
+        clip_paths = clip_paths[:args.limit]
+    if not clip_paths:
+        sys.exit(f"음성 파일이 없습니다: {args.clips}")
+
+    # 서버와 같은 디코딩 설정으로 비교
+    profiles = build_profiles(
+        language=settings.WHISPER_LANGUAGE,
+        prompt=settings.WHISPER_PROMPT or build_domain_prompt(settings.INTENT_DATASET_PATH),
+        max_tokens=settings.WHISPER_MAX_TOKENS,
+    )
+    profile_name = args.profile or settings.WHISPER_DECODING_PROFILE
+    if profile_name not in profiles:
+        sys.exit(f"알 수 없는 디코딩 프로필입니다: {profile_name} (사용 가능: {', '.join(profiles)})")
+    profile_options = profiles[profile_name].decoding_options(fp16=False)
+
+    print(f"Whisper {size}, 클립 {len(clip_paths)}개, 스레드 {threads}, 프로필 {profile_name}")
+    results: Dict[str, dict] = {}
+    context = multiprocessing.get_context("spawn")
+    for quantize in ("none", "int8"):
+        label = "fp32" if quantize == "none" else quantize
+        print(f"- {label} 측정 중...")
+        with context.Pool(1) as pool:
+            results[label] = pool.apply(
+                measure, (size, quantize, cache_dir, clip_paths, threads, args.runs, profile_options)
+            )
+
+    fp32, int8 = summarize(results["fp32"]), summarize(results["int8"])
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "size": size,
+        "profile": profile_name,
+        "threads": threads,
+        "runs": args.runs,
+        "summary": {"fp32": fp32, "int8": int8},
+        "ratio": {
+            "model_mb": round(int8["model_mb"] / fp32["model_mb"], 3) if fp32["model_mb"] else None,
+            "rss_model_mb": round(int8["rss_model_mb"] / fp32["rss_model_mb"], 3) if fp32["rss_model_mb"] else None,
+            "encoder_speedup": round(fp32["encoder_ms_p50"] / int8["encoder_ms_p50"], 2) if int8["encoder_ms_p50"] else None,
+            "total_speedup": round(fp32["total_ms_p50"] / int8["total_ms_p50"], 2) if int8["total_ms_p50"] else None,
+        },
+        "agreement": agreement(results["fp32"], results["int8"]),
+        "clips": {label: result["clips"] for label, result in results.items()},
+    }
+
+    print(f"\n{'':<12}{'fp32':>12}{'int8':>12}")
+    for key, name in [("load_s", "로드(초)"), ("model_mb", "가중치(MB)"), ("rss_model_mb", "RSS 증가(MB)"),
+                      ("encoder_ms_p50", "인코더 p50"), ("total_ms_p50", "전체 p50")]:
+        print(f"{name:<12}{fp32[key]:>12}{int8[key]:>12}")
+    ratio, agree = report["ratio"], report["agreement"]
+    print(f"\n인코더 {ratio['encoder_speedup']}배, 전체 {ratio['total_speedup']}배 빠름, 가중치 {ratio['model_mb']}배")
+    print(f"인식 결과 일치 {agree['exact_match_rate']:.1%}, fp32 대비 문자 오류율 {agree['cer_vs_fp32']:.2%}")
+    for diff in agree["differences"][:10]:
+        print(f"  {diff['clip']}: '{diff['fp32']}' → '{diff['int8']}'")
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n결과 저장: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+압축 오디오 메모리 디코딩 (FLAC, Ogg Opus/Vorbis)
+ffmpeg 프로세스와 임시 파일 없이 libsndfile(soundfile)로 블록 단위로 디코딩하면서
+바로 16kHz mono로 리샘플링하여 미리 할당한 Whisper 입력 배열에 채웁니다.
+원본 샘플레이트(Opus는 48kHz)의 전체 음성을 따로 메모리에 두지 않습니다.
+
+soundfile이 없거나 libsndfile이 해당 코덱을 지원하지 않으면 None을 반환하며, 호출하는 쪽에서 ffmpeg 경로를 사용합니다.
+"""
+
+import io
+import logging
+import math
+from typing import List, Optional
+
+import numpy as np
+
+from audio_utils import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+try:
+    import soundfile
+except (ImportError, OSError):  # OSError: libsndfile 공유 라이브러리 없음
+    soundfile = None
+
+# 메모리 디코딩을 시도할 포맷 (upload_guard의 매직 바이트 판별 이름)
+IN_PROCESS_FORMATS = {"flac", "ogg"}
+
+
+class SincResampler:
+    """블록 단위로 입력을 받는 windowed-sinc 리샘플러 (블록 경계에서도 끊김 없음)
+
+    출력 샘플 위치는 입력 기준 k * down / up 이므로 위상은 up가지뿐이며,
+    위상별 필터 계수를 미리 계산해 두고 블록마다 곱셈/합만 합니다.
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int = SAMPLE_RATE, zero_crossings: int = 16):
+        divisor = math.gcd(src_rate, dst_rate)
+        self.up, self.down = dst_rate // divisor, src_rate // divisor
+        # 낮은 쪽 나이퀴스트 주파수 아래에서 차단 (다운샘플링 시 앨리어싱 방지)
+        cutoff = min(1.0, dst_rate / src_rate) * 0.95
+        self.half_width = int(math.ceil(zero_crossings / cutoff))
+        self._offsets = np.arange(-self.half_width + 1, self.half_width + 1)
+        distance = self._offsets[None, :] - np.arange(self.up)[:, None] / self.up
+        window = 0.5 * (1 + np.cos(np.pi * np.clip(distance / self.half_width, -1, 1)))
+        self._table = (cutoff * np.sinc(cutoff * distance) * window).astype(np.float32)  # (위상, 탭)
+        self._buffer = np.zeros(self.half_width, dtype=np.float32)  # 첫 출력 앞쪽은 0으로 채움
+        self._base = -self.half_width  # _buffer[0]의 입력 위치
+        self._consumed = 0
+        self._produced = 0
+
+    def _emit(self, total: Optional[int] = None) -> np.ndarray:
+        end = self._base + len(self._buffer) - self.half_width  # 오른쪽 탭까지 입력이 있는 위치 한계
+        count = (end * self.up - 1) // self.down + 1 - self._produced if end > 0 else 0
+        if total is not None:
+            count = min(count, total - self._produced)
+        if count <= 0:
+            return np.zeros(0, dtype=np.float32)
+        positions = (self._produced + np.arange(count)) * self.down
+        index, phase = positions // self.up, positions % self.up
+        samples = self._buffer[(index - self._base)[:, None] + self._offsets[None, :]]
+        out = np.einsum("ij,ij->i", samples, self._table[phase])
+        self._produced += count
+
+        # 다음 출력에 필요 없는 앞부분은 버림
+        keep_from = (self._produced * self.down) // self.up - self.half_width + 1 - self._base
+        if keep_from > 0:
+            self._buffer = self._buffer[keep_from:]
+            self._base += keep_from
+        return out
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        self._buffer = np.concatenate([self._buffer, block.astype(np.float32, copy=False)])
+        self._consumed += len(block)
+        return self._emit()
+
+    def flush(self) -> np.ndarray:
+        """남은 출력 (입력 끝 뒤는 0으로 간주)"""
+        self._buffer = np.concatenate([self._buffer, np.zeros(self.half_width, dtype=np.float32)])
+        return self._emit(total=-(-self._consumed * self.up // self.down))
+
+
+def output_length(frames: int, src_rate: int) -> int:
+    """src_rate 샘플 frames개를 16kHz로 바꾼 샘플 수"""
+    return -(-frames * SAMPLE_RATE // src_rate)
+
+
+def decode_compressed(data: bytes, max_seconds: float = 0.0, block_frames: int = 16384) -> Optional[np.ndarray]:
+    """FLAC/Ogg 데이터를 16kHz mono float32로 디코딩, 지원하지 않으면 None
+
+    max_seconds를 넘는 부분은 디코딩하지 않습니다.
+    """
+    if soundfile is None:
+        return None
+    try:
+        with soundfile.SoundFile(io.BytesIO(data)) as source:
+            rate, channels = source.samplerate, source.channels
+            frames = source.frames if 0 < source.frames < 2 ** 40 else -1  # 길이를 모르면 끝까지
+            if max_seconds:
+                limit = int(max_seconds * rate)
+                frames = limit if frames < 0 else min(frames, limit)
+            resampler = SincResampler(rate) if rate != SAMPLE_RATE else None
+
+            # 길이를 알면 결과 배열을 한 번만 할당, 블록 버퍼도 재사용
+            output = np.empty(output_length(frames, rate), dtype=np.float32) if frames > 0 else None
+            pieces: List[np.ndarray] = []
+            written = 0
+
+            def append(chunk: np.ndarray):
+                nonlocal written
+                if output is not None:
+                    chunk = chunk[:len(output) - written]
+                    output[written:written + len(chunk)] = chunk
+                else:
+                    pieces.append(chunk.copy())
+                written += len(chunk)
+
+            block_buffer = np.empty((block_frames, channels), dtype=np.float32)
+            for block in source.blocks(blocksize=block_frames, frames=frames, dtype="float32",
+                                       always_2d=True, out=block_buffer):
+                mono = block.mean(axis=1) if channels > 1 else block[:, 0]
+                append(resampler.process(mono) if resampler is not None else mono)
+            if resampler is not None:
+                append(resampler.flush())
+    except RuntimeError as e:
+        # 손상된 파일, libsndfile이 지원하지 않는 코덱 등
+        logger.debug("메모리 디코딩 실패, ffmpeg로 처리합니다: %s", e)
+        return None
+
+    if output is not None:
+        return output[:written]
+    return np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32)
@@ -8,25 +8,99 @@ class Config:
     HOST = os.getenv("HOST", "0.0.0.0")
     PORT = int(os.getenv("PORT", 8000))
     DEBUG = os.getenv("DEBUG", "True").lower() == "true"
+    SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", 1))  # 운영 모드 워커 프로세스 수
+    WORKER_THREADS = int(os.getenv("WORKER_THREADS", 0))  # 워커당 연산 스레드 수 (0이면 코어 수 / 워커 수)
+    
+    # 서버 역할: standalone(자체 추론), gateway(음성 요청을 추론 백엔드로 전달, Whisper 미로드)
+    SERVER_ROLE = os.getenv("SERVER_ROLE", "standalone")
+    GATEWAY_BACKENDS = [url.strip() for url in os.getenv("GATEWAY_BACKENDS", "").split(",") if url.strip()]
+    GATEWAY_POOL_SIZE = int(os.getenv("GATEWAY_POOL_SIZE", 16))  # 백엔드별 keep-alive 연결 수
+    GATEWAY_TIMEOUT = float(os.getenv("GATEWAY_TIMEOUT", 30))  # 백엔드 응답 대기 시간 (초)
+    GATEWAY_MAX_ATTEMPTS = int(os.getenv("GATEWAY_MAX_ATTEMPTS", 3))  # 포화/실패 시 최대 시도 백엔드 수
+    GATEWAY_HEALTH_INTERVAL = float(os.getenv("GATEWAY_HEALTH_INTERVAL", 2))  # 백엔드 대기열 확인 주기 (초)
     
     # AI 모델 경로
     AI_MODULE_PATH = os.getenv("AI_MODULE_PATH", "../ai_module")
     INTENT_MODEL_PATH = os.path.join(AI_MODULE_PATH, "intent_model.pkl")
     VECTORIZER_PATH = os.path.join(AI_MODULE_PATH, "vectorizer.pkl")
+    INTENT_DATASET_PATH = os.getenv("INTENT_DATASET_PATH", os.path.join(AI_MODULE_PATH, "..", "intent_dataset.csv"))
+    INTENT_COMPILED_PATH = os.getenv("INTENT_COMPILED_PATH", os.path.join(AI_MODULE_PATH, "intent_model_compiled"))
+    INTENT_MODEL_FORMAT = os.getenv("INTENT_MODEL_FORMAT", "auto")  # auto(컴파일 우선), compiled, pickle
     
     # Whisper 설정
     WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "tiny")  # tiny, base, small, medium, large
+    WHISPER_PRELOAD_SIZES = [size.strip() for size in os.getenv("WHISPER_PRELOAD_SIZES", "").split(",") if size.strip()]  # 함께 미리 로드할 크기
+    WHISPER_CACHE_DIR = os.getenv("WHISPER_CACHE_DIR", "")  # 변환된 체크포인트 보관 경로 (비우면 사용 안 함)
+    WHISPER_QUANTIZE = os.getenv("WHISPER_QUANTIZE", "none")  # none, int8 (CPU 전용, 양자화 가중치도 캐시 경로에 보관)
+    # 디코딩 프로필 (default: Whisper 기본값, kiosk: 한국어 고정 + 도메인 프롬프트 + greedy + 토큰 수 제한)
+    WHISPER_DECODING_PROFILE = os.getenv("WHISPER_DECODING_PROFILE", "kiosk")  # 요청별로 ?profile= 로 변경 가능
+    WHISPER_LANGUAGE = os.getenv("WHISPER_LANGUAGE", "ko")
+    WHISPER_MAX_TOKENS = int(os.getenv("WHISPER_MAX_TOKENS", 48))  # 발화당 최대 출력 토큰 수
+    WHISPER_PROMPT = os.getenv("WHISPER_PROMPT", "")  # 비우면 INTENT_DATASET_PATH 어휘로 생성
+    # 인식 품질이 낮을 때 재인식할 더 큰 크기 (비우면 사용 안 함, 시작 시 함께 로드)
+    WHISPER_ESCALATION_SIZE = os.getenv("WHISPER_ESCALATION_SIZE", "")
+    ESCALATION_MIN_AVG_LOGPROB = float(os.getenv("ESCALATION_MIN_AVG_LOGPROB", -0.8))  # 평균 로그 확률이 이보다 낮으면 재인식
+    ESCALATION_MAX_NO_SPEECH_PROB = float(os.getenv("ESCALATION_MAX_NO_SPEECH_PROB", 0.6))  # 무음 확률이 이보다 높으면 재인식
+    ESCALATION_MIN_INTENT_CONFIDENCE = float(os.getenv("ESCALATION_MIN_INTENT_CONFIDENCE", os.getenv("CONFIDENCE_THRESHOLD", 0.5)))
+    MODEL_READY_TIMEOUT = float(os.getenv("MODEL_READY_TIMEOUT", 30))  # 모델 로드 대기 최대 시간 (초)
+    
+    # 추론 워커 풀 설정
+    INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", 1))  # 워커끼리 Whisper 가중치 공유 (워커별 kv-cache만 추가)
+    INFERENCE_QUEUE_SIZE = int(os.getenv("INFERENCE_QUEUE_SIZE", 8))  # 초과 시 503 응답
+    INFERENCE_RETRY_AFTER = int(os.getenv("INFERENCE_RETRY_AFTER", 2))  # Retry-After 헤더 (초)
+    WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", 8))  # 1이면 배치 없이 즉시 처리
+    WHISPER_BATCH_WAIT_MS = float(os.getenv("WHISPER_BATCH_WAIT_MS", 100))  # 배치를 모으는 최대 대기 시간
+    
+    # 스트리밍 음성 구간 검출(VAD) 설정
+    VAD_THRESHOLD = float(os.getenv("VAD_THRESHOLD", 0.01))  # 발화로 판단할 최소 RMS
+    VAD_END_SILENCE_MS = int(os.getenv("VAD_END_SILENCE_MS", 700))  # 이 시간 이상 조용하면 발화 종료
+    VAD_MAX_UTTERANCE_S = float(os.getenv("VAD_MAX_UTTERANCE_S", 15))
+    STREAM_PARTIAL_INTERVAL_MS = int(os.getenv("STREAM_PARTIAL_INTERVAL_MS", 1000))  # 중간 인식 결과 주기
+    
+    # 음성 전처리 설정
+    TRIM_SILENCE = os.getenv("TRIM_SILENCE", "True").lower() == "true"  # 앞뒤 무음 제거, 무음이면 모델 호출 생략
+    MAX_TRANSCRIBE_SECONDS = float(os.getenv("MAX_TRANSCRIBE_SECONDS", 15))  # 이보다 긴 음성은 잘라서 인식
     
     # 파일 업로드 설정
-    MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE", 10 * 1024 * 1024))  # 10MB
-    ALLOWED_AUDIO_FORMATS = ["audio/wav", "audio/mp3", "audio/m4a", "audio/ogg"]
+    MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE", 10 * 1024 * 1024))  # 10MB, 넘으면 수신 도중 413
+    MAX_AUDIO_SECONDS = float(os.getenv("MAX_AUDIO_SECONDS", 60))  # WAV/FLAC 헤더, Ogg 마지막 페이지, PCM 길이 기준, 넘으면 413 (0이면 제한 없음)
+    # 허용 형식 (Content-Type이 아닌 파일 앞부분의 매직 바이트로 확인, audio/opus는 audio/ogg와 같은 Ogg 컨테이너)
+    ALLOWED_AUDIO_FORMATS = os.getenv(
+        "ALLOWED_AUDIO_FORMATS", "audio/wav,audio/mp3,audio/m4a,audio/ogg,audio/opus,audio/webm,audio/flac,audio/pcm"
+    ).split(",")
     
     # 의도 분류 설정
-    CONFIDENCE_THRESHOLD = float(os.getenv("CONFIDENCE_THRESHOLD", 0.5))
+    CONFIDENCE_THRESHOLD = float(os.getenv("CONFIDENCE_THRESHOLD", 0.5))  # 이보다 낮으면 다음 단계 모델로 재분류
+    INTENT_KEYWORD_TIER = os.getenv("INTENT_KEYWORD_TIER", "True").lower() == "true"  # 한 의도의 키워드만 나오면 모델 생략
+    KEYWORD_TIER_MIN_SCORE = float(os.getenv("KEYWORD_TIER_MIN_SCORE", 1.0))  # 키워드 단계 확정에 필요한 최소 가중치 합
+    INTENT_ESCALATION_PATH = os.getenv("INTENT_ESCALATION_PATH", "")  # 저신뢰 문장용 컴파일된 모델 (비우면 사용 안 함)
+    MAX_BATCH_TEXTS = int(os.getenv("MAX_BATCH_TEXTS", 1000))  # /text-to-intent/batch 최대 건수
+    
+    # 결과 캐시 설정 (크기 0이면 사용 안 함, TTL 0이면 만료 없음)
+    INTENT_CACHE_SIZE = int(os.getenv("INTENT_CACHE_SIZE", 1024))  # 정규화된 문장 → 의도/신뢰도
+    INTENT_CACHE_TTL = float(os.getenv("INTENT_CACHE_TTL", 3600))
+    AUDIO_CACHE_SIZE = int(os.getenv("AUDIO_CACHE_SIZE", 256))  # 같은 음성 파일 재업로드 → 인식 결과
+    AUDIO_CACHE_TTL = float(os.getenv("AUDIO_CACHE_TTL", 300))
+    
+    # 지표 설정 (/metrics, Server-Timing 응답 헤더)
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    SERVER_TIMING_HEADER = os.getenv("SERVER_TIMING_HEADER", "True").lower() == "true"  # 단계별 처리 시간을 응답 헤더로 노출
     
     # 로깅 설정
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
     LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    # 비동기 구조화 로그: 요청 경로에서는 대기열에만 넣고 백그라운드 스레드가 기록
+    LOG_FILE = os.getenv("LOG_FILE", "")  # JSON lines 파일 (비우면 콘솔만, 멀티 프로세스는 {pid} 사용 권장)
+    LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))  # 파일 교체 크기
+    LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 5))  # 보관할 이전 파일 수
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))  # 가득 차면 기다리지 않고 버림
+    LOG_CONSOLE = os.getenv("LOG_CONSOLE", "True").lower() == "true"
+    LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", 1.0))  # 성공한 요청 이벤트 기록 비율
+    LOG_SLOW_MS = float(os.getenv("LOG_SLOW_MS", 2000))  # 이보다 느린 요청은 샘플링과 관계없이 기록
+    LOG_TRANSCRIPTS = os.getenv("LOG_TRANSCRIPTS", "True").lower() == "true"  # 요청 로그에 인식/입력 문장 포함
+    
+    # 관리자 API (모델 교체) 토큰, 비우면 인증 없이 허용
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
     
     # CORS 설정
     CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*").split(",")
@@ -78,6 +152,16 @@ class Config:
             "fee": "무료"
         }
     }
+    
+    # 대체(키워드) 분류기 표: {의도: {키워드: 가중치}}
+    # 모델이 없거나 예측에 실패하면 사용하며, 여러 의도의 키워드가 함께 나오면 가중치 합이 큰 의도를 선택
+    INTENT_KEYWORDS = {
+        0: {"등본": 1.0, "초본": 1.0, "증명서": 1.0, "가족관계": 1.0, "인감": 1.0, "뽑": 0.8, "출력": 0.8, "떼": 0.5, "발급": 0.5},
+        1: {"주소": 1.0, "전입": 1.0, "전출": 1.0, "이사": 0.8},
+        2: {"여권": 1.5, "passport": 1.5},
+        3: {"직원": 1.0, "사람": 1.0, "호출": 1.0, "불러": 1.0, "상담": 0.8, "도움": 0.5, "도와": 0.3},
+        4: {"처음": 1.0, "시작": 1.0, "첫 화면": 1.0, "메인": 1.0, "홈": 0.8, "돌아": 0.8, "되돌": 0.8, "다시": 0.3},
+    }
 
 class DevelopmentConfig(Config):
     """개발 환경 설정"""
@@ -0,0 +1,132 @@
+"""
+Whisper 디코딩 프로필
+키오스크 발화는 항상 한국어이고 짧으며 어휘가 제한적이므로
+언어 감지, 온도 폴백 재디코딩, 긴 출력 없이 빠르게 디코딩하는 설정을 제공합니다.
+"""
+
+import csv
+import os
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+DEFAULT_PROFILE = "default"
+KIOSK_PROFILE = "kiosk"
+
+# whisper.transcribe의 온도 폴백 기준 (기본값과 같음)
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+@dataclass(frozen=True)
+class DecodingProfile:
+    """Whisper 디코딩 설정 묶음
+
+    language가 None이면 언어를 감지하고, greedy=False면 transcribe와 같은 온도 폴백을 사용합니다
+    (30초 이하 배치 디코딩은 온도 0으로 먼저 디코딩하고 needs_fallback이면 transcribe로 다시 디코딩).
+    """
+    name: str
+    language: Optional[str] = None
+    prompt: Optional[str] = None
+    max_tokens: Optional[int] = None
+    greedy: bool = False
+    without_timestamps: bool = False
+
+    def decoding_options(self, fp16: bool) -> dict:
+        """whisper.DecodingOptions 인자 (30초 이하 배치 디코딩)"""
+        return {
+            "fp16": fp16,
+            "language": self.language,
+            "prompt": self.prompt,
+            "sample_len": self.max_tokens,
+            "temperature": 0.0,
+            "without_timestamps": self.without_timestamps,
+        }
+
+    def needs_fallback(self, result) -> bool:
+        """배치 디코딩(온도 0) 결과를 transcribe 경로로 다시 디코딩해야 하는지
+
+        greedy가 아니면 whisper.transcribe와 같은 기준(압축률, 평균 로그 확률)으로 판단하며,
+        무음 확률이 높고 로그 확률도 낮으면 무음으로 보고 다시 디코딩하지 않습니다.
+        """
+        if self.greedy:
+            return False
+        low_logprob = result.avg_logprob < LOGPROB_THRESHOLD
+        if low_logprob and result.no_speech_prob > NO_SPEECH_THRESHOLD:
+            return False
+        return low_logprob or result.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+
+    def transcribe_options(self, fp16: bool) -> dict:
+        """model.transcribe 인자 (30초를 넘는 음성)"""
+        options = {"fp16": fp16, "language": self.language, "initial_prompt": self.prompt}
+        if self.max_tokens:
+            options["sample_len"] = self.max_tokens
+        if self.greedy:
+            # 폴백 재디코딩 비활성화: 단일 온도, 품질 기준 미달이어도 다시 디코딩하지 않음
+            options.update(
+                temperature=0.0,
+                compression_ratio_threshold=None,
+                logprob_threshold=None,
+                condition_on_previous_text=False,
+            )
+        return options
+
+    def to_dict(self) -> dict:
+        return {
+            "language": self.language,
+            "prompt": self.prompt,
+            "max_tokens": self.max_tokens,
+            "greedy": self.greedy,
+            "without_timestamps": self.without_timestamps,
+        }
+
+
+def build_domain_prompt(dataset_path: str, max_terms: int = 20, max_chars: int = 200) -> Optional[str]:
+    """의도 데이터셋에서 자주 나오는 단어로 초기 프롬프트 생성 (예: "주민등록등본, 전입신고, 여권, ...")
+
+    조사/어미처럼 모든 의도에 고르게 나오는 단어보다 특정 의도에 몰린 단어를 우선합니다.
+    """
+    if not dataset_path or not os.path.exists(dataset_path):
+        return None
+
+    counts: Counter = Counter()
+    intents_by_word: Dict[str, set] = {}
+    with open(dataset_path, encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            for word in row["text"].split():
+                word = word.strip(".,!?~")
+                if len(word) < 2:
+                    continue
+                counts[word] += 1
+                intents_by_word.setdefault(word, set()).add(row.get("intent"))
+
+    # 한 의도에만 나오는 단어 우선, 그다음 빈도순
+    ranked = sorted(counts, key=lambda word: (len(intents_by_word[word]) > 1, -counts[word], word))
+    terms: List[str] = []
+    length = 0
+    for word in ranked[:max_terms]:
+        if length + len(word) + 2 > max_chars:
+            break
+        terms.append(word)
+        length += len(word) + 2
+    return ", ".join(terms) if terms else None
+
+
+def build_profiles(language: str = "ko", prompt: Optional[str] = None, max_tokens: int = 48) -> Dict[str, DecodingProfile]:
+    """사용 가능한 프로필 목록
+
+    default: Whisper 기본값 (언어 감지, 프롬프트 없음, 길이 제한 없음, 품질 기준 미달 시 온도 폴백)
+    kiosk: 한국어 고정, 도메인 프롬프트, greedy 전용, 최대 토큰 수 제한, 타임스탬프 토큰 생략
+    """
+    return {
+        DEFAULT_PROFILE: DecodingProfile(DEFAULT_PROFILE),
+        KIOSK_PROFILE: DecodingProfile(
+            KIOSK_PROFILE,
+            language=language,
+            prompt=prompt,
+            max_tokens=max_tokens,
+            greedy=True,
+            without_timestamps=True,
+        ),
+    }
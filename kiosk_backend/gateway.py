@@ -0,0 +1,192 @@
+"""
+추론 게이트웨이
+여러 키오스크의 음성 요청을 받아 Whisper가 로드된 추론 백엔드(kiosk_backend) 중
+대기열이 가장 짧은 곳으로 보냅니다. 백엔드가 포화(503)되었거나 응답하지 않으면 다른 백엔드로 재시도하고,
+백엔드별로 keep-alive 연결 풀을 유지합니다.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# 다른 백엔드로 재시도할 응답 코드 (포화/게이트웨이 오류)
+RETRY_STATUS = {502, 503, 504}
+
+
+class GatewayUnavailableError(Exception):
+    """모든 백엔드가 포화되었거나 응답하지 않을 때 발생"""
+
+
+class Backend:
+    """추론 백엔드 하나의 연결 풀과 부하 상태"""
+
+    def __init__(self, url: str, pool_size: int = 16, timeout: float = 30.0):
+        self.url = url.rstrip("/")
+        self.client = httpx.AsyncClient(
+            base_url=self.url,
+            timeout=httpx.Timeout(timeout, connect=min(5.0, timeout)),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+        self.healthy = True      # 마지막 상태 확인/요청 성공 여부
+        self.ready = False       # 백엔드 모델 로드 완료 여부
+        self.workers = 1
+        self.queue_depth = 0     # 백엔드가 보고한 대기 요청 수 (배치 대기 + 실행 중/대기 중 작업)
+        self.capacity = 1        # queue_depth 기준 최대 수용량
+        self.in_flight = 0       # 이 게이트웨이가 보내고 응답을 기다리는 요청 수
+        self.requests = 0
+        self.failures = 0
+        self.saturated = 0
+        self.latency_ms: Optional[float] = None  # 응답 시간 지수 이동 평균
+        self.checked_at: Optional[float] = None
+
+    @property
+    def available(self) -> bool:
+        return self.healthy and self.ready
+
+    def load(self) -> float:
+        """워커당 예상 대기 요청 수 (작을수록 여유)"""
+        return (self.queue_depth + self.in_flight) / max(1, self.workers)
+
+    def record_latency(self, elapsed_ms: float):
+        self.latency_ms = elapsed_ms if self.latency_ms is None else 0.8 * self.latency_ms + 0.2 * elapsed_ms
+
+    async def refresh(self, timeout: float):
+        """/health로 대기열 길이와 준비 상태 갱신"""
+        try:
+            response = await self.client.get("/health", timeout=timeout)
+            response.raise_for_status()
+            body = response.json()
+            inference = body.get("inference", {})
+            self.workers = inference.get("workers", self.workers)
+            # 워커 풀 작업 하나에 배치된 요청이 여러 개일 수 있고, 배치 시간 창에서 기다리는 요청은
+            # 아직 작업이 아니므로 요청 단위 대기 수를 함께 봄 (이전 버전 백엔드는 작업 수만 보고)
+            jobs = inference.get("running", 0) + inference.get("queued", 0)
+            self.queue_depth = max(jobs, inference.get("requests", 0))
+            self.capacity = inference.get("request_capacity") or inference.get("capacity", self.capacity)
+            self.ready = bool(body.get("models_loaded", {}).get("whisper"))
+            self.healthy = True
+        except (httpx.HTTPError, ValueError) as e:
+            if self.healthy:
+                logger.warning(f"백엔드 상태 확인 실패: {self.url} ({e})")
+            self.healthy = False
+        self.checked_at = time.time()
+
+    def to_dict(self) -> dict:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "ready": self.ready,
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+            "saturated": self.saturated,
+            "latency_ms": round(self.latency_ms, 1) if self.latency_ms is not None else None,
+            "checked_at": self.checked_at,
+        }
+
+
+class InferenceGateway:
+    """대기열 길이 기준 부하 분산 + 포화 시 다른 백엔드로 재시도"""
+
+    def __init__(self, urls: List[str], pool_size: int = 16, timeout: float = 30.0,
+                 max_attempts: int = 3, health_interval: float = 2.0):
+        if not urls:
+            raise ValueError("게이트웨이 백엔드 주소가 없습니다 (GATEWAY_BACKENDS).")
+        self.backends = [Backend(url, pool_size, timeout) for url in urls]
+        self.max_attempts = max(1, min(max_attempts, len(self.backends)))
+        self.health_interval = health_interval
+        self.retries = 0
+        self.rejected = 0
+        self._poll_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """백엔드 상태를 한 번 확인하고 주기적 확인 시작"""
+        await self.refresh()
+        self._poll_task = asyncio.create_task(self._poll())
+
+    async def close(self):
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+        await asyncio.gather(*(backend.client.aclose() for backend in self.backends), return_exceptions=True)
+
+    async def refresh(self):
+        timeout = max(0.5, min(self.health_interval, 5.0))
+        await asyncio.gather(*(backend.refresh(timeout) for backend in self.backends))
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            await self.refresh()
+
+    def candidates(self) -> List[Backend]:
+        """시도할 백엔드 순서 (사용 가능한 백엔드 중 부하가 낮은 순, 같으면 무작위)"""
+        available = [backend for backend in self.backends if backend.available]
+        if not available:
+            # 상태 확인이 늦었을 수 있으므로 전체를 대상으로 시도
+            available = list(self.backends)
+        random.shuffle(available)
+        return sorted(available, key=lambda backend: backend.load())
+
+    async def post(self, path: str, **kwargs) -> Tuple[httpx.Response, Backend]:
+        """부하가 가장 낮은 백엔드로 요청을 보내고, 포화/연결 실패 시 다음 백엔드로 재시도"""
+        last_error: Optional[str] = None
+        for attempt, backend in enumerate(self.candidates()[:self.max_attempts]):
+            if attempt:
+                self.retries += 1
+            backend.in_flight += 1
+            backend.requests += 1
+            start = time.perf_counter()
+            try:
+                response = await backend.client.post(path, **kwargs)
+            except httpx.TransportError as e:
+                backend.failures += 1
+                backend.healthy = False
+                last_error = f"{backend.url}: {e}"
+                logger.warning(f"백엔드 요청 실패, 다른 백엔드로 재시도합니다: {last_error}")
+                continue
+            finally:
+                backend.in_flight -= 1
+
+            backend.record_latency((time.perf_counter() - start) * 1000)
+            if response.status_code in RETRY_STATUS:
+                backend.saturated += 1
+                backend.queue_depth = max(backend.queue_depth, backend.capacity)  # 다음 상태 확인까지 후순위
+                last_error = f"{backend.url}: HTTP {response.status_code}"
+                logger.info(f"백엔드 포화, 다른 백엔드로 재시도합니다: {last_error}")
+                continue
+            return response, backend
+
+        self.rejected += 1
+        raise GatewayUnavailableError(last_error or "사용 가능한 백엔드가 없습니다.")
+
+    async def forward_voice(self, content: bytes, filename: Optional[str], content_type: Optional[str],
+                            params: Optional[Dict[str, str]] = None) -> Tuple[int, dict]:
+        """음성 파일을 백엔드 /voice-to-intent로 전달하고 (상태 코드, 응답 본문) 반환"""
+        response, backend = await self.post(
+            "/voice-to-intent",
+            files={"audio": (filename or "audio.wav", content, content_type or "audio/wav")},
+            params=params or None,
+        )
+        try:
+            body = response.json()
+        except ValueError:
+            body = {"detail": response.text}
+        logger.debug(f"음성 요청 처리 백엔드: {backend.url} (HTTP {response.status_code})")
+        return response.status_code, body
+
+    def stats(self) -> dict:
+        return {
+            "backends": [backend.to_dict() for backend in self.backends],
+            "max_attempts": self.max_attempts,
+            "retries": self.retries,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,208 @@
+"""
+추론 워커 풀
+Whisper 추론처럼 CPU를 오래 점유하는 작업을 이벤트 루프 밖의 전용 스레드에서 실행합니다.
+대기열이 가득 차면 즉시 거절하여 한 키오스크의 요청이 다른 요청을 막지 않도록 합니다.
+짧은 시간 안에 들어온 요청은 BatchScheduler가 모아 한 번의 배치 추론으로 처리합니다.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+
+class InferenceQueueFullError(Exception):
+    """추론 대기열이 가득 차서 요청을 받을 수 없을 때 발생"""
+
+
+@dataclass
+class InferenceTiming:
+    """요청별 대기/연산 시간 (밀리초)"""
+    queue_wait_ms: float
+    compute_ms: float
+    batch_size: int = 1
+
+
+class InferencePool:
+    """워커 수와 대기열 크기가 제한된 추론 실행기"""
+
+    def __init__(self, max_workers: int = 1, max_queue: int = 8, name: str = "inference"):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._pending = 0  # 실행 중 + 대기 중인 작업 수
+        self._running = 0
+
+    @property
+    def capacity(self) -> int:
+        """동시에 수용 가능한 최대 작업 수 (실행 + 대기)"""
+        return self.max_workers + self.max_queue
+
+    def _admit(self):
+        with self._lock:
+            if self._pending >= self.capacity:
+                raise InferenceQueueFullError(
+                    f"추론 대기열이 가득 찼습니다 ({self._pending}/{self.capacity})"
+                )
+            self._pending += 1
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Tuple[Any, InferenceTiming]:
+        """작업을 워커 스레드에서 실행하고 (결과, 시간 정보)를 반환"""
+        self._admit()
+        submitted = time.perf_counter()
+        started = {}
+
+        def job():
+            started["at"] = time.perf_counter()
+            with self._lock:
+                self._running += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                # 요청이 취소되더라도 실제 작업이 끝날 때 자리를 반납
+                with self._lock:
+                    self._running -= 1
+                    self._pending -= 1
+
+        def on_done(submitted_future):
+            # 요청이 job 시작 전에 취소되면(연결 끊김, 시간 초과) 실행기가 job을 건너뛰므로 여기서 반납
+            # (이미 실행 중인 작업은 취소되지 않고 job의 finally에서 반납)
+            if submitted_future.cancelled():
+                self._release()
+
+        try:
+            submitted_future = self._executor.submit(job)
+        except Exception:
+            self._release()
+            raise
+        submitted_future.add_done_callback(on_done)
+        # asyncio 쪽 취소는 실행기 future의 cancel()로 전달됨
+        result = await asyncio.wrap_future(submitted_future)
+
+        finished = time.perf_counter()
+        start = started.get("at", finished)
+        timing = InferenceTiming(
+            queue_wait_ms=(start - submitted) * 1000,
+            compute_ms=(finished - start) * 1000,
+        )
+        return result, timing
+
+    def stats(self) -> dict:
+        """현재 대기열 상태"""
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "running": self._running,
+                "queued": max(0, self._pending - self._running),
+                "capacity": self.capacity,
+            }
+
+    def shutdown(self, wait: bool = True):
+        """실행기 종료"""
+        self._executor.shutdown(wait=wait)
+
+
+class BatchScheduler:
+    """시간 창 동안 모인 요청을 묶어 워커 풀에서 한 번에 처리하는 스케줄러
+
+    batch_fn은 입력 목록을 받아 같은 순서의 결과 목록을 반환해야 합니다.
+    """
+
+    def __init__(
+        self,
+        pool: InferencePool,
+        batch_fn: Callable[[Sequence[Any]], List[Any]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 100.0,
+    ):
+        self.pool = pool
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+        self._pending: List[Tuple[Any, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._outstanding = 0  # 결과를 기다리는 요청 수
+        self._batches = 0
+        self._batched_items = 0
+
+    @property
+    def capacity(self) -> int:
+        """동시에 기다릴 수 있는 최대 요청 수"""
+        return self.pool.capacity * self.max_batch_size
+
+    async def submit(self, item: Any) -> Tuple[Any, InferenceTiming]:
+        """요청 하나를 배치 대기열에 넣고 (결과, 시간 정보)를 기다림"""
+        if self._outstanding >= self.capacity:
+            raise InferenceQueueFullError(
+                f"배치 대기열이 가득 찼습니다 ({self._outstanding}/{self.capacity})"
+            )
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._outstanding += 1
+        self._pending.append((item, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch_size or self.max_wait_ms == 0:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+
+        try:
+            return await future
+        finally:
+            self._outstanding -= 1
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            asyncio.ensure_future(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[Tuple[Any, asyncio.Future, float]]):
+        items = [item for item, _, _ in batch]
+        try:
+            results, timing = await self.pool.run(self.batch_fn, items)
+            if len(results) != len(batch):
+                raise RuntimeError(f"배치 결과 개수 불일치: {len(results)} != {len(batch)}")
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self._batches += 1
+        self._batched_items += len(batch)
+
+        # 요청별 대기 시간 = 시간 창 대기 + 워커 풀 대기
+        compute_start = time.perf_counter() - timing.compute_ms / 1000
+        for (_, future, submitted), result in zip(batch, results):
+            if future.done():
+                continue
+            future.set_result((result, InferenceTiming(
+                queue_wait_ms=max(0.0, (compute_start - submitted) * 1000),
+                compute_ms=timing.compute_ms,
+                batch_size=len(batch),
+            )))
+
+    def stats(self) -> dict:
+        """배치 처리 통계"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "waiting": len(self._pending),
+            "outstanding": self._outstanding,
+            "capacity": self.capacity,
+            "batches": self._batches,
+            "avg_batch_size": round(self._batched_items / self._batches, 2) if self._batches else 0.0,
+        }
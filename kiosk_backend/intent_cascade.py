@@ -0,0 +1,147 @@
+"""
+단계별 의도 분류 (캐스케이드)
+비용이 낮은 단계부터 차례로 시도하고, 결과를 확신할 수 있으면 바로 반환합니다.
+(키워드 → 의도 분류 모델 → 더 큰 모델)
+단계별 처리 비율과 지연 시간을 기록하여 임계값 조정에 사용합니다.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+
+from metrics import stage
+
+# 단계 함수: 텍스트 → (의도, 신뢰도, 확정 여부), 사용할 수 없으면 None
+TierResult = Tuple[int, float, bool]
+TierFunction = Callable[[str], Optional[TierResult]]
+
+
+class TierStats:
+    """단계별 호출/확정/최종 결정 횟수와 최근 지연 시간"""
+
+    def __init__(self, window: int = 2048):
+        self.calls = 0
+        self.accepted = 0
+        self.decided = 0  # 이 단계의 결과가 최종 응답이 된 횟수
+        self.total_ms = 0.0
+        self._latencies = deque(maxlen=window)
+
+    def record(self, elapsed_ms: float, accepted: bool):
+        self.calls += 1
+        self.accepted += int(accepted)
+        self.total_ms += elapsed_ms
+        self._latencies.append(elapsed_ms)
+
+    def to_dict(self, requests: int) -> dict:
+        latencies = np.fromiter(self._latencies, dtype=np.float64, count=len(self._latencies))
+        p50, p99 = np.percentile(latencies, [50, 99]) if len(latencies) else (0.0, 0.0)
+        return {
+            "calls": self.calls,
+            "accepted": self.accepted,
+            "decided": self.decided,
+            "hit_rate": round(self.decided / requests, 4) if requests else 0.0,
+            "avg_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "p50_ms": round(float(p50), 3),
+            "p99_ms": round(float(p99), 3),
+        }
+
+
+class IntentCascade:
+    """등록한 순서대로 단계를 실행하는 의도 분류기
+
+    확정된 단계가 없으면 마지막으로 결과를 낸 단계(가장 정교한 모델)의 결과를 사용합니다.
+    """
+
+    def __init__(self, tiers: List[Tuple[str, TierFunction]]):
+        self._tiers = tiers
+        self._stats = {name: TierStats() for name, _ in tiers}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.unresolved = 0  # 어느 단계도 결과를 내지 못한 요청
+
+    def classify(self, text: str) -> Optional[Tuple[int, float, str]]:
+        """(의도, 신뢰도, 결정한 단계 이름) 반환, 모든 단계를 사용할 수 없으면 None"""
+        candidate = None
+        timings = []
+        for name, tier in self._tiers:
+            start = time.perf_counter()
+            result = tier(text)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if result is None:
+                continue
+            intent, confidence, accepted = result
+            timings.append((name, elapsed_ms, accepted))
+            candidate = (intent, confidence, name)
+            if accepted:
+                break
+
+        with self._lock:
+            self.requests += 1
+            if candidate is None:
+                self.unresolved += 1
+            else:
+                self._stats[candidate[2]].decided += 1
+            for name, elapsed_ms, accepted in timings:
+                self._stats[name].record(elapsed_ms, accepted)
+        return candidate
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "unresolved": self.unresolved,
+                "tiers": {name: stats.to_dict(self.requests) for name, stats in self._stats.items()},
+            }
+
+
+def build_intent_cascade(settings, keyword_matcher, get_intent: Callable[[], Any],
+                         get_escalation: Callable[[], Any]) -> IntentCascade:
+    """서버와 일괄 라벨링이 함께 쓰는 키워드 → 의도 분류 모델 → 더 큰 모델 단계
+
+    get_intent/get_escalation은 호출할 때마다 현재 모델(IntentModel 또는 None)을 반환하므로
+    모델을 교체해도 캐스케이드를 다시 만들 필요가 없습니다.
+    """
+
+    def keyword_tier(text: str) -> Optional[TierResult]:
+        """1단계: 한 의도의 키워드만 충분히 나오면 모델 없이 확정"""
+        if not settings.INTENT_KEYWORD_TIER:
+            return None
+        with stage("keyword_match"):
+            ranked = keyword_matcher.scores(text)
+        intent, confidence = keyword_matcher.resolve(ranked)
+        return intent, confidence, len(ranked) == 1 and ranked[0][1] >= settings.KEYWORD_TIER_MIN_SCORE
+
+    def model_tier(text: str) -> Optional[TierResult]:
+        """2단계: 의도 분류 모델 (신뢰도가 임계값 이상이면 확정)"""
+        intent, confidence = _best_intent(get_intent(), text)
+        if intent is None:
+            return None
+        return intent, confidence, confidence >= settings.CONFIDENCE_THRESHOLD
+
+    def escalation_tier(text: str) -> Optional[TierResult]:
+        """3단계: 신뢰도가 낮은 문장만 더 큰 모델로 재분류 (설정된 경우)"""
+        intent, confidence = _best_intent(get_escalation(), text)
+        if intent is None:
+            return None
+        return intent, confidence, True
+
+    return IntentCascade([
+        ("keyword", keyword_tier),
+        ("model", model_tier),
+        ("escalation", escalation_tier),
+    ])
+
+
+def _best_intent(intent_model, text: str) -> Tuple[Optional[int], float]:
+    """확률이 가장 높은 (의도, 확률), 모델이 없으면 (None, 0.0)"""
+    if intent_model is None:
+        return None, 0.0
+    with stage("vectorize"):
+        features = intent_model.vectorize([text])
+    with stage("classify"):
+        probabilities = intent_model.classify(features)[0]
+    best = int(np.argmax(probabilities))
+    return int(intent_model.classes[best]), float(probabilities[best])
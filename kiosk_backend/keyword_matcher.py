@@ -0,0 +1,156 @@
+"""
+키워드 기반 의도 분류기
+모델이 없거나 예측에 실패했을 때 사용하는 대체 분류기입니다.
+키워드 표 전체를 하나의 Aho–Corasick 오토마톤으로 미리 컴파일하여
+키워드 수와 관계없이 문장 길이에 비례하는 시간으로 모든 일치 항목을 찾습니다.
+
+비교는 음절 단위이며 어절 경계를 넘지 않습니다. "주민등본"처럼 어절 안의 키워드는 찾지만
+"이상해요"의 "이상"이나 "이 사진"처럼 두 어절에 걸친 글자는 "이사"로 보지 않습니다.
+키워드 마지막 음절에는 조사/어미로 붙는 받침(ㄴ, ㄹ, ㅁ, ㅂ, ㅅ, ㅆ)만 허용하므로
+"이삿짐"(이사 + ㅅ), "뗄게요"(떼 + ㄹ)는 일치합니다.
+띄어 쓴 키워드("첫 화면")는 "첫 화면", "첫화면" 모두와 일치합니다.
+"""
+
+import unicodedata
+from collections import deque
+from typing import Dict, List, Mapping, Optional, Tuple, Union
+
+_SYLLABLE_BASE, _SYLLABLE_END = 0xAC00, 0xD7A3
+# 키워드 마지막 음절 뒤에 붙을 수 있는 받침 (종성 번호: ㄴ, ㄹ, ㅁ, ㅂ, ㅅ, ㅆ)
+# 조사 축약(난, 날), 관형형/명사형 어미(할, 함), 합쇼체(합니다), 사이시옷(이삿짐), 과거(뗐)
+_PARTICLE_FINALS = {4, 8, 16, 17, 19, 20}
+_WORD_BOUNDARY = " "
+
+
+def strip_particle_final(ch: str) -> Optional[str]:
+    """조사/어미 받침이 붙은 음절에서 받침을 뺀 음절 (해당하지 않으면 None)"""
+    code = ord(ch)
+    if _SYLLABLE_BASE <= code <= _SYLLABLE_END and (code - _SYLLABLE_BASE) % 28 in _PARTICLE_FINALS:
+        return chr(code - (code - _SYLLABLE_BASE) % 28)
+    return None
+
+
+def normalize_keyword_text(text: str) -> str:
+    """비교용 정규화 (NFC, 소문자, 공백/문장부호는 어절 경계 하나로)"""
+    text = unicodedata.normalize("NFC", text).lower()
+    text = "".join(ch if ch.isalnum() else _WORD_BOUNDARY for ch in text)
+    return _WORD_BOUNDARY.join(text.split())
+
+
+KeywordTable = Mapping[int, Union[Mapping[str, float], List[str]]]
+
+
+class KeywordMatcher:
+    """키워드 표로 만든 Aho–Corasick 의도 분류기
+
+    table: {의도: {키워드: 가중치}} (가중치를 생략한 키워드 목록도 허용, 가중치 1.0)
+    의도별 점수는 문장에 나타난 서로 다른 키워드의 가중치 합입니다.
+    strong_score: 최대 신뢰도를 주는 점수 (이보다 약한 키워드만 나오면 신뢰도도 비례해서 낮아짐)
+    """
+
+    def __init__(self, table: KeywordTable, default_intent: int = 0,
+                 default_confidence: float = 0.60, max_confidence: float = 0.95, strong_score: float = 1.0):
+        self.default_intent = default_intent
+        self.default_confidence = default_confidence
+        self.max_confidence = max_confidence
+        self.strong_score = strong_score
+
+        # 트라이 (상태별 전이, 실패 링크, 출력: (키워드 번호) 목록)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self._keywords: List[Tuple[str, int, float]] = []  # (원본 키워드, 의도, 가중치)
+
+        for intent, keywords in table.items():
+            if not isinstance(keywords, Mapping):
+                keywords = {keyword: 1.0 for keyword in keywords}
+            for keyword, weight in keywords.items():
+                self._add(keyword, int(intent), float(weight))
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        return len(self._keywords)
+
+    def _add(self, keyword: str, intent: int, weight: float):
+        pattern = normalize_keyword_text(keyword)
+        if not pattern:
+            return
+        index = len(self._keywords)
+        self._keywords.append((keyword, intent, weight))
+        self._insert(pattern, index)
+        if _WORD_BOUNDARY in pattern:
+            # 띄어 쓴 키워드는 붙여 쓴 형태도 같은 키워드로 등록
+            self._insert(pattern.replace(_WORD_BOUNDARY, ""), index)
+
+    def _insert(self, pattern: str, index: int):
+        state = 0
+        for ch in pattern:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(index)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(ch, 0)
+                # 접미사로 끝나는 키워드 출력도 함께 보관 (검색 시 실패 링크를 따라가지 않도록)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def _step(self, state: int, ch: str) -> int:
+        goto, fail = self._goto, self._fail
+        while state and ch not in goto[state]:
+            state = fail[state]
+        return goto[state].get(ch, 0)
+
+    def find(self, text: str) -> List[Tuple[str, int, float]]:
+        """문장에 나타난 서로 다른 키워드 목록 (키워드, 의도, 가중치)"""
+        found = set()
+        state = 0
+        output = self._output
+        for ch in normalize_keyword_text(text):
+            stem = strip_particle_final(ch)
+            if stem is not None:
+                # 받침을 뺀 음절에서 끝나는 키워드 ("이삿짐" → "이사"), 이어지는 검색은 원래 음절로
+                stem_state = self._step(state, stem)
+                if output[stem_state]:
+                    found.update(output[stem_state])
+            state = self._step(state, ch)
+            if output[state]:
+                found.update(output[state])
+        return [self._keywords[i] for i in sorted(found)]
+
+    def scores(self, text: str) -> List[Tuple[int, float]]:
+        """의도별 점수 (높은 순, 같으면 의도 번호 순)"""
+        totals: Dict[int, float] = {}
+        for _, intent, weight in self.find(text):
+            totals[intent] = totals.get(intent, 0.0) + weight
+        return sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+
+    def predict(self, text: str) -> Tuple[int, float]:
+        """(의도, 신뢰도) 반환
+
+        신뢰도는 1위 의도의 점수 비율과 점수 크기(strong_score 대비)를 곱해 기본 신뢰도~최대 신뢰도 구간으로 옮긴 값이며,
+        일치하는 키워드가 없으면 (기본 의도, 기본 신뢰도)입니다.
+        """
+        return self.resolve(self.scores(text))
+
+    def resolve(self, ranked: List[Tuple[int, float]]) -> Tuple[int, float]:
+        """scores() 결과를 (의도, 신뢰도)로 변환"""
+        if not ranked:
+            return self.default_intent, self.default_confidence
+        intent, best = ranked[0]
+        share = best / sum(score for _, score in ranked)
+        strength = min(1.0, best / self.strong_score) if self.strong_score > 0 else 1.0
+        return intent, self.default_confidence + (self.max_confidence - self.default_confidence) * share * strength
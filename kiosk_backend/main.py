@@ -1,18 +1,45 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, WebSocket, WebSocketDisconnect, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 import whisper
-import joblib
+import torch
 import os
-import tempfile
+import json
+import random
+import asyncio
+import contextvars
+import threading
+import time
+import weakref
 import logging
-from typing import Dict, Any
+from typing import Dict, List, Optional
+import numpy as np
 import uvicorn
 from pydantic import BaseModel
 
-# 로깅 설정
-logging.basicConfig(level=logging.INFO)
+from async_logging import REQUEST_LOGGER, AsyncLogWriter
+from audio_utils import SAMPLE_RATE, AudioDecodeError, decode_in_memory, decode_with_ffmpeg, encode_wav, pcm_to_float32
+from compressed_audio import IN_PROCESS_FORMATS, decode_compressed
+from config import get_config
+from decoding_profiles import DecodingProfile, build_domain_prompt, build_profiles
+from gateway import GatewayUnavailableError, InferenceGateway
+from inference import BatchScheduler, InferencePool, InferenceQueueFullError
+from intent_cascade import build_intent_cascade
+from keyword_matcher import KeywordMatcher
+from metrics import MetricsRegistry, end_trace, stage, start_trace
+from model_loader import (
+    INTENT_MODEL_FILE, VECTORIZER_FILE, ModelLoadState, find_ai_module_path,
+    find_compiled_intent_path, load_compiled_intent_model, load_pickle, load_whisper_model, share_weights_copy
+)
+from model_registry import ModelRegistry
+from result_cache import LRUCache, content_hash, intent_cache_text
+from upload_guard import MULTIPART_OVERHEAD, BodySizeLimitMiddleware, UploadLimits, UploadRejectedError
+from vad import SPEECH_END, SPEECH_START, EnergyEndpointer, trim_silence
+from whisper_escalation import EscalationPolicy, EscalationStats, Transcription
+
 logger = logging.getLogger(__name__)
+# 요청 단위 구조화 이벤트 (샘플링 대상)
+request_logger = logging.getLogger(REQUEST_LOGGER)
 
 app = FastAPI(
     title="어르신 음성인식 AI 키오스크",
@@ -29,10 +56,112 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 전역 변수로 모델들 저장
-whisper_model = None
-intent_classifier = None
-vectorizer = None
+settings = get_config()
+
+# 음성 업로드 본문은 수신 중에 크기를 확인하여 제한을 넘으면 바로 중단
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_bytes=settings.MAX_FILE_SIZE + MULTIPART_OVERHEAD,
+    paths=["/voice-to-intent"],
+)
+upload_limits = UploadLimits(settings.MAX_FILE_SIZE, settings.MAX_AUDIO_SECONDS, settings.ALLOWED_AUDIO_FORMATS)
+
+# 로깅 설정: 요청 경로에서는 대기열에 넣기만 하고 백그라운드 스레드가 콘솔/JSON lines 파일에 기록
+log_writer = AsyncLogWriter(
+    level=logging.INFO,
+    log_file=settings.LOG_FILE,
+    max_bytes=settings.LOG_MAX_BYTES,
+    backup_count=settings.LOG_BACKUP_COUNT,
+    queue_size=settings.LOG_QUEUE_SIZE,
+    sample_rate=settings.LOG_SAMPLE_RATE,
+    slow_ms=settings.LOG_SLOW_MS,
+    console=settings.LOG_CONSOLE,
+)
+log_writer.start()
+
+def log_request(event: str, started: float, success: bool, text: Optional[str] = None, **fields):
+    """요청 결과 이벤트 기록 (포맷팅/쓰기는 기록 스레드에서 수행)"""
+    fields["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    if text is not None and settings.LOG_TRANSCRIPTS:
+        fields["text"] = text
+    request_logger.info(event, extra={"event": event, "success": success, **fields})
+
+def record_stages(trace, endpoint: str):
+    for name, seconds in trace.stages.items():
+        stage_seconds.observe(seconds, endpoint, name)
+
+@app.middleware("http")
+async def record_request_timing(request: Request, call_next):
+    """요청별 단계 시간 기록 → 히스토그램 집계 + Server-Timing 헤더"""
+    if not settings.METRICS_ENABLED:
+        return await call_next(request)
+    
+    trace, token = start_trace()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        end_trace(token)
+        total = trace.elapsed()
+        # 경로 대신 엔드포인트 함수 이름을 라벨로 사용 (경로 변수/404 경로로 라벨이 늘어나지 않도록)
+        endpoint = getattr(request.scope.get("endpoint"), "__name__", "unmatched")
+        request_seconds.observe(total, endpoint, status)
+        record_stages(trace, endpoint)
+        if status >= 400:
+            request_errors.inc(endpoint, status)
+    
+    if settings.SERVER_TIMING_HEADER and trace.stages:
+        response.headers["Server-Timing"] = trace.server_timing(total)
+    return response
+
+# 로드된 모델 저장소 (관리자 API로 교체 가능)
+registry = ModelRegistry()
+
+# 모델 로드 상태 (/ready)
+model_state = ModelLoadState()
+model_loading_task: Optional[asyncio.Task] = None
+
+# Whisper 추론 전용 워커 풀 (이벤트 루프를 막지 않도록 분리)
+inference_pool = InferencePool(
+    max_workers=settings.INFERENCE_WORKERS,
+    max_queue=settings.INFERENCE_QUEUE_SIZE,
+    name="whisper",
+)
+_worker_state = threading.local()
+
+# 게이트웨이 모드에서 음성 요청을 전달할 추론 백엔드 풀 (SERVER_ROLE=gateway)
+gateway: Optional[InferenceGateway] = None
+
+# 요청/단계별 지연 시간 및 대체 경로 지표 (/metrics)
+metrics_registry = MetricsRegistry()
+request_seconds = metrics_registry.histogram(
+    "kiosk_request_seconds", "요청 전체 처리 시간 (초)", ["endpoint", "status"]
+)
+stage_seconds = metrics_registry.histogram(
+    "kiosk_stage_seconds", "요청 단계별 처리 시간 (초, 중첩 단계 제외)", ["endpoint", "stage"]
+)
+demo_fallbacks = metrics_registry.counter(
+    "kiosk_demo_fallbacks", "모델이 없어 데모 응답으로 대체한 횟수", ["kind"]
+)
+empty_transcripts = metrics_registry.counter(
+    "kiosk_empty_transcripts", "발화가 없거나 인식 결과가 비어 있던 음성 요청 수", ["reason"]
+)
+request_errors = metrics_registry.counter(
+    "kiosk_request_errors", "오류 응답 수 (4xx/5xx)", ["endpoint", "status"]
+)
+metrics_registry.gauge(
+    "kiosk_inference_jobs", "Whisper 추론 워커 풀 작업 수",
+    lambda: [({"state": state}, inference_pool.stats()[state]) for state in ("running", "queued")]
+)
+metrics_registry.gauge(
+    "kiosk_log_records", "비동기 로그 대기열 (queued: 기록 대기, dropped: 대기열이 가득 차 버린 수)",
+    lambda: [({"state": state}, log_writer.stats()[state]) for state in ("queued", "dropped")]
+)
+metrics_registry.gauge(
+    "kiosk_cache_hit_rate", "결과 캐시 적중률",
+    lambda: [({"cache": cache.name}, cache.stats()["hit_rate"]) for cache in (intent_cache, audio_cache)]
+)
 
 # 의도 매핑
 INTENT_MAPPING = {
@@ -43,6 +172,9 @@ INTENT_MAPPING = {
     4: "시작화면"
 }
 
+# 모델 없이 동작하는 키워드 분류기 (대체 경로, 시작 시 한 번 컴파일)
+keyword_matcher = KeywordMatcher(settings.INTENT_KEYWORDS)
+
 # 요청/응답 모델
 class TextRequest(BaseModel):
     text: str
@@ -54,6 +186,37 @@ class VoiceResponse(BaseModel):
     intent_description: str
     confidence: float
     message: str
+    timings: Optional[Dict[str, float]] = None
+
+class BatchTextRequest(BaseModel):
+    texts: List[str]
+    top_k: int = 1
+
+class IntentScore(BaseModel):
+    intent: int
+    intent_description: str
+    score: float
+
+class BatchIntentItem(BaseModel):
+    success: bool
+    text: str
+    predicted_intent: int
+    intent_description: str
+    confidence: float
+    top_k: List[IntentScore]
+
+class BatchIntentResponse(BaseModel):
+    success: bool
+    count: int
+    results: List[BatchIntentItem]
+
+class WhisperSwapRequest(BaseModel):
+    size: str
+
+class IntentReloadRequest(BaseModel):
+    compiled_path: Optional[str] = None
+    model_path: Optional[str] = None
+    vectorizer_path: Optional[str] = None
 
 class IntentResponse(BaseModel):
     success: bool
@@ -62,93 +225,431 @@ class IntentResponse(BaseModel):
     confidence: float
     message: str
 
+def is_gateway() -> bool:
+    return settings.SERVER_ROLE == "gateway"
+
 @app.on_event("startup")
 async def startup_event():
-    """서버 시작시 AI 모델들 로드"""
-    global whisper_model, intent_classifier, vectorizer
+    """서버 시작시 AI 모델들을 백그라운드에서 병렬 로드 (요청은 /ready 상태로 관문 처리)"""
+    global model_loading_task, gateway
+    if is_gateway():
+        # 게이트웨이: Whisper 없이 추론 백엔드로 음성 요청 전달 (의도 분류 모델만 로드)
+        gateway = InferenceGateway(
+            settings.GATEWAY_BACKENDS,
+            pool_size=settings.GATEWAY_POOL_SIZE,
+            timeout=settings.GATEWAY_TIMEOUT,
+            max_attempts=settings.GATEWAY_MAX_ATTEMPTS,
+            health_interval=settings.GATEWAY_HEALTH_INTERVAL,
+        )
+        await gateway.start()
+        logger.info(f"게이트웨이 모드: 백엔드 {len(gateway.backends)}개")
+    if model_state.finished:
+        # 멀티 프로세스 모드: fork 전에 부모 프로세스가 이미 로드한 모델을 공유
+        logger.info(f"부모 프로세스에서 로드한 모델 사용 (pid {os.getpid()})")
+        return
+    model_loading_task = asyncio.create_task(load_models())
+
+# AI 모듈 경로 (여러 경로 시도)
+AI_MODULE_CANDIDATES = [
+    "../ai_module",  # 상위 디렉토리
+    "./ai_module",   # 현재 디렉토리
+    "ai_module",     # 하위 디렉토리
+    os.path.join(os.path.dirname(__file__), "../ai_module"),  # 절대 경로
+]
+
+def resolve_compiled_intent_path() -> Optional[str]:
+    """컴파일된 의도 분류 모델 경로 결정 (설정 경로 우선, 없으면 여러 경로 탐색)"""
+    if os.path.exists(os.path.join(settings.INTENT_COMPILED_PATH, "meta.json")):
+        return settings.INTENT_COMPILED_PATH
+    return find_compiled_intent_path(AI_MODULE_CANDIDATES)
+
+def resolve_intent_model_paths() -> Optional[tuple]:
+    """의도 분류 모델 경로 결정 (설정 경로 우선, 없으면 여러 경로 탐색)"""
+    if os.path.exists(settings.INTENT_MODEL_PATH) and os.path.exists(settings.VECTORIZER_PATH):
+        return settings.INTENT_MODEL_PATH, settings.VECTORIZER_PATH
     
-    try:
-        # Whisper 모델 로드
-        logger.info("Whisper 모델 로드 중...")
-        whisper_model = whisper.load_model("tiny")
-        logger.info("Whisper 모델 로드 완료")
-        
-        # 의도 분류 모델 및 벡터라이저 로드
-        logger.info("의도 분류 모델 로드 중...")
-        
-        # AI 모듈 경로 (여러 경로 시도)
-        possible_paths = [
-            "../ai_module",  # 상위 디렉토리
-            "./ai_module",   # 현재 디렉토리
-            "ai_module",     # 하위 디렉토리
-            os.path.join(os.path.dirname(__file__), "../ai_module"),  # 절대 경로
-        ]
-        
-        ai_module_path = None
-        for path in possible_paths:
-            if os.path.exists(f"{path}/intent_model.pkl") and os.path.exists(f"{path}/vectorizer.pkl"):
-                ai_module_path = path
-                logger.info(f"AI 모듈 경로 찾음: {ai_module_path}")
-                break
-        
-        if ai_module_path is None:
-            logger.warning("AI 모델 파일들을 찾을 수 없습니다.")
-            logger.warning("다음 경로들을 확인했습니다:")
-            for path in possible_paths:
-                logger.warning(f"  - {path}")
-            logger.warning("데모 모드로 실행됩니다.")
-            return  # 오류를 발생시키지 않고 데모 모드로 계속 실행
+    ai_module_path = find_ai_module_path(AI_MODULE_CANDIDATES)
+    if ai_module_path is None:
+        logger.warning("AI 모델 파일들을 찾을 수 없습니다.")
+        logger.warning("다음 경로들을 확인했습니다:")
+        for path in [settings.AI_MODULE_PATH] + AI_MODULE_CANDIDATES:
+            logger.warning(f"  - {path}")
+        return None
+    
+    logger.info(f"AI 모듈 경로 찾음: {ai_module_path}")
+    return os.path.join(ai_module_path, INTENT_MODEL_FILE), os.path.join(ai_module_path, VECTORIZER_FILE)
+
+def get_whisper_sizes() -> List[str]:
+    """시작 시 로드할 Whisper 크기 목록 (설정된 크기가 항상 첫 번째, 재인식용 크기 포함)"""
+    sizes = [settings.WHISPER_MODEL_SIZE]
+    for size in settings.WHISPER_PRELOAD_SIZES + [settings.WHISPER_ESCALATION_SIZE]:
+        if size and size not in sizes:
+            sizes.append(size)
+    return sizes
+
+def load_whisper(size: str):
+    """설정된 캐시 경로/양자화 방식으로 Whisper 모델 로드"""
+    return load_whisper_model(size, cache_dir=settings.WHISPER_CACHE_DIR or None, quantize=settings.WHISPER_QUANTIZE)
+
+async def load_models():
+    """Whisper 모델과 의도 분류 모델/벡터라이저를 동시에 로드"""
+    loaders = {
+        f"whisper:{size}": (lambda size=size: load_whisper(size))
+        for size in (get_whisper_sizes() if not is_gateway() else [])
+    }
+    
+    # 컴파일된 모델 우선 (pickle/scikit-learn 없이 메모리 매핑으로 즉시 로드)
+    compiled_path = resolve_compiled_intent_path() if settings.INTENT_MODEL_FORMAT != "pickle" else None
+    paths = resolve_intent_model_paths() if compiled_path is None and settings.INTENT_MODEL_FORMAT != "compiled" else None
+    if compiled_path is not None:
+        loaders["intent_classifier"] = lambda: load_compiled_intent_model(compiled_path)
+    elif paths is not None:
+        model_path, vectorizer_path = paths
+        loaders["intent_classifier"] = lambda: load_pickle(model_path)
+        loaders["vectorizer"] = lambda: load_pickle(vectorizer_path)
+    else:
+        model_state.fail("intent_classifier", "모델 파일 없음")
+    if settings.INTENT_ESCALATION_PATH:
+        loaders["intent_escalation"] = lambda: load_compiled_intent_model(settings.INTENT_ESCALATION_PATH)
+    
+    logger.info("AI 모델 병렬 로드 중...")
+    results = await model_state.run(loaders)
+    
+    for size in get_whisper_sizes():
+        model = results.get(f"whisper:{size}")
+        if model is not None:
+            registry.add_whisper(size, model, activate=size == settings.WHISPER_MODEL_SIZE)
+    if compiled_path is not None and results.get("intent_classifier") is not None:
+        registry.set_intent(results["intent_classifier"], None, source=compiled_path)
+    elif results.get("intent_classifier") is not None and results.get("vectorizer") is not None:
+        registry.set_intent(results["intent_classifier"], results["vectorizer"], source=paths[0])
+    if results.get("intent_escalation") is not None:
+        registry.set_intent_escalation(results["intent_escalation"], None, source=settings.INTENT_ESCALATION_PATH)
+    
+    if model_state.status == ModelLoadState.READY:
+        logger.info(f"모델 로드 완료: {model_state.to_dict()['timings']}")
+    else:
+        # 시연용으로 모델 로드 실패해도 서버는 계속 실행되도록 함
+        logger.warning("데모 모드로 실행됩니다. (실제 모델 없이 목업 응답)")
+
+async def wait_for_models():
+    """모델 로드가 끝날 때까지 대기 (제한 시간 초과 시 503)"""
+    if not await model_state.wait(settings.MODEL_READY_TIMEOUT):
+        raise HTTPException(
+            status_code=503,
+            detail="모델을 준비 중입니다. 잠시 후 다시 시도해 주세요.",
+            headers={"Retry-After": str(settings.INFERENCE_RETRY_AFTER)}
+        )
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """서버 종료시 추론 워커/게이트웨이 연결 정리"""
+    inference_pool.shutdown(wait=False)
+    if gateway is not None:
+        await gateway.close()
+    log_writer.stop()
+
+def get_worker_whisper_model(model):
+    """현재 워커 스레드에서 사용할 Whisper 모델 반환
+
+    Whisper 디코더는 kv-cache 훅을 모델 모듈에 직접 등록하므로 한 인스턴스를
+    여러 스레드가 동시에 쓰면 결과가 섞입니다. 워커가 2개 이상이면 스레드마다
+    가중치를 공유하는 사본(model_loader.share_weights_copy)을 만들어 훅만 분리합니다.
+    (원본이 해제되면 사본도 함께 정리됨)
+    """
+    if inference_pool.max_workers <= 1:
+        return model
+    replicas = getattr(_worker_state, "replicas", None)
+    if replicas is None:
+        replicas = _worker_state.replicas = weakref.WeakKeyDictionary()
+    replica = replicas.get(model)
+    if replica is None:
+        replica = replicas[model] = share_weights_copy(model)
+    return replica
+
+def transcribe_full(model, audio: np.ndarray, profile: DecodingProfile, size: str) -> Transcription:
+    """model.transcribe 경로로 텍스트 변환 (30초를 넘는 음성, 온도 폴백이 필요한 음성)"""
+    result = model.transcribe(audio, **profile.transcribe_options(model.device.type != "cpu"))
+    segments = result.get("segments") or []
+    return Transcription(
+        text=result["text"].strip(),
+        avg_logprob=float(np.mean([seg["avg_logprob"] for seg in segments])) if segments else None,
+        no_speech_prob=float(np.mean([seg["no_speech_prob"] for seg in segments])) if segments else None,
+        model_size=size,
+    )
+
+def transcribe_batch(items: List[tuple]) -> List[Transcription]:
+    """여러 음성을 Whisper 크기별로 묶어 한 번의 인코더/디코더 패스로 텍스트 변환 (추론 워커 스레드에서 실행)
+
+    items: (16kHz float32 배열, Whisper 크기 또는 None=활성 모델, 디코딩 프로필) 목록
+    같은 크기/프로필끼리 묶어 디코딩하며, 30초를 넘는 음성과 온도 폴백이 필요한 결과
+    (profile.needs_fallback)는 기존 transcribe 경로로 개별 처리합니다.
+    """
+    results: List[Optional[Transcription]] = [None] * len(items)
+    groups: Dict[tuple, List[int]] = {}
+    for i, (_, size, profile) in enumerate(items):
+        groups.setdefault((size or registry.active_whisper_size, profile), []).append(i)
+    
+    for (size, profile), indices in groups.items():
+        model = get_worker_whisper_model(registry.whisper(size))
+        fp16 = model.device.type != "cpu"
+        mels, batch_index = [], []
         
-        intent_classifier = joblib.load(f"{ai_module_path}/intent_model.pkl")
-        vectorizer = joblib.load(f"{ai_module_path}/vectorizer.pkl")
-        logger.info("의도 분류 모델 로드 완료")
+        for i in indices:
+            audio = items[i][0]
+            if len(audio) > whisper.audio.N_SAMPLES:
+                results[i] = transcribe_full(model, audio, profile, size)
+                continue
+            mels.append(whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels=model.dims.n_mels))
+            batch_index.append(i)
         
-    except Exception as e:
-        logger.error(f"모델 로드 실패: {e}")
-        logger.warning("데모 모드로 실행됩니다. (실제 모델 없이 목업 응답)")
-        # 시연용으로 모델 로드 실패해도 서버는 계속 실행되도록 함
+        if mels:
+            options = whisper.DecodingOptions(**profile.decoding_options(fp16))
+            decoded = whisper.decode(model, torch.stack(mels).to(model.device), options)
+            for i, result in zip(batch_index, decoded):
+                if profile.needs_fallback(result):
+                    results[i] = transcribe_full(model, items[i][0], profile, size)
+                    continue
+                results[i] = Transcription(
+                    text=result.text.strip(),
+                    avg_logprob=result.avg_logprob,
+                    no_speech_prob=result.no_speech_prob,
+                    model_size=size,
+                )
+    
+    return results
+
+async def decode_upload(content: bytes, content_type: Optional[str], filename: Optional[str],
+                        audio_format: Optional[str] = None) -> np.ndarray:
+    """업로드 데이터를 Whisper 입력 배열로 변환
+
+    WAV/PCM과 FLAC/Ogg(Opus)는 별도 스레드에서 메모리 디코딩합니다 (16kHz가 아니면 리샘플링).
+    그 외 압축 포맷(또는 메모리 디코딩에 실패한 경우)만 ffmpeg를 별도 스레드에서 실행합니다.
+    """
+    loop = asyncio.get_running_loop()
+    audio_array = await loop.run_in_executor(None, decode_in_memory, content, content_type)
+    if audio_array is not None:
+        return audio_array
+    
+    if audio_format in IN_PROCESS_FORMATS:
+        audio_array = await loop.run_in_executor(None, decode_compressed, content, settings.MAX_AUDIO_SECONDS)
+        if audio_array is not None:
+            return audio_array
+    
+    suffix = os.path.splitext(filename or "")[1]
+    return await loop.run_in_executor(None, decode_with_ffmpeg, content, suffix)
+
+def preprocess_audio(audio_array: np.ndarray) -> np.ndarray:
+    """인식 전 전처리: 앞뒤 무음 제거 및 최대 길이 제한 (발화가 없으면 빈 배열)"""
+    original_len = len(audio_array)
+    if settings.TRIM_SILENCE:
+        audio_array = trim_silence(audio_array, threshold=settings.VAD_THRESHOLD)
+    
+    max_samples = int(settings.MAX_TRANSCRIBE_SECONDS * SAMPLE_RATE)
+    if len(audio_array) > max_samples:
+        logger.info(f"음성이 너무 길어 {settings.MAX_TRANSCRIBE_SECONDS:.0f}초로 자릅니다.")
+        audio_array = audio_array[:max_samples]
+    
+    logger.debug("전처리: %.2f초 → %.2f초", original_len / SAMPLE_RATE, len(audio_array) / SAMPLE_RATE)
+    return audio_array
+
+# Whisper 디코딩 프로필 (kiosk 프로필의 초기 프롬프트는 의도 데이터셋 어휘로 생성)
+decoding_profiles = build_profiles(
+    language=settings.WHISPER_LANGUAGE,
+    prompt=settings.WHISPER_PROMPT or build_domain_prompt(settings.INTENT_DATASET_PATH),
+    max_tokens=settings.WHISPER_MAX_TOKENS,
+)
+
+# 동시에 들어온 음성 인식 요청을 묶어서 처리
+transcribe_scheduler = BatchScheduler(
+    inference_pool,
+    transcribe_batch,
+    max_batch_size=settings.WHISPER_BATCH_SIZE,
+    max_wait_ms=settings.WHISPER_BATCH_WAIT_MS,
+)
+
+# 인식 품질이 낮을 때만 더 큰 Whisper 모델로 재인식
+escalation_policy = EscalationPolicy(
+    min_avg_logprob=settings.ESCALATION_MIN_AVG_LOGPROB,
+    max_no_speech_prob=settings.ESCALATION_MAX_NO_SPEECH_PROB,
+    min_intent_confidence=settings.ESCALATION_MIN_INTENT_CONFIDENCE,
+)
+escalation_stats = EscalationStats()
+
+# 반복되는 문장/같은 음성 파일 결과 캐시 (의도 분류 모델 교체 시 의도 캐시 무효화)
+intent_cache = LRUCache(settings.INTENT_CACHE_SIZE, settings.INTENT_CACHE_TTL, name="intent")
+audio_cache = LRUCache(settings.AUDIO_CACHE_SIZE, settings.AUDIO_CACHE_TTL, name="audio")
+registry.on_intent_change(lambda intent_model: intent_cache.clear())
+
+def get_demo_transcription() -> str:
+    """Whisper 모델이 없을 때 사용할 시연용 인식 결과"""
+    demo_texts = [
+        "주민등록등본 발급해주세요",
+        "전입신고 하러 왔어요", 
+        "여권 만들고 싶어요",
+        "직원 좀 불러주세요",
+        "처음으로 돌아가고 싶어요"
+    ]
+    return random.choice(demo_texts)
+
+def get_decoding_profile(name: Optional[str] = None) -> DecodingProfile:
+    """이름으로 디코딩 프로필 조회 (미지정 시 기본 프로필, 없는 이름이면 400)"""
+    profile = decoding_profiles.get(name or settings.WHISPER_DECODING_PROFILE)
+    if profile is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"알 수 없는 디코딩 프로필입니다: {name} (사용 가능: {', '.join(decoding_profiles)})"
+        )
+    return profile
+
+async def transcribe_audio_array(audio_array: np.ndarray, size: Optional[str] = None,
+                                 profile: Optional[DecodingProfile] = None) -> tuple:
+    """음성 배열을 텍스트로 변환하고 (Transcription, 시간 정보) 반환 (size 미지정 시 활성 모델)"""
+    profile = profile or get_decoding_profile()
+    transcription, timing = await transcribe_scheduler.submit((audio_array, size, profile))
+    timings = {
+        "queue_wait_ms": round(timing.queue_wait_ms, 1),
+        "compute_ms": round(timing.compute_ms, 1),
+        "batch_size": timing.batch_size
+    }
+    logger.debug(
+        "음성 인식 결과 (%s): %s (대기 %.0fms, 연산 %.0fms, 배치 %d)",
+        transcription.model_size, transcription.text, timing.queue_wait_ms, timing.compute_ms, timing.batch_size
+    )
+    return transcription, timings
+
+def get_escalation_size() -> Optional[str]:
+    """재인식에 사용할 Whisper 크기 (설정되지 않았거나 로드되지 않았으면 None)"""
+    size = settings.WHISPER_ESCALATION_SIZE
+    if not size or size == registry.active_whisper_size or registry.whisper(size) is None:
+        return None
+    return size
+
+async def recognize_speech(audio_array: np.ndarray, profile: Optional[DecodingProfile] = None) -> tuple:
+    """활성 모델로 인식하고 품질이 낮으면 더 큰 모델로 재인식하여 (텍스트, 시간 정보) 반환"""
+    transcription, timings = await transcribe_audio_array(audio_array, profile=profile)
+    escalation_size = get_escalation_size()
+    if escalation_size is None:
+        return transcription.text, timings
+    
+    # 의도 분류 결과는 캐시되므로 이후 응답 생성 시 다시 계산하지 않음
+    intent_confidence = predict_intent_with_confidence(transcription.text)[1] if transcription.text else None
+    escalation_stats.record_check()
+    reason = escalation_policy.check(transcription, intent_confidence)
+    if reason is None:
+        return transcription.text, timings
+    
+    start = time.perf_counter()
+    try:
+        escalated, escalated_timings = await transcribe_audio_array(audio_array, escalation_size, profile)
+    except InferenceQueueFullError:
+        logger.warning(f"대기열이 가득 차 재인식을 건너뜁니다 ({reason})")
+        escalation_stats.record_failure(reason)
+        return transcription.text, timings
+    extra_ms = (time.perf_counter() - start) * 1000
+    
+    text = escalated.text or transcription.text
+    escalation_stats.record_escalation(reason, extra_ms, text != transcription.text)
+    logger.info("재인식 (%s): '%s' → '%s' (+%.0fms, %s)", reason, transcription.text, text, extra_ms, escalation_size)
+    timings["escalation_ms"] = round(extra_ms, 1)
+    timings["escalation_compute_ms"] = escalated_timings["compute_ms"]
+    return text, timings
+
+def build_voice_response(transcribed_text: str, timings: Optional[Dict[str, float]] = None) -> "VoiceResponse":
+    """인식된 텍스트로 의도 분류 후 음성 응답 생성"""
+    if not transcribed_text:
+        return VoiceResponse(
+            success=False,
+            transcribed_text="",
+            predicted_intent=-1,
+            intent_description="인식 실패",
+            confidence=0.0,
+            message="음성을 인식할 수 없습니다. 다시 말씀해 주세요.",
+            timings=timings
+        )
+    
+    # 의도 분류
+    predicted_intent, confidence = predict_intent_with_confidence(transcribed_text)
+    intent_description = INTENT_MAPPING.get(predicted_intent, "알 수 없음")
+    
+    logger.debug("예측된 의도: %s (신뢰도: %.2f)", intent_description, confidence)
+    
+    return VoiceResponse(
+        success=True,
+        transcribed_text=transcribed_text,
+        predicted_intent=predicted_intent,
+        intent_description=intent_description,
+        confidence=confidence,
+        message=f"'{transcribed_text}' → {intent_description}",
+        timings=timings
+    )
+
+def predict_intents_batch(texts: List[str], top_k: int = 1) -> List[List[tuple]]:
+    """여러 텍스트의 의도를 한 번에 예측하여 텍스트별 상위 k개 (의도, 확률) 목록 반환
+
+    predict_proba 한 번으로 의도와 신뢰도를 함께 구합니다.
+    모델이 없으면 텍스트별 데모 응답을 반환합니다.
+    """
+    intent_model = registry.intent
+    if intent_model is None:
+        demo_fallbacks.inc("intent", amount=len(texts))
+        return [[get_demo_intent_response(text)] for text in texts]
+    if not texts:
+        return []
+    
+    # 확률이 가장 높은 의도 = predict 결과 (신뢰도는 확률의 최댓값)
+    with stage("vectorize"):
+        features = intent_model.vectorize(texts)
+    with stage("classify"):
+        probabilities = intent_model.classify(features)
+    classes = intent_model.classes
+    k = max(1, min(top_k, len(classes)))
+    top_indices = np.argsort(-probabilities, axis=1)[:, :k]
+    
+    return [
+        [(int(classes[j]), float(probabilities[i, j])) for j in row]
+        for i, row in enumerate(top_indices)
+    ]
 
 def predict_intent_with_confidence(text: str) -> tuple:
-    """텍스트에서 의도 예측 및 신뢰도 반환"""
+    """텍스트에서 의도 예측 및 신뢰도 반환 (연속 공백만 정규화한 문장 단위로 캐시)"""
     try:
         # 모델이 로드되지 않은 경우 데모 응답
-        if intent_classifier is None or vectorizer is None:
+        intent_model = registry.intent
+        if intent_model is None:
             logger.warning("모델이 로드되지 않아 데모 응답을 반환합니다.")
+            demo_fallbacks.inc("intent")
             return get_demo_intent_response(text)
         
-        # 텍스트 벡터화
-        text_vec = vectorizer.transform([text])
+        # 모델 버전을 키에 포함하여 교체 직전에 계산된 결과가 섞이지 않도록 함
+        # (재분류 모델이 바뀌면 저신뢰 문장의 결과만 달라지므로 캐시 전체를 비우지 않고 키로 구분)
+        escalation = registry.intent_escalation
+        key = (intent_model.version, escalation.version if escalation else 0, intent_cache_text(text))
+        cached = intent_cache.get(key)
+        if cached is not None:
+            return cached
         
-        # 의도 예측
-        predicted_intent = intent_classifier.predict(text_vec)[0]
-        
-        # 신뢰도 계산 (확률의 최댓값)
-        probabilities = intent_classifier.predict_proba(text_vec)[0]
-        confidence = float(max(probabilities))
-        
-        return predicted_intent, confidence
+        classified = intent_cascade.classify(text)
+        if classified is None:
+            return get_demo_intent_response(text)
+        result = classified[:2]
+        intent_cache.put(key, result)
+        return result
         
     except Exception as e:
         logger.error(f"의도 예측 실패: {e}")
+        demo_fallbacks.inc("intent_error")
         return get_demo_intent_response(text)
 
+intent_cascade = build_intent_cascade(
+    settings, keyword_matcher,
+    get_intent=lambda: registry.intent,
+    get_escalation=lambda: registry.intent_escalation,
+)
+
 def get_demo_intent_response(text: str) -> tuple:
-    """데모용 의도 응답 (모델 없이도 시연 가능)"""
-    text_lower = text.lower()
-    
-    # 키워드 기반 간단한 분류
-    if any(keyword in text_lower for keyword in ["등본", "증명서", "발급", "뽑"]):
-        return 0, 0.95  # 증명서 발급
-    elif any(keyword in text_lower for keyword in ["주소", "전입", "전출", "이사"]):
-        return 1, 0.92  # 주소 변경
-    elif any(keyword in text_lower for keyword in ["여권", "passport"]):
-        return 2, 0.88  # 여권 발급
-    elif any(keyword in text_lower for keyword in ["직원", "사람", "호출", "불러", "도움"]):
-        return 3, 0.90  # 직원 호출
-    elif any(keyword in text_lower for keyword in ["처음", "시작", "홈", "메인", "돌아"]):
-        return 4, 0.85  # 시작화면
-    else:
-        return 0, 0.60  # 기본값: 증명서 발급
+    """데모용 의도 응답 (모델 없이도 시연 가능, 키워드 점수 기반)"""
+    return keyword_matcher.predict(text)
 
 @app.get("/")
 def root():
@@ -156,94 +657,285 @@ def root():
     return {
         "message": "어르신 음성인식 AI 키오스크 백엔드가 실행 중입니다.",
         "status": "running",
-        "whisper_loaded": whisper_model is not None,
-        "intent_model_loaded": intent_classifier is not None
+        "models": model_state.status,
+        "whisper_loaded": registry.whisper() is not None,
+        "intent_model_loaded": registry.intent is not None
     }
 
+@app.get("/ready")
+def readiness_check():
+    """준비 상태 확인 (모델 로드가 끝나기 전에는 503)"""
+    body = model_state.to_dict()
+    if not model_state.finished:
+        return JSONResponse(status_code=503, content=body)
+    return body
+
 @app.get("/health")
 def health_check():
     """헬스 체크"""
     return {
         "status": "healthy",
         "models_loaded": {
-            "whisper": whisper_model is not None,
-            "intent_classifier": intent_classifier is not None,
-            "vectorizer": vectorizer is not None
-        }
+            "whisper": registry.whisper() is not None,
+            "whisper_size": registry.active_whisper_size,
+            "intent_classifier": registry.intent is not None,
+            "vectorizer": registry.intent is not None
+        },
+        # requests: 결과를 기다리는 음성 인식 요청 수 (배치 시간 창 대기 + 배치 작업에 묶인 요청, 게이트웨이 부하 기준)
+        "inference": {
+            **inference_pool.stats(),
+            "requests": transcribe_scheduler.stats()["outstanding"],
+            "request_capacity": transcribe_scheduler.capacity,
+        },
+        "batching": transcribe_scheduler.stats(),
+        "cache_hit_rate": {"intent": intent_cache.stats()["hit_rate"], "audio": audio_cache.stats()["hit_rate"]},
+        "role": settings.SERVER_ROLE,
+        "gateway": gateway.stats() if gateway is not None else None
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus 형식 지표 (요청/단계별 지연 시간 히스토그램, 대체 경로/오류 카운터)"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="지표 수집이 비활성화되어 있습니다.")
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.post("/voice-to-intent", response_model=VoiceResponse)
-async def voice_to_intent(audio: UploadFile = File(...)):
-    """음성 파일을 받아서 텍스트 변환 후 의도 분류"""
+async def voice_to_intent(audio: UploadFile = File(...), profile: Optional[str] = None):
+    """음성 파일을 받아서 텍스트 변환 후 의도 분류 (?profile=로 디코딩 프로필 선택)"""
+    started = time.perf_counter()
+    
+    def log_voice_result(response: VoiceResponse, source: str) -> VoiceResponse:
+        log_request(
+            "voice_to_intent", started, response.success, text=response.transcribed_text,
+            source=source, profile=profile, intent=response.predicted_intent,
+            confidence=round(response.confidence, 3), timings=response.timings
+        )
+        return response
     
     try:
         # 업로드된 파일 검증
         if not audio.content_type or not audio.content_type.startswith('audio/'):
             raise HTTPException(status_code=400, detail="오디오 파일만 업로드 가능합니다.")
+        decoding_profile = get_decoding_profile(profile)
         
-        # 임시 파일로 저장
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-            content = await audio.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
+        await wait_for_models()
         
-        try:
-            # Whisper 모델이 없는 경우 데모 응답
-            if whisper_model is None:
-                logger.warning("Whisper 모델이 없어 데모 응답을 반환합니다.")
-                demo_texts = [
-                    "주민등록등본 발급해주세요",
-                    "전입신고 하러 왔어요", 
-                    "여권 만들고 싶어요",
-                    "직원 좀 불러주세요",
-                    "처음으로 돌아가고 싶어요"
-                ]
-                import random
-                transcribed_text = random.choice(demo_texts)
-            else:
-                # Whisper로 음성을 텍스트로 변환
-                logger.info("음성 인식 시작...")
-                result = whisper_model.transcribe(temp_file_path)
-                transcribed_text = result["text"].strip()
-                logger.info(f"음성 인식 결과: {transcribed_text}")
+        # 조각 단위로 읽으며 형식(매직 바이트)/크기/길이 확인
+        with stage("upload_read"):
+            try:
+                upload = await upload_limits.read(audio)
+            except UploadRejectedError as e:
+                raise HTTPException(status_code=e.status_code, detail=e.detail, headers=e.headers)
+        content = upload.content
+        timings = None
+        
+        # 게이트웨이: 대기열이 가장 짧은 추론 백엔드로 전달 (응답은 그대로 반환)
+        if gateway is not None:
+            status_code, body = await gateway.forward_voice(
+                content, audio.filename, audio.content_type, {"profile": profile} if profile else None
+            )
+            log_request(
+                "voice_to_intent", started, status_code == 200, text=body.get("transcribed_text"),
+                source="gateway", status=status_code, intent=body.get("predicted_intent")
+            )
+            return JSONResponse(status_code=status_code, content=body)
+        
+        # Whisper 모델이 없는 경우 데모 응답
+        if registry.whisper() is None:
+            logger.warning("Whisper 모델이 없어 데모 응답을 반환합니다.")
+            demo_fallbacks.inc("transcription")
+            transcribed_text = get_demo_transcription()
+            source = "demo"
+        else:
+            # 재시도로 같은 파일이 다시 올라오면 디코딩/인식을 건너뜀 (Whisper 크기/프로필별로 구분)
+            audio_key = (registry.active_whisper_size, decoding_profile.name, content_hash(content))
+            cached_text = audio_cache.get(audio_key)
+            if cached_text is not None:
+                return log_voice_result(build_voice_response(cached_text, {"audio_cache_hit": 1}), "audio_cache")
             
-            if not transcribed_text:
-                return VoiceResponse(
-                    success=False,
-                    transcribed_text="",
-                    predicted_intent=-1,
-                    intent_description="인식 실패",
-                    confidence=0.0,
-                    message="음성을 인식할 수 없습니다. 다시 말씀해 주세요."
-                )
+            # 임시 파일 없이 메모리에서 디코딩
+            with stage("decode"):
+                try:
+                    audio_array = await decode_upload(content, audio.content_type, audio.filename, upload.format)
+                except AudioDecodeError as e:
+                    logger.warning(f"오디오 디코딩 실패: {e}")
+                    raise HTTPException(status_code=400, detail="오디오 파일을 읽을 수 없습니다.")
+                
+                # 무음 제거 후 발화가 없으면 모델을 호출하지 않음
+                audio_array = preprocess_audio(audio_array)
+            if len(audio_array) == 0:
+                empty_transcripts.inc("no_speech")
+                return log_voice_result(build_voice_response(""), "no_speech")
             
-            # 의도 분류
-            predicted_intent, confidence = predict_intent_with_confidence(transcribed_text)
-            intent_description = INTENT_MAPPING.get(predicted_intent, "알 수 없음")
+            # Whisper로 음성을 텍스트로 변환 (배치 스케줄러 → 워커 풀)
+            with stage("transcribe"):
+                transcribed_text, timings = await recognize_speech(audio_array, decoding_profile)
+            if not transcribed_text:
+                empty_transcripts.inc("empty_text")
+            audio_cache.put(audio_key, transcribed_text)
+            source = "whisper"
+        
+        with stage("response"):
+            response = build_voice_response(transcribed_text, timings)
+        return log_voice_result(response, source)
             
-            logger.info(f"예측된 의도: {intent_description} (신뢰도: {confidence:.2f})")
+    except (InferenceQueueFullError, GatewayUnavailableError) as e:
+        logger.warning("음성 인식 요청 거절: %s", e)
+        log_request("voice_to_intent", started, False, status=503, error="overloaded")
+        raise HTTPException(
+            status_code=503,
+            detail="음성 인식 요청이 많아 잠시 후 다시 시도해 주세요.",
+            headers={"Retry-After": str(settings.INFERENCE_RETRY_AFTER)}
+        )
+    except HTTPException as e:
+        log_request("voice_to_intent", started, False, status=e.status_code, error=e.detail)
+        raise
+    except Exception as e:
+        logger.exception("음성 처리 중 오류 발생")
+        log_request("voice_to_intent", started, False, status=500, error=str(e))
+        raise HTTPException(status_code=500, detail=f"음성 처리 중 오류가 발생했습니다: {str(e)}")
+
+@app.websocket("/ws/voice-to-intent")
+async def voice_stream_to_intent(websocket: WebSocket):
+    """실시간 음성 스트리밍 의도 분류
+
+    클라이언트는 16kHz mono 16bit little-endian PCM 조각을 바이너리 메시지로 보냅니다.
+    (조각의 바이트 수가 홀수이면 남은 1바이트를 다음 조각 앞에 이어 붙입니다)
+    서버는 발화 시작(speech_start), 중간 인식 결과(partial), 발화 종료 즉시
+    최종 결과(final)를 JSON으로 보냅니다. {"type": "end"} 텍스트 메시지로 발화를 강제 종료할 수 있습니다.
+    ?profile= 쿼리로 디코딩 프로필을 선택할 수 있습니다.
+    """
+    await websocket.accept()
+    profile_name = websocket.query_params.get("profile") or settings.WHISPER_DECODING_PROFILE
+    decoding_profile = decoding_profiles.get(profile_name)
+    if decoding_profile is None:
+        await websocket.send_json({"type": "error", "message": f"알 수 없는 디코딩 프로필입니다: {profile_name}"})
+        await websocket.close(code=1008)
+        return
+    endpointer = EnergyEndpointer(
+        threshold=settings.VAD_THRESHOLD,
+        end_silence_ms=settings.VAD_END_SILENCE_MS,
+        max_utterance_s=settings.VAD_MAX_UTTERANCE_S,
+    )
+    partial_interval = int(SAMPLE_RATE * settings.STREAM_PARTIAL_INTERVAL_MS / 1000)
+    partial_task: Optional[asyncio.Task] = None
+    last_partial_samples = 0
+    carry = b""  # 프레임 경계에서 잘린 16bit 샘플의 앞 바이트 (다음 프레임 앞에 붙임)
+    
+    async def send_partial(audio_array: np.ndarray):
+        """중간 인식 결과 전송 (대기열이 밀려 있으면 건너뜀)"""
+        try:
+            transcription, _ = await transcribe_scheduler.submit((audio_array, None, decoding_profile))
+            await websocket.send_json({"type": "partial", "text": transcription.text})
+        except InferenceQueueFullError:
+            pass
+    
+    async def finish_utterance():
+        """발화 종료: 최종 인식 후 의도 분류 결과 전송"""
+        nonlocal partial_task, last_partial_samples
+        if partial_task is not None:
+            partial_task.cancel()
+            partial_task = None
+        last_partial_samples = 0
+        utterance = endpointer.pop_utterance()
+        
+        trace, token = start_trace()
+        try:
+            if gateway is not None:
+                # 게이트웨이: 발화 구간만 WAV로 묶어 추론 백엔드로 전달
+                status_code, body = await gateway.forward_voice(
+                    encode_wav(utterance), "utterance.wav", "audio/wav", {"profile": decoding_profile.name}
+                )
+                if status_code != 200:
+                    await websocket.send_json({"type": "error", "message": body.get("detail", "음성 처리 중 오류가 발생했습니다.")})
+                    return
+                await websocket.send_json({"type": "final", **body})
+                return
+            if registry.whisper() is None:
+                demo_fallbacks.inc("transcription")
+                transcribed_text, timings = get_demo_transcription(), None
+            else:
+                with stage("transcribe"):
+                    transcribed_text, timings = await recognize_speech(utterance, decoding_profile)
+                if not transcribed_text:
+                    empty_transcripts.inc("empty_text")
+            with stage("response"):
+                response = build_voice_response(transcribed_text, timings)
+            await websocket.send_json({"type": "final", **response.model_dump()})
+        except (InferenceQueueFullError, GatewayUnavailableError):
+            request_errors.inc("voice_stream_to_intent", 503)
+            await websocket.send_json({
+                "type": "error",
+                "message": "음성 인식 요청이 많아 잠시 후 다시 시도해 주세요.",
+                "retry_after": settings.INFERENCE_RETRY_AFTER
+            })
+        finally:
+            end_trace(token)
+            record_stages(trace, "voice_stream_to_intent")
+    
+    if not await model_state.wait(settings.MODEL_READY_TIMEOUT):
+        await websocket.send_json({
+            "type": "error",
+            "message": "모델을 준비 중입니다. 잠시 후 다시 시도해 주세요.",
+            "retry_after": settings.INFERENCE_RETRY_AFTER
+        })
+        await websocket.close(code=1013)
+        return
+    
+    await websocket.send_json({"type": "ready", "sample_rate": SAMPLE_RATE})
+    
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
             
-            return VoiceResponse(
-                success=True,
-                transcribed_text=transcribed_text,
-                predicted_intent=predicted_intent,
-                intent_description=intent_description,
-                confidence=confidence,
-                message=f"'{transcribed_text}' → {intent_description}"
-            )
+            if message.get("bytes") is not None:
+                data = carry + message["bytes"] if carry else message["bytes"]
+                usable = len(data) - len(data) % 2
+                carry = data[usable:]
+                events = endpointer.push(pcm_to_float32(data[:usable], 2))
+            elif message.get("text"):
+                try:
+                    command = json.loads(message["text"])
+                except ValueError:
+                    command = {}
+                events = [SPEECH_END] if command.get("type") == "end" and endpointer.in_speech else []
+            else:
+                events = []
             
-        finally:
-            # 임시 파일 삭제
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
+            while events:
+                event = events.pop(0)
+                if event == SPEECH_START:
+                    await websocket.send_json({"type": "speech_start"})
+                elif event == SPEECH_END:
+                    await finish_utterance()
+                    # 종료 이후 남은 샘플로 다음 발화 여부 확인
+                    events.extend(endpointer.push(np.zeros(0, dtype=np.float32)))
             
-    except Exception as e:
-        logger.error(f"음성 처리 중 오류 발생: {e}")
-        raise HTTPException(status_code=500, detail=f"음성 처리 중 오류가 발생했습니다: {str(e)}")
+            # 일정 길이마다 중간 인식 결과 전송 (최종 인식을 방해하지 않도록 한 번에 하나만)
+            if (
+                registry.whisper() is not None
+                and endpointer.in_speech
+                and endpointer.utterance_samples - last_partial_samples >= partial_interval
+                and (partial_task is None or partial_task.done())
+                and inference_pool.stats()["queued"] == 0
+            ):
+                last_partial_samples = endpointer.utterance_samples
+                partial_task = asyncio.create_task(send_partial(endpointer.utterance()))
+    
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if partial_task is not None:
+            partial_task.cancel()
+        logger.info("음성 스트리밍 연결 종료")
 
 @app.post("/text-to-intent", response_model=IntentResponse)
 async def text_to_intent(request: TextRequest):
     """텍스트에서 의도 분류"""
+    started = time.perf_counter()
     
     try:
         text = request.text.strip()
@@ -251,26 +943,99 @@ async def text_to_intent(request: TextRequest):
         if not text:
             raise HTTPException(status_code=400, detail="텍스트가 비어있습니다.")
         
+        await wait_for_models()
+        
         # 의도 분류
         predicted_intent, confidence = predict_intent_with_confidence(text)
         intent_description = INTENT_MAPPING.get(predicted_intent, "알 수 없음")
         
-        logger.info(f"텍스트: '{text}' → 의도: {intent_description} (신뢰도: {confidence:.2f})")
-        
-        return IntentResponse(
-            success=True,
-            predicted_intent=predicted_intent,
-            intent_description=intent_description,
-            confidence=confidence,
-            message=f"'{text}' → {intent_description}"
+        with stage("response"):
+            response = IntentResponse(
+                success=True,
+                predicted_intent=predicted_intent,
+                intent_description=intent_description,
+                confidence=confidence,
+                message=f"'{text}' → {intent_description}"
+            )
+        log_request(
+            "text_to_intent", started, True, text=text,
+            intent=predicted_intent, confidence=round(confidence, 3)
         )
+        return response
         
-    except HTTPException:
+    except HTTPException as e:
+        log_request("text_to_intent", started, False, status=e.status_code, error=e.detail)
         raise
     except Exception as e:
-        logger.error(f"텍스트 처리 중 오류 발생: {e}")
+        logger.exception("텍스트 처리 중 오류 발생")
+        log_request("text_to_intent", started, False, status=500, error=str(e))
         raise HTTPException(status_code=500, detail=f"텍스트 처리 중 오류가 발생했습니다: {str(e)}")
 
+@app.post("/text-to-intent/batch", response_model=BatchIntentResponse)
+async def text_to_intent_batch(request: BatchTextRequest):
+    """여러 텍스트의 의도를 한 번에 분류 (상위 k개 의도와 확률 포함)"""
+    
+    if len(request.texts) > settings.MAX_BATCH_TEXTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"한 번에 최대 {settings.MAX_BATCH_TEXTS}개의 텍스트만 처리할 수 있습니다."
+        )
+    if request.top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k는 1 이상이어야 합니다.")
+    
+    await wait_for_models()
+    
+    texts = [text.strip() for text in request.texts]
+    valid_index = [i for i, text in enumerate(texts) if text]
+    
+    try:
+        # 큰 배치는 이벤트 루프를 막지 않도록 별도 스레드에서 처리 (단계 시간 기록을 위해 컨텍스트 전달)
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        predictions = await loop.run_in_executor(
+            None, context.run, predict_intents_batch, [texts[i] for i in valid_index], request.top_k
+        )
+    except Exception as e:
+        logger.error(f"배치 의도 분류 실패: {e}")
+        predictions = [[get_demo_intent_response(texts[i])] for i in valid_index]
+    
+    results = [
+        BatchIntentItem(
+            success=False,
+            text=text,
+            predicted_intent=-1,
+            intent_description="인식 실패",
+            confidence=0.0,
+            top_k=[]
+        )
+        for text in texts
+    ]
+    for i, ranked in zip(valid_index, predictions):
+        predicted_intent, confidence = ranked[0]
+        results[i] = BatchIntentItem(
+            success=True,
+            text=texts[i],
+            predicted_intent=predicted_intent,
+            intent_description=INTENT_MAPPING.get(predicted_intent, "알 수 없음"),
+            confidence=confidence,
+            top_k=[
+                IntentScore(intent=intent, intent_description=INTENT_MAPPING.get(intent, "알 수 없음"), score=score)
+                for intent, score in ranked
+            ]
+        )
+    
+    logger.info(f"배치 의도 분류: {len(texts)}건")
+    
+    return BatchIntentResponse(success=True, count=len(results), results=results)
+
+@app.get("/decoding-profiles")
+def get_decoding_profiles():
+    """사용 가능한 Whisper 디코딩 프로필"""
+    return {
+        "default": settings.WHISPER_DECODING_PROFILE,
+        "profiles": {name: profile.to_dict() for name, profile in decoding_profiles.items()}
+    }
+
 @app.get("/intents")
 def get_intents():
     """사용 가능한 의도 목록 반환"""
@@ -332,6 +1097,127 @@ def process_intent(intent_id: int):
     
     return response_data
 
+def check_admin_token(token: Optional[str]):
+    """관리자 토큰 확인 (ADMIN_TOKEN이 설정된 경우에만)"""
+    if settings.ADMIN_TOKEN and token != settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="관리자 권한이 필요합니다.")
+
+@app.get("/admin/models")
+def get_loaded_models(x_admin_token: Optional[str] = Header(None)):
+    """로드된 모델 목록 및 메모리 사용량"""
+    check_admin_token(x_admin_token)
+    return registry.report()
+
+@app.post("/admin/models/whisper")
+async def swap_whisper_model(request: WhisperSwapRequest, x_admin_token: Optional[str] = Header(None)):
+    """활성 Whisper 모델 크기 교체 (필요하면 먼저 로드, 진행 중인 요청은 기존 모델로 완료)"""
+    check_admin_token(x_admin_token)
+    size = request.size.strip()
+    
+    if registry.whisper(size) is None:
+        logger.info(f"Whisper 모델 로드 중: {size}")
+        loop = asyncio.get_running_loop()
+        try:
+            model = await loop.run_in_executor(None, load_whisper, size)
+        except Exception as e:
+            logger.error(f"Whisper 모델 로드 실패: {e}")
+            raise HTTPException(status_code=400, detail=f"Whisper 모델을 로드할 수 없습니다: {str(e)}")
+        registry.add_whisper(size, model)
+    
+    previous = registry.active_whisper_size
+    registry.activate_whisper(size)
+    logger.info(f"활성 Whisper 모델 교체: {previous} → {size}")
+    return {"previous": previous, "active": size, "models": registry.report()}
+
+@app.delete("/admin/models/whisper/{size}")
+def unload_whisper_model(size: str, x_admin_token: Optional[str] = Header(None)):
+    """사용하지 않는 Whisper 모델 해제"""
+    check_admin_token(x_admin_token)
+    try:
+        registry.remove_whisper(size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return registry.report()
+
+@app.post("/admin/models/intent")
+async def reload_intent_model(request: IntentReloadRequest, x_admin_token: Optional[str] = Header(None)):
+    """의도 분류 모델 다시 로드 후 교체 (경로 미지정 시 설정 경로, 컴파일된 모델 우선)"""
+    check_admin_token(x_admin_token)
+    loop = asyncio.get_running_loop()
+    
+    compiled_path = request.compiled_path
+    if compiled_path is None and not (request.model_path or request.vectorizer_path) and settings.INTENT_MODEL_FORMAT != "pickle":
+        compiled_path = resolve_compiled_intent_path()
+    if compiled_path is not None:
+        if not os.path.exists(os.path.join(compiled_path, "meta.json")):
+            raise HTTPException(status_code=400, detail="컴파일된 의도 분류 모델을 찾을 수 없습니다.")
+        try:
+            compiled = await loop.run_in_executor(None, load_compiled_intent_model, compiled_path)
+        except Exception as e:
+            logger.error(f"의도 분류 모델 로드 실패: {e}")
+            raise HTTPException(status_code=400, detail=f"의도 분류 모델을 로드할 수 없습니다: {str(e)}")
+        intent_model = registry.set_intent(compiled, None, source=compiled_path)
+        logger.info(f"의도 분류 모델 교체: v{intent_model.version} ({intent_model.source})")
+        return registry.report()
+    
+    if request.model_path or request.vectorizer_path:
+        paths = (
+            request.model_path or settings.INTENT_MODEL_PATH,
+            request.vectorizer_path or settings.VECTORIZER_PATH
+        )
+    else:
+        paths = resolve_intent_model_paths()
+    if paths is None or not all(os.path.exists(path) for path in paths):
+        raise HTTPException(status_code=400, detail="의도 분류 모델 파일을 찾을 수 없습니다.")
+    
+    try:
+        classifier, new_vectorizer = await asyncio.gather(
+            loop.run_in_executor(None, load_pickle, paths[0]),
+            loop.run_in_executor(None, load_pickle, paths[1])
+        )
+    except Exception as e:
+        logger.error(f"의도 분류 모델 로드 실패: {e}")
+        raise HTTPException(status_code=400, detail=f"의도 분류 모델을 로드할 수 없습니다: {str(e)}")
+    
+    intent_model = registry.set_intent(classifier, new_vectorizer, source=paths[0])
+    logger.info(f"의도 분류 모델 교체: v{intent_model.version} ({intent_model.source})")
+    return registry.report()
+
+@app.get("/admin/intent-tiers")
+def get_intent_tier_stats(x_admin_token: Optional[str] = Header(None)):
+    """단계별 의도 분류 처리 비율과 지연 시간"""
+    check_admin_token(x_admin_token)
+    return {
+        "confidence_threshold": settings.CONFIDENCE_THRESHOLD,
+        "keyword_tier": settings.INTENT_KEYWORD_TIER,
+        **intent_cascade.stats()
+    }
+
+@app.get("/admin/escalation")
+def get_escalation_stats(x_admin_token: Optional[str] = Header(None)):
+    """Whisper 재인식 비율, 사유, 추가 지연 시간"""
+    check_admin_token(x_admin_token)
+    return {
+        "active_size": registry.active_whisper_size,
+        "escalation_size": get_escalation_size(),
+        "policy": escalation_policy.to_dict(),
+        **escalation_stats.to_dict()
+    }
+
+@app.get("/admin/cache")
+def get_cache_stats(x_admin_token: Optional[str] = Header(None)):
+    """결과 캐시 적중/실패 통계"""
+    check_admin_token(x_admin_token)
+    return {"intent": intent_cache.stats(), "audio": audio_cache.stats()}
+
+@app.delete("/admin/cache")
+def clear_cache(x_admin_token: Optional[str] = Header(None)):
+    """결과 캐시 비우기"""
+    check_admin_token(x_admin_token)
+    intent_cache.clear()
+    audio_cache.clear()
+    return {"intent": intent_cache.stats(), "audio": audio_cache.stats()}
+
 @app.get("/demo/examples")
 def get_demo_examples():
     """시연용 예제 문장들"""
@@ -0,0 +1,337 @@
+"""
+모델 로더
+Whisper 및 의도 분류 모델을 백그라운드에서 병렬로 로드하고 준비 상태를 관리합니다.
+의도 분류 모델은 scikit-learn/pickle 없이 불러올 수 있는 컴파일된 형식을 우선 사용합니다.
+Whisper는 한 번 변환한 fp32 체크포인트를 로컬 디스크에 보관해 두고
+다음 부팅부터 메모리 매핑으로 바로 불러와 콜드 스타트를 줄입니다.
+CPU 환경에서는 선형 계층을 int8로 동적 양자화하여 메모리와 연산 시간을 줄일 수 있습니다.
+"""
+
+import asyncio
+import copy
+import importlib.util
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 모델 파일 이름
+INTENT_MODEL_FILE = "intent_model.pkl"
+VECTORIZER_FILE = "vectorizer.pkl"
+COMPILED_INTENT_DIR = "intent_model_compiled"  # ai_module/export_intent_model.py 출력
+
+# Whisper 양자화 방식 (none: fp32 그대로, int8: 선형 계층 가중치 int8 동적 양자화)
+WHISPER_QUANTIZE_MODES = ("none", "int8")
+
+# int8 캐시 형식 (packed params 객체 대신 int8 텐서 + scale/zero point로 저장, weights_only 로더로 읽음)
+INT8_CACHE_FORMAT = "whisper-int8-tensors-v1"
+
+
+def find_ai_module_path(candidates: List[str]) -> Optional[str]:
+    """의도 분류 모델 파일이 모두 있는 첫 번째 경로 반환"""
+    for path in candidates:
+        if os.path.exists(os.path.join(path, INTENT_MODEL_FILE)) and os.path.exists(os.path.join(path, VECTORIZER_FILE)):
+            return path
+    return None
+
+
+def find_compiled_intent_path(candidates: List[str]) -> Optional[str]:
+    """컴파일된 의도 분류 모델 디렉토리가 있는 첫 번째 경로 반환"""
+    for path in candidates:
+        compiled_path = os.path.join(path, COMPILED_INTENT_DIR)
+        if os.path.exists(os.path.join(compiled_path, "meta.json")):
+            return compiled_path
+    return None
+
+
+def quantize_whisper(model):
+    """Whisper 선형 계층(어텐션 q/k/v/out, MLP)을 int8 가중치로 동적 양자화 (CPU 전용, 제자리 변환)
+
+    활성값은 실행 시점에 양자화되므로 보정 데이터가 필요 없습니다.
+    Whisper의 Linear는 fp16 캐스팅만 추가한 nn.Linear 하위 클래스라서 양자화 대상 타입과 일치하지 않으므로
+    먼저 nn.Linear로 바꿉니다 (CPU fp32에서는 동작이 같음).
+    """
+    import torch
+
+    for module in model.modules():
+        if isinstance(module, torch.nn.Linear) and type(module) is not torch.nn.Linear:
+            module.__class__ = torch.nn.Linear
+    model.eval()
+    model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    model.quantization = "int8"
+    return model
+
+
+def _quantized_linears(model) -> Dict[str, object]:
+    """동적 양자화된 선형 계층 {모듈 이름: 모듈}"""
+    import torch
+
+    return {name: module for name, module in model.named_modules()
+            if isinstance(module, torch.ao.nn.quantized.dynamic.Linear)}
+
+
+def pack_quantized_state(model) -> dict:
+    """양자화 모델을 weights_only 로더로 읽을 수 있는 텐서/숫자만의 dict로 변환
+
+    양자화 선형 계층의 state_dict에는 pickle이 필요한 packed params 객체가 들어 있으므로
+    int8 정수 값과 scale/zero point를 일반 텐서로 꺼내 따로 보관합니다.
+    """
+    import torch
+
+    linears = _quantized_linears(model)
+    prefixes = tuple(f"{name}." for name in linears)
+    qlinear = {}
+    for name, module in linears.items():
+        weight = module.weight()
+        entry = {"weight": weight.int_repr(), "bias": module.bias()}
+        if weight.qscheme() in (torch.per_channel_affine, torch.per_channel_symmetric):
+            entry.update(scales=weight.q_per_channel_scales(), zero_points=weight.q_per_channel_zero_points(),
+                         axis=int(weight.q_per_channel_axis()))
+        else:
+            entry.update(scale=float(weight.q_scale()), zero_point=int(weight.q_zero_point()))
+        qlinear[name] = entry
+    state = {key: value for key, value in model.state_dict().items() if not key.startswith(prefixes)}
+    return {"format": INT8_CACHE_FORMAT, "dims": model.dims.__dict__, "state": state, "qlinear": qlinear}
+
+
+def build_quantized_whisper(checkpoint: dict):
+    """pack_quantized_state 결과로 양자화 Whisper 생성
+
+    양자화 계층은 state_dict 로드 시 packed params 키를 요구하므로, 일반 가중치는 fp32 모델에 먼저 넣고
+    양자화한 뒤 계층마다 저장된 int8 가중치를 설정합니다.
+    """
+    import torch
+    from whisper.model import ModelDimensions, Whisper
+
+    if checkpoint.get("format") != INT8_CACHE_FORMAT:
+        raise ValueError(f"알 수 없는 int8 캐시 형식입니다: {checkpoint.get('format')}")
+    model = Whisper(ModelDimensions(**checkpoint["dims"]))
+    prefixes = tuple(f"{name}." for name in checkpoint["qlinear"])
+    # assign=True: 메모리 매핑된 텐서(임베딩, LayerNorm, Conv)를 복사하지 않고 그대로 사용
+    missing, unexpected = model.load_state_dict(checkpoint["state"], strict=False, assign=True)
+    missing = [key for key in missing if not key.startswith(prefixes)]
+    if missing or unexpected:
+        raise ValueError(f"int8 캐시 키 불일치 (누락 {missing[:3]}, 불필요 {unexpected[:3]})")
+
+    model = quantize_whisper(model)
+    linears = _quantized_linears(model)
+    if set(linears) != set(checkpoint["qlinear"]):
+        raise ValueError("int8 캐시의 양자화 계층 구성이 모델과 다릅니다.")
+    for name, module in linears.items():
+        entry = checkpoint["qlinear"][name]
+        if "axis" in entry:
+            weight = torch._make_per_channel_quantized_tensor(
+                entry["weight"], entry["scales"], entry["zero_points"], entry["axis"])
+        else:
+            weight = torch._make_per_tensor_quantized_tensor(entry["weight"], entry["scale"], entry["zero_point"])
+        module.set_weight_bias(weight, entry["bias"])
+    return model
+
+
+def _load_quantized_whisper(name: str, cache_dir: Optional[str]):
+    """int8 양자화 Whisper 로드 (양자화된 가중치는 {cache_dir}/whisper-{name}-int8.pt에 보관)"""
+    import torch
+    import whisper
+
+    cache_path = os.path.join(cache_dir, f"whisper-{name}-int8.pt") if cache_dir else None
+
+    if cache_path and os.path.exists(cache_path):
+        try:
+            # 텐서/숫자만 있는 캐시이므로 weights_only 로더로 읽음 (캐시 디렉토리의 pickle 코드는 실행하지 않음)
+            checkpoint = torch.load(cache_path, map_location="cpu", mmap=True, weights_only=True)
+            # 저장된 int8 가중치로 바로 양자화 모델 구성 (fp32 체크포인트 로드/양자화 생략)
+            model = build_quantized_whisper(checkpoint)
+            if name in whisper._ALIGNMENT_HEADS:
+                model.set_alignment_heads(whisper._ALIGNMENT_HEADS[name])
+            logger.info(f"Whisper int8 캐시 체크포인트 사용: {cache_path}")
+            return model
+        except Exception as e:
+            logger.warning(f"Whisper int8 캐시 체크포인트 로드 실패, fp32에서 다시 양자화합니다: {e}")
+
+    start = time.perf_counter()
+    model = quantize_whisper(load_whisper_model(name, cache_dir=cache_dir, device="cpu"))
+    logger.info(f"Whisper {name} int8 양자화 완료 ({time.perf_counter() - start:.1f}초)")
+
+    if cache_path:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"  # 여러 프로세스가 동시에 만들어도 섞이지 않도록
+            torch.save(pack_quantized_state(model), tmp_path)
+            os.replace(tmp_path, cache_path)
+            logger.info(f"Whisper int8 캐시 체크포인트 저장: {cache_path}")
+        except Exception as e:
+            logger.warning(f"Whisper int8 캐시 체크포인트 저장 실패: {e}")
+
+    return model
+
+
+def load_whisper_model(name: str, cache_dir: Optional[str] = None, device: Optional[str] = None,
+                       quantize: str = "none"):
+    """Whisper 모델 로드
+
+    cache_dir가 지정되면 변환된 체크포인트({cache_dir}/whisper-{name}.pt)를 메모리 매핑으로 로드합니다.
+    캐시가 없으면 whisper.load_model로 로드한 뒤 캐시를 생성합니다.
+    (공식 체크포인트는 로드할 때마다 SHA256 검증과 fp16→fp32 변환을 거칩니다.)
+    quantize="int8"이면 CPU에서 선형 계층을 int8로 동적 양자화합니다 (GPU에서는 무시).
+    """
+    import torch
+    import whisper
+    from whisper.model import ModelDimensions, Whisper
+
+    if quantize not in WHISPER_QUANTIZE_MODES:
+        raise ValueError(f"지원하지 않는 양자화 방식입니다: {quantize} (사용 가능: {', '.join(WHISPER_QUANTIZE_MODES)})")
+    if device is None:
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+    if quantize == "int8":
+        if device == "cpu":
+            return _load_quantized_whisper(name, cache_dir)
+        logger.warning("int8 동적 양자화는 CPU 전용입니다. GPU에서는 fp16/fp32 모델을 사용합니다.")
+
+    cache_path = os.path.join(cache_dir, f"whisper-{name}.pt") if cache_dir else None
+
+    if cache_path and os.path.exists(cache_path):
+        try:
+            checkpoint = torch.load(cache_path, map_location="cpu", mmap=True, weights_only=True)
+            model = Whisper(ModelDimensions(**checkpoint["dims"]))
+            # assign=True: 메모리 매핑된 텐서를 복사하지 않고 그대로 사용
+            model.load_state_dict(checkpoint["model_state_dict"], assign=True)
+            if name in whisper._ALIGNMENT_HEADS:
+                model.set_alignment_heads(whisper._ALIGNMENT_HEADS[name])
+            logger.info(f"Whisper 캐시 체크포인트 사용: {cache_path}")
+            return model.to(device)
+        except Exception as e:
+            logger.warning(f"Whisper 캐시 체크포인트 로드 실패, 원본에서 다시 로드합니다: {e}")
+
+    model = whisper.load_model(name, device=device)
+
+    if cache_path:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"  # 여러 프로세스가 동시에 만들어도 섞이지 않도록
+            torch.save({"dims": model.dims.__dict__, "model_state_dict": model.state_dict()}, tmp_path)
+            os.replace(tmp_path, cache_path)
+            logger.info(f"Whisper 캐시 체크포인트 저장: {cache_path}")
+        except Exception as e:
+            logger.warning(f"Whisper 캐시 체크포인트 저장 실패: {e}")
+
+    return model
+
+
+def share_weights_copy(model):
+    """가중치 텐서는 원본과 공유하고 모듈 객체만 새로 만든 Whisper 모델 사본 반환
+
+    파라미터/버퍼와 int8 양자화 Linear의 packed 가중치를 deepcopy memo에 미리 넣어
+    복사되지 않게 하므로, 사본이 늘어도 모델 메모리는 거의 늘지 않습니다.
+    (추론 스레드마다 kv-cache 훅을 따로 등록하기 위한 용도)
+    """
+    import torch
+
+    memo = {}
+    for tensor in list(model.parameters()) + list(model.buffers()):
+        memo[id(tensor)] = tensor
+    for module in model.modules():
+        packed = getattr(module, "_packed_params", None)
+        if isinstance(packed, torch.nn.Module):
+            memo[id(packed)] = packed
+    return copy.deepcopy(model, memo)
+
+
+def load_pickle(path: str):
+    """joblib 모델 파일 로드"""
+    import joblib
+    return joblib.load(path)
+
+
+def load_compiled_intent_model(path: str):
+    """컴파일된 의도 분류 모델 로드 (배열은 메모리 매핑, scikit-learn 불필요)
+
+    로더는 ai_module/intent_predictor.py를 사용하며, 모델 디렉토리의 상위 경로에서 먼저 찾습니다.
+    """
+    candidates = [
+        os.path.join(os.path.dirname(os.path.abspath(path)), "intent_predictor.py"),
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ai_module", "intent_predictor.py"),
+    ]
+    module_path = next((candidate for candidate in candidates if os.path.exists(candidate)), None)
+    if module_path is None:
+        raise FileNotFoundError("intent_predictor.py를 찾을 수 없습니다.")
+
+    spec = importlib.util.spec_from_file_location("intent_predictor", module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.CompiledIntentModel.load(path)
+
+
+class ModelLoadState:
+    """모델 로드 진행 상태 (준비 여부, 항목별 소요 시간, 오류)"""
+
+    LOADING = "loading"
+    READY = "ready"
+    DEGRADED = "degraded"  # 일부 모델 로드 실패 → 데모 모드로 동작
+
+    def __init__(self):
+        self.status = self.LOADING
+        self.timings: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._done: Optional[asyncio.Event] = None
+
+    def _event(self) -> asyncio.Event:
+        # 이벤트 루프 안에서 생성 (Python 3.8/3.9 호환)
+        if self._done is None:
+            self._done = asyncio.Event()
+        return self._done
+
+    @property
+    def finished(self) -> bool:
+        return self._done is not None and self._done.is_set()
+
+    async def run(self, loaders: Dict[str, callable]) -> Dict[str, object]:
+        """로더들을 스레드에서 병렬 실행하고 {이름: 결과} 반환 (실패한 항목은 None)"""
+        self.started_at = time.perf_counter()
+        loop = asyncio.get_running_loop()
+
+        async def timed(name, loader):
+            start = time.perf_counter()
+            try:
+                return await loop.run_in_executor(None, loader)
+            except Exception as e:
+                self.errors[name] = str(e)
+                logger.error(f"{name} 로드 실패: {e}")
+                return None
+            finally:
+                self.timings[name] = round(time.perf_counter() - start, 3)
+                logger.info(f"{name} 로드 시간: {self.timings[name]:.2f}초")
+
+        results = await asyncio.gather(*(timed(name, loader) for name, loader in loaders.items()))
+        self.finished_at = time.perf_counter()
+        self.status = self.DEGRADED if self.errors else self.READY
+        self._event().set()
+        return dict(zip(loaders.keys(), results))
+
+    def fail(self, name: str, message: str):
+        """로드를 시작하기 전에 실패한 경우 (예: 모델 파일 없음)"""
+        self.errors[name] = message
+
+    async def wait(self, timeout: float) -> bool:
+        """로드가 끝날 때까지 최대 timeout초 대기, 끝났으면 True"""
+        if self.finished:
+            return True
+        try:
+            await asyncio.wait_for(self._event().wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def to_dict(self) -> dict:
+        total = None
+        if self.started_at is not None and self.finished_at is not None:
+            total = round(self.finished_at - self.started_at, 3)
+        return {
+            "status": self.status,
+            "timings": self.timings,
+            "total_seconds": total,
+            "errors": self.errors,
+        }
@@ -0,0 +1,208 @@
+"""
+모델 레지스트리
+로드된 Whisper 모델(크기별)과 의도 분류 모델을 보관하고, 활성 모델을 원자적으로 교체합니다.
+요청은 시작 시점에 모델 참조를 얻어 끝까지 사용하므로 교체 중에도 진행 중인 요청은 중단되지 않습니다.
+"""
+
+import pickle
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class IntentModel:
+    """함께 교체되어야 하는 의도 분류기와 벡터라이저 묶음
+
+    컴파일된 모델은 벡터화까지 직접 수행하므로 vectorizer가 None입니다.
+    """
+    classifier: Any
+    vectorizer: Any
+    source: str
+    version: int
+    loaded_at: float = field(default_factory=time.time)
+
+    @property
+    def compiled(self) -> bool:
+        return self.vectorizer is None
+
+    @property
+    def classes(self) -> np.ndarray:
+        return self.classifier.classes_
+
+    def vectorize(self, texts: Sequence[str]):
+        """텍스트 → 특징 벡터"""
+        if self.compiled:
+            return self.classifier.transform(texts)
+        return self.vectorizer.transform(texts)
+
+    def classify(self, features) -> np.ndarray:
+        """특징 벡터 → 클래스 확률 (N x 클래스 수)"""
+        if self.compiled:
+            return self.classifier.predict_proba_features(features)
+        return self.classifier.predict_proba(features)
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        """텍스트별 클래스 확률 (N x 클래스 수)"""
+        return self.classify(self.vectorize(texts))
+
+    def memory_bytes(self) -> int:
+        if self.compiled:
+            return self.classifier.nbytes
+        return pickled_bytes(self.classifier) + pickled_bytes(self.vectorizer)
+
+
+def torch_module_bytes(model) -> int:
+    """PyTorch 모델의 파라미터 + 버퍼 메모리 (바이트)
+
+    동적 양자화된 선형 계층의 int8 가중치는 parameters()에 나타나지 않으므로 계층 크기로 따로 셉니다.
+    """
+    total = 0
+    for module in model.modules():
+        if hasattr(module, "_packed_params") and hasattr(module, "in_features"):
+            # int8 가중치 + fp32 편향 (가중치를 풀어서 복사하지 않도록 크기만 계산)
+            total += module.in_features * module.out_features + module.out_features * 4
+        tensors = list(module.parameters(recurse=False)) + list(module.buffers(recurse=False))
+        for tensor in tensors:
+            if tensor.is_sparse:
+                continue
+            total += tensor.numel() * tensor.element_size()
+    return total
+
+
+def pickled_bytes(obj) -> int:
+    """직렬화 크기로 추정한 객체 메모리 (바이트, 근사치)"""
+    try:
+        return len(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+class ModelRegistry:
+    """Whisper/의도 분류 모델 레지스트리"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._whisper: Dict[str, Any] = {}
+        self._active_whisper: Optional[str] = None
+        self._intent: Optional[IntentModel] = None
+        self._intent_escalation: Optional[IntentModel] = None  # 신뢰도가 낮을 때 사용하는 더 큰 모델
+        self._intent_listeners: List[Callable[[Optional[IntentModel]], None]] = []
+        self._escalation_listeners: List[Callable[[Optional[IntentModel]], None]] = []
+
+    # ---- Whisper ----
+
+    @property
+    def active_whisper_size(self) -> Optional[str]:
+        return self._active_whisper
+
+    def whisper(self, size: Optional[str] = None):
+        """요청한 크기(기본: 활성 모델)의 Whisper 모델 반환, 없으면 None"""
+        with self._lock:
+            return self._whisper.get(size or self._active_whisper)
+
+    def whisper_sizes(self) -> List[str]:
+        with self._lock:
+            return list(self._whisper)
+
+    def add_whisper(self, size: str, model, activate: bool = False):
+        """Whisper 모델 등록 (activate=True 또는 활성 모델이 없으면 활성화)"""
+        with self._lock:
+            self._whisper[size] = model
+            if activate or self._active_whisper is None:
+                self._active_whisper = size
+
+    def activate_whisper(self, size: str):
+        """이미 로드된 크기로 활성 Whisper 모델 교체"""
+        with self._lock:
+            if size not in self._whisper:
+                raise KeyError(f"로드되지 않은 Whisper 모델입니다: {size}")
+            self._active_whisper = size
+
+    def remove_whisper(self, size: str):
+        """활성 모델이 아닌 Whisper 모델 해제"""
+        with self._lock:
+            if size == self._active_whisper:
+                raise ValueError("활성 Whisper 모델은 해제할 수 없습니다.")
+            self._whisper.pop(size, None)
+
+    # ---- 의도 분류 ----
+
+    @property
+    def intent(self) -> Optional[IntentModel]:
+        return self._intent
+
+    def set_intent(self, classifier, vectorizer, source: str) -> IntentModel:
+        """의도 분류 모델 교체 (분류기와 벡터라이저를 한 번에 바꿈)"""
+        with self._lock:
+            version = (self._intent.version + 1) if self._intent else 1
+            self._intent = IntentModel(classifier, vectorizer, source, version)
+            listeners = list(self._intent_listeners)
+        for listener in listeners:
+            listener(self._intent)
+        return self._intent
+
+    @property
+    def intent_escalation(self) -> Optional[IntentModel]:
+        return self._intent_escalation
+
+    def set_intent_escalation(self, classifier, vectorizer, source: str) -> IntentModel:
+        """신뢰도가 낮은 문장을 다시 분류할 모델 교체"""
+        with self._lock:
+            version = (self._intent_escalation.version + 1) if self._intent_escalation else 1
+            self._intent_escalation = IntentModel(classifier, vectorizer, source, version)
+            listeners = list(self._escalation_listeners)
+        for listener in listeners:
+            listener(self._intent_escalation)
+        return self._intent_escalation
+
+    def on_intent_change(self, listener: Callable[[Optional[IntentModel]], None]):
+        """의도 분류 모델이 교체될 때 호출할 함수 등록 (캐시 무효화 등)"""
+        self._intent_listeners.append(listener)
+
+    def on_intent_escalation_change(self, listener: Callable[[Optional[IntentModel]], None]):
+        """재분류 모델이 교체될 때 호출할 함수 등록"""
+        self._escalation_listeners.append(listener)
+
+    # ---- 상태 ----
+
+    def report(self) -> dict:
+        """로드된 모델과 메모리 사용량 보고"""
+        with self._lock:
+            whisper_models = dict(self._whisper)
+            active = self._active_whisper
+            intent = self._intent
+            escalation = self._intent_escalation
+
+        report = {
+            "whisper": {
+                "active": active,
+                "loaded": {
+                    size: {
+                        "memory_mb": round(torch_module_bytes(model) / 1024 ** 2, 1),
+                        "quantization": getattr(model, "quantization", None) or "none",
+                    }
+                    for size, model in whisper_models.items()
+                },
+            },
+            "intent": None,
+        }
+        for key, model in (("intent", intent), ("intent_escalation", escalation)):
+            if model is not None:
+                report[key] = {
+                    "source": model.source,
+                    "format": "compiled" if model.compiled else "pickle",
+                    "version": model.version,
+                    "loaded_at": model.loaded_at,
+                    "memory_mb": round(model.memory_bytes() / 1024 ** 2, 3),
+                }
+
+        try:
+            import psutil
+            report["process_rss_mb"] = round(psutil.Process().memory_info().rss / 1024 ** 2, 1)
+        except ImportError:
+            pass
+        return report
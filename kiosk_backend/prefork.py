@@ -0,0 +1,171 @@
+"""
+멀티 프로세스 서버 (프리포크)
+부모 프로세스에서 모델을 한 번만 로드한 뒤 워커 프로세스를 fork하여
+Whisper/의도 분류 모델 메모리를 copy-on-write로 공유합니다.
+워커마다 연산 스레드 수를 나누어 지정하여 코어 과다 사용(oversubscription)을 막습니다.
+"""
+
+import asyncio
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 네이티브 연산 라이브러리 스레드 수 환경 변수
+THREAD_ENV_VARS = ["OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS"]
+
+
+def threads_per_worker(workers: int, threads: int = 0) -> int:
+    """워커당 연산 스레드 수 (threads=0이면 CPU 코어를 워커 수로 나눔)"""
+    if threads > 0:
+        return threads
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def set_thread_env(threads: int):
+    """이후 초기화되는 BLAS/OpenMP 스레드 풀 크기 지정 (torch/numpy import 전에 호출)"""
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+
+
+def pin_threads(threads: int):
+    """현재 프로세스의 PyTorch/BLAS 연산 스레드 수 제한"""
+    set_thread_env(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(threads)
+    except ImportError:
+        pass
+
+
+def create_socket(host: str, port: int) -> socket.socket:
+    """워커들이 함께 accept할 리스닝 소켓"""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def preload_models(app_module) -> bool:
+    """부모 프로세스에서 모델 로드 (fork 전에 끝내야 워커가 메모리를 공유)
+
+    CUDA는 fork 이후 사용할 수 없으므로 GPU가 있으면 워커가 각자 로드하도록 False를 반환합니다.
+    """
+    import torch
+    if torch.cuda.is_available():
+        logger.warning("GPU 환경에서는 fork 전 모델 공유를 사용하지 않습니다. 워커가 각자 모델을 로드합니다.")
+        return False
+
+    # 부모에서는 OpenMP 스레드 팀을 만들지 않도록 단일 스레드로 로드 (fork 후 자식에서 새로 생성)
+    torch.set_num_threads(1)
+    asyncio.run(app_module.load_models())
+    # 이후 GC가 객체 헤더를 건드려 공유 페이지가 복사되지 않도록 현재 객체를 영구 세대로 이동
+    gc.collect()
+    gc.freeze()
+    return True
+
+
+def run_worker(app, sock: socket.socket, threads: int, log_level: str, access_log: bool):
+    """워커 프로세스: 스레드 수 고정 후 공유 소켓으로 uvicorn 실행 (reload 없음)"""
+    import uvicorn
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    pin_threads(threads)
+    config = uvicorn.Config(app, log_level=log_level, access_log=access_log, reload=False, workers=1)
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+
+
+class PreforkServer:
+    """워커 프로세스를 fork하고 종료된 워커를 다시 띄우는 감독 프로세스"""
+
+    def __init__(self, app_module, host: str, port: int, workers: int, threads: int = 0,
+                 log_level: str = "info", access_log: bool = False):
+        self.app_module = app_module
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers)
+        self.threads = threads_per_worker(self.workers, threads)
+        self.log_level = log_level
+        self.access_log = access_log
+        self._children: Dict[int, int] = {}  # pid → 워커 번호
+        self._sock: Optional[socket.socket] = None
+        self._stopping = False
+
+    def _spawn(self, index: int):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(self.app_module.app, self._sock, self.threads, self.log_level, self.access_log)
+            except BaseException:
+                logger.exception(f"워커 {index} 비정상 종료")
+                code = 1
+            finally:
+                os._exit(code)
+        self._children[pid] = index
+        logger.info(f"워커 {index} 시작 (pid {pid}, 연산 스레드 {self.threads}개)")
+
+    def _stop(self, signum, frame):
+        self._stopping = True
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        self._sock = create_socket(self.host, self.port)
+        logger.info(f"{self.host}:{self.port} 에서 워커 {self.workers}개로 서비스합니다.")
+
+        start = time.perf_counter()
+        if preload_models(self.app_module):
+            logger.info(f"부모 프로세스 모델 로드 완료 ({time.perf_counter() - start:.1f}초), 워커와 공유합니다.")
+
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGTERM, self._stop)
+        for index in range(self.workers):
+            self._spawn(index)
+
+        while self._children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            index = self._children.pop(pid, None)
+            if index is None:
+                continue
+            if not self._stopping:
+                logger.warning(f"워커 {index} 종료됨 (pid {pid}, 상태 {status}), 다시 시작합니다.")
+                time.sleep(1)
+                self._spawn(index)
+
+        self._sock.close()
+        logger.info("모든 워커가 종료되었습니다.")
+        return 0
+
+
+def serve(app_module, host: str, port: int, workers: int, threads: int = 0,
+          log_level: str = "info", access_log: bool = False) -> int:
+    """운영 모드 서버 실행 (Linux/macOS, fork 필요)"""
+    if not hasattr(os, "fork"):
+        print("이 운영체제에서는 멀티 프로세스 모드를 지원하지 않습니다.", file=sys.stderr)
+        return 1
+    return PreforkServer(app_module, host, port, workers, threads, log_level, access_log).run()
@@ -0,0 +1,113 @@
+"""
+결과 캐시
+어르신들이 반복해서 말하는 같은 문장("등본 떼주세요", "직원 불러주세요")과
+키오스크 재시도로 다시 올라온 같은 음성 파일의 결과를 재사용합니다.
+"""
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+_WORDS = re.compile(r"\w+")
+_WHITE_SPACES = re.compile(r"\s\s+")
+
+
+def normalize_text(text: str) -> str:
+    """문장 비교용 텍스트 정규화 (소문자, 공백/문장부호를 공백 하나로)
+
+    전사 결과의 단어 오류율 비교 등에 사용합니다. 문자 n-gram 분류기는 문장부호도
+    특징으로 보므로 의도 캐시 키에는 사용하지 않습니다 (intent_cache_text 참고).
+    """
+    return " ".join(_WORDS.findall(text.lower()))
+
+
+def intent_cache_text(text: str) -> str:
+    """의도 캐시 키용 텍스트 (연속된 공백만 하나로)
+
+    벡터라이저(단어/문자/char_wb 모두)가 특징을 만들기 전에 하는 처리와 같으므로
+    같은 키의 문장은 분류 결과와 신뢰도가 항상 같습니다.
+    """
+    return _WHITE_SPACES.sub(" ", text)
+
+
+def content_hash(data: bytes) -> str:
+    """업로드 파일 내용의 해시 (SHA-256)"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class LRUCache:
+    """크기 제한과 만료 시간(TTL)이 있는 스레드 안전 LRU 캐시
+
+    max_size가 0이면 캐시를 사용하지 않습니다. ttl_seconds가 0이면 만료되지 않습니다.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 0, name: str = "cache"):
+        self.name = name
+        self.max_size = max(0, max_size)
+        self.ttl_seconds = max(0.0, ttl_seconds)
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """값 반환 (없거나 만료되었으면 None)"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any):
+        """값 저장 (가득 차면 가장 오래 사용하지 않은 항목 제거)"""
+        if not self.enabled or value is None:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """모든 항목 삭제 (모델 교체 시 무효화)"""
+        with self._lock:
+            self._data.clear()
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._data)
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": size,
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
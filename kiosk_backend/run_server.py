@@ -1,19 +1,20 @@
 import uvicorn
+import argparse
 import os
 import sys
 from pathlib import Path
 
-def main():
-    """서버 실행"""
-    
-    # AI 모델 파일 경로 확인
-    ai_module_path = Path("../ai_module")
+from config import get_config
+
+def check_model_files(ai_module_path: Path) -> list:
+    """AI 모델 파일 존재 확인 후 누락된 파일 목록 반환"""
     model_files = ["intent_model.pkl", "vectorizer.pkl"]
-    
-    print("=== 어르신 음성인식 AI 키오스크 백엔드 서버 ===")
-    print()
-    
-    # AI 모델 파일 존재 확인
+
+    # 컴파일된 의도 분류 모델이 있으면 pkl 파일 없이도 동작
+    if (ai_module_path / "intent_model_compiled" / "meta.json").exists():
+        print("✓ intent_model_compiled 발견")
+        return []
+
     missing_files = []
     for file in model_files:
         file_path = ai_module_path / file
@@ -22,31 +23,76 @@ def main():
         else:
             print(f"✗ {file} 없음")
             missing_files.append(file)
-    
+    return missing_files
+
+def main():
+    """서버 실행
+
+    기본(개발) 모드: 코드 변경 시 자동 재시작 (reload)
+    운영 모드(--production): 모델을 한 번 로드한 뒤 워커 프로세스를 fork하여 메모리 공유,
+    reload와 입력 확인 없이 실행
+    """
+    settings = get_config()
+    parser = argparse.ArgumentParser(description="어르신 음성인식 AI 키오스크 백엔드 서버")
+    parser.add_argument("--production", action="store_true", help="운영 모드 (멀티 프로세스, reload 없음)")
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS, help="운영 모드 워커 프로세스 수")
+    parser.add_argument("--threads", type=int, default=settings.WORKER_THREADS, help="워커당 연산 스레드 수 (0=자동)")
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    args = parser.parse_args()
+
+    # AI 모델 파일 경로 확인
+    ai_module_path = Path("../ai_module")
+
+    print("=== 어르신 음성인식 AI 키오스크 백엔드 서버 ===")
+    print()
+
+    # AI 모델 파일 존재 확인
+    missing_files = check_model_files(ai_module_path)
+
     if missing_files:
         print(f"\n⚠️  누락된 모델 파일: {missing_files}")
         print("💡 AI 모듈이 없어도 데모 모드로 실행 가능합니다.")
         print("📋 키워드 기반 의도 분류가 동작합니다.")
-        
-        user_input = input("\n계속 진행하시겠습니까? (y/n): ")
-        if user_input.lower() != 'y':
-            print("서버 실행을 취소합니다.")
-            return
-    
+
+        # 운영 모드나 비대화형 실행(서비스 관리자 등)에서는 묻지 않고 데모 모드로 진행
+        if not args.production and sys.stdin.isatty():
+            user_input = input("\n계속 진행하시겠습니까? (y/n): ")
+            if user_input.lower() != 'y':
+                print("서버 실행을 취소합니다.")
+                return
+
     print("\n🚀 서버를 시작합니다...")
-    print("📋 API 문서: http://localhost:8000/docs")
-    print("🔍 헬스 체크: http://localhost:8000/health")
+    print(f"📋 API 문서: http://localhost:{args.port}/docs")
+    print(f"🔍 헬스 체크: http://localhost:{args.port}/health")
     print("\n중단하려면 Ctrl+C를 누르세요.\n")
-    
+
+    if args.production:
+        import prefork
+
+        # torch/numpy를 import하기 전에 연산 스레드 수를 지정해야 적용됨
+        threads = prefork.threads_per_worker(args.workers, args.threads)
+        prefork.set_thread_env(threads)
+        import main as app_module
+
+        sys.exit(prefork.serve(
+            app_module,
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            threads=threads,
+            log_level=settings.LOG_LEVEL.lower(),
+        ))
+
     # 서버 실행
     uvicorn.run(
         "main:app",
-        host="0.0.0.0",
-        port=8000,
+        host=args.host,
+        port=args.port,
         reload=True,
         log_level="info",
         access_log=True
     )
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,6 @@
+"""kiosk_backend 모듈을 서버와 같이 최상위 이름으로 import할 수 있도록 경로 추가"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,53 @@
+"""게이트웨이 백엔드 선택 테스트"""
+
+import asyncio
+
+import httpx
+
+from gateway import InferenceGateway
+
+
+def health(running=0, queued=0, requests=None, workers=1):
+    inference = {"workers": workers, "running": running, "queued": queued, "capacity": workers + 8}
+    if requests is not None:
+        inference.update(requests=requests, request_capacity=(workers + 8) * 8)
+    return {"models_loaded": {"whisper": True}, "inference": inference}
+
+
+def refreshed_gateway(bodies):
+    """백엔드마다 주어진 /health 응답을 돌려주는 게이트웨이 (상태 한 번 갱신)"""
+    async def scenario():
+        gateway = InferenceGateway([f"http://backend-{i}" for i in range(len(bodies))])
+        for backend, body in zip(gateway.backends, bodies):
+            await backend.client.aclose()
+            backend.client = httpx.AsyncClient(
+                base_url=backend.url, transport=httpx.MockTransport(lambda request, body=body: httpx.Response(200, json=body)),
+            )
+        await gateway.refresh()
+        await gateway.close()
+        return gateway
+
+    return asyncio.run(scenario())
+
+
+def test_requests_waiting_for_a_batch_count_as_load():
+    # backend-0: 워커 풀은 비어 보이지만 배치 시간 창에 요청 12개가 대기 중
+    gateway = refreshed_gateway([health(requests=12), health(running=1, requests=1)])
+    busy, idle = gateway.backends
+
+    assert busy.queue_depth == 12 and busy.capacity == 72
+    assert idle.queue_depth == 1
+    assert [backend.url for backend in gateway.candidates()] == [idle.url, busy.url]
+
+
+def test_batched_job_counts_all_of_its_requests():
+    # 작업 하나(배치 8개)가 실행 중인 백엔드가 단일 요청 작업 2개보다 바쁨
+    gateway = refreshed_gateway([health(running=1, requests=8), health(running=1, queued=1, requests=2)])
+    assert gateway.candidates()[0].url == "http://backend-1"
+
+
+def test_backend_without_request_count_uses_job_count():
+    gateway = refreshed_gateway([health(running=1, queued=3), health(running=1)])
+    assert [backend.queue_depth for backend in gateway.backends] == [4, 1]
+    assert gateway.backends[0].capacity == 9
+    assert gateway.candidates()[0].url == "http://backend-1"
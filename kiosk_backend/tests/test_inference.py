@@ -0,0 +1,223 @@
+"""추론 워커 풀 / 배치 스케줄러 테스트"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from inference import BatchScheduler, InferencePool, InferenceQueueFullError
+
+
+def test_pool_runs_job_and_reports_timing():
+    async def scenario():
+        pool = InferencePool(max_workers=1, max_queue=1)
+        try:
+            return await pool.run(lambda x: x * 2, 21)
+        finally:
+            pool.shutdown()
+
+    result, timing = asyncio.run(scenario())
+    assert result == 42
+    assert timing.queue_wait_ms >= 0 and timing.compute_ms >= 0
+
+
+def test_pool_rejects_when_queue_is_full():
+    release = threading.Event()
+
+    async def scenario():
+        pool = InferencePool(max_workers=1, max_queue=1)
+        try:
+            running = asyncio.ensure_future(pool.run(release.wait))
+            queued = asyncio.ensure_future(pool.run(lambda: "queued"))
+            await asyncio.sleep(0.05)
+            assert pool.stats() == {"workers": 1, "running": 1, "queued": 1, "capacity": 2}
+
+            # 서버는 이 예외를 503 + Retry-After로 응답
+            with pytest.raises(InferenceQueueFullError):
+                await pool.run(lambda: "rejected")
+
+            release.set()
+            assert (await queued)[0] == "queued"
+            await running
+            assert pool.stats()["running"] == 0 and pool.stats()["queued"] == 0
+            # 자리가 반납되면 다시 받음
+            assert (await pool.run(lambda: "again"))[0] == "again"
+        finally:
+            release.set()
+            pool.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_pool_releases_slot_when_cancelled_before_start():
+    release = threading.Event()
+    ran = []
+
+    async def scenario():
+        pool = InferencePool(max_workers=1, max_queue=1)
+        try:
+            running = asyncio.ensure_future(pool.run(release.wait))
+            queued = asyncio.ensure_future(pool.run(ran.append, "queued"))
+            await asyncio.sleep(0.05)
+
+            queued.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await queued
+            assert pool.stats()["queued"] == 0
+
+            # 취소된 자리만큼 새 요청을 받을 수 있어야 함
+            replacement = asyncio.ensure_future(pool.run(lambda: "replacement"))
+            await asyncio.sleep(0.05)
+            release.set()
+            assert (await replacement)[0] == "replacement"
+            await running
+            assert pool.stats() == {"workers": 1, "running": 0, "queued": 0, "capacity": 2}
+        finally:
+            release.set()
+            pool.shutdown()
+
+    asyncio.run(scenario())
+    assert ran == []  # 시작 전에 취소된 작업은 실행되지 않음
+
+
+def test_pool_keeps_slot_until_cancelled_running_job_finishes():
+    release = threading.Event()
+
+    async def scenario():
+        pool = InferencePool(max_workers=1, max_queue=0)
+        try:
+            running = asyncio.ensure_future(pool.run(release.wait))
+            await asyncio.sleep(0.05)
+            running.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await running
+
+            # 스레드의 작업은 중단되지 않으므로 끝날 때까지 자리를 차지
+            assert pool.stats()["running"] == 1
+            with pytest.raises(InferenceQueueFullError):
+                await pool.run(lambda: "rejected")
+
+            release.set()
+            for _ in range(100):
+                if pool.stats()["running"] == 0:
+                    break
+                await asyncio.sleep(0.01)
+            assert (await pool.run(lambda: "after"))[0] == "after"
+        finally:
+            release.set()
+            pool.shutdown()
+
+    asyncio.run(scenario())
+
+
+class FakeDecoder:
+    """입력 배치를 기록하고 입력마다 결과를 만드는 가짜 디코딩 함수"""
+
+    def __init__(self, error=None, drop_last=False):
+        self.batches = []
+        self.error = error
+        self.drop_last = drop_last
+
+    def __call__(self, items):
+        self.batches.append(list(items))
+        if self.error is not None:
+            raise self.error
+        results = [f"text:{item}" for item in items]
+        return results[:-1] if self.drop_last else results
+
+
+def run_scheduler(decoder, items, max_batch_size, max_wait_ms, max_workers=1):
+    """스케줄러에 items를 동시에 제출하고 (결과 또는 예외 목록, 걸린 시간 초)를 반환"""
+    async def scenario():
+        pool = InferencePool(max_workers=max_workers, max_queue=8)
+        scheduler = BatchScheduler(pool, decoder, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        try:
+            start = time.perf_counter()
+            outcomes = await asyncio.gather(*(scheduler.submit(item) for item in items), return_exceptions=True)
+            return outcomes, time.perf_counter() - start, scheduler.stats()
+        finally:
+            pool.shutdown()
+
+    return asyncio.run(scenario())
+
+
+def test_scheduler_forms_one_batch_when_full():
+    decoder = FakeDecoder()
+    outcomes, elapsed, stats = run_scheduler(decoder, ["a", "b", "c"], max_batch_size=3, max_wait_ms=5000)
+
+    # 배치가 가득 차면 시간 창을 기다리지 않고 바로 처리
+    assert elapsed < 1.0
+    assert decoder.batches == [["a", "b", "c"]]
+    assert [result for result, _ in outcomes] == ["text:a", "text:b", "text:c"]
+    assert all(timing.batch_size == 3 for _, timing in outcomes)
+    assert stats["batches"] == 1 and stats["avg_batch_size"] == 3.0 and stats["outstanding"] == 0
+
+
+def test_scheduler_splits_overflow_and_flushes_remainder_after_max_wait():
+    decoder = FakeDecoder()
+    outcomes, elapsed, _ = run_scheduler(decoder, list("abcde"), max_batch_size=2, max_wait_ms=50)
+
+    assert decoder.batches == [["a", "b"], ["c", "d"], ["e"]]
+    assert [result for result, _ in outcomes] == [f"text:{item}" for item in "abcde"]
+    assert [timing.batch_size for _, timing in outcomes] == [2, 2, 2, 2, 1]
+    # 남은 1개는 시간 창이 끝날 때 처리
+    assert elapsed >= 0.05
+
+
+def test_scheduler_flushes_partial_batch_after_max_wait():
+    decoder = FakeDecoder()
+    outcomes, elapsed, _ = run_scheduler(decoder, ["a", "b"], max_batch_size=8, max_wait_ms=50)
+
+    assert decoder.batches == [["a", "b"]]
+    assert 0.05 <= elapsed < 1.0
+    # 시간 창 대기도 요청별 대기 시간에 포함
+    assert all(timing.queue_wait_ms >= 40 for _, timing in outcomes)
+
+
+def test_scheduler_without_wait_runs_each_request_alone():
+    decoder = FakeDecoder()
+    outcomes, _, _ = run_scheduler(decoder, ["a", "b"], max_batch_size=8, max_wait_ms=0)
+
+    assert sorted(decoder.batches) == [["a"], ["b"]]
+    assert [result for result, _ in outcomes] == ["text:a", "text:b"]
+
+
+def test_scheduler_propagates_batch_error_to_every_waiter():
+    error = ValueError("decode failed")
+    outcomes, _, stats = run_scheduler(FakeDecoder(error=error), ["a", "b", "c"], max_batch_size=3, max_wait_ms=5000)
+
+    assert outcomes == [error, error, error]
+    assert stats["outstanding"] == 0 and stats["batches"] == 0
+
+
+def test_scheduler_rejects_result_count_mismatch_for_every_waiter():
+    outcomes, _, _ = run_scheduler(FakeDecoder(drop_last=True), ["a", "b"], max_batch_size=2, max_wait_ms=5000)
+
+    assert len(outcomes) == 2
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+
+
+def test_scheduler_rejects_when_outstanding_reaches_capacity():
+    release = threading.Event()
+
+    def blocking_decoder(items):
+        release.wait()
+        return list(items)
+
+    async def scenario():
+        pool = InferencePool(max_workers=1, max_queue=0)
+        scheduler = BatchScheduler(pool, blocking_decoder, max_batch_size=2, max_wait_ms=5000)
+        try:
+            waiting = [asyncio.ensure_future(scheduler.submit(item)) for item in "ab"]
+            await asyncio.sleep(0.05)
+            assert scheduler.capacity == 2
+            with pytest.raises(InferenceQueueFullError):
+                await scheduler.submit("c")
+            release.set()
+            assert [result for result, _ in await asyncio.gather(*waiting)] == ["a", "b"]
+        finally:
+            release.set()
+            pool.shutdown()
+
+    asyncio.run(scenario())
@@ -0,0 +1,132 @@
+"""키워드 기반 의도 분류기 테스트"""
+
+import csv
+import os
+
+import pytest
+
+from config import Config
+from keyword_matcher import KeywordMatcher, normalize_keyword_text, strip_particle_final
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return KeywordMatcher(Config.INTENT_KEYWORDS)
+
+
+def keywords(matcher, text):
+    return sorted(keyword for keyword, _, _ in matcher.find(text))
+
+
+def top_intent(matcher, text):
+    ranked = matcher.scores(text)
+    return ranked[0][0] if ranked else None
+
+
+# 서버 키워드 표 회귀 사례: (문장, 기대 의도, None이면 일치하는 키워드가 없어야 함)
+@pytest.mark.parametrize("text, expected", [
+    ("화면이 이상해요", None),  # "이상"은 "이사"가 아님
+    ("이 사진 괜찮아요?", None),  # 어절 경계를 넘는 "이 사"
+    ("이삿짐 옮기고 주소 바꾸려고요", 1),
+    ("주민등본 떼주세요", 0),
+    ("첫 화면으로 가줘", 4),
+    ("첫화면으로 가줘", 4),
+    ("여권을 발급받고 싶어요", 2),
+    ("PASSPORT 재발급", 2),
+    ("직원 좀 불러주세요", 3),
+])
+def test_server_keyword_table(matcher, text, expected):
+    assert top_intent(matcher, text) == expected
+
+
+def test_dataset_sentences_classified_by_keywords(matcher):
+    path = os.path.join(os.path.dirname(__file__), "..", "..", "intent_dataset.csv")
+    if not os.path.exists(path):
+        pytest.skip("intent_dataset.csv 없음")
+    with open(path, encoding="utf-8-sig") as f:
+        rows = list(csv.DictReader(f))
+    wrong = [row["text"] for row in rows if matcher.predict(row["text"])[0] != int(row["intent"])]
+    assert len(wrong) / len(rows) <= 0.01, wrong[:10]
+
+
+def test_overlapping_keywords_are_all_found():
+    matcher = KeywordMatcher({0: ["등본", "주민등록등본", "록등"], 1: ["본인"]})
+    # 한 키워드가 다른 키워드 안에 있거나 서로 겹쳐도 모두 찾음 (실패 링크 출력)
+    assert keywords(matcher, "주민등록등본인가요") == sorted(["등본", "주민등록등본", "록등", "본인"])
+    assert matcher.scores("주민등록등본인가요") == [(0, 3.0), (1, 1.0)]
+
+
+def test_overlapping_keywords_of_one_intent_add_up(matcher):
+    # "되돌아"에는 "되돌"과 "돌아"가 겹쳐 있음
+    assert keywords(matcher, "되돌아가기") == ["돌아", "되돌"]
+    assert matcher.scores("되돌아가기") == [(4, pytest.approx(1.6))]
+
+
+def test_repeated_keyword_counts_once(matcher):
+    assert matcher.scores("등본 등본 등본") == [(0, 1.0)]
+
+
+def test_keyword_does_not_cross_word_boundary():
+    matcher = KeywordMatcher({1: ["이사"]})
+    assert keywords(matcher, "이 사진") == []
+    assert keywords(matcher, "이.사") == []
+    assert keywords(matcher, "이사") == ["이사"]
+
+
+@pytest.mark.parametrize("text", [
+    "이삿짐",  # 사이시옷 (ㅅ)
+    "이산 가요",  # 조사 축약 (ㄴ)
+    "이살 거예요",  # 관형형 어미 (ㄹ)
+    "이삼",  # 명사형 어미 (ㅁ)
+    "이삽니다",  # 합쇼체 (ㅂ)
+    "이샀어요",  # 과거 (ㅆ)
+])
+def test_particle_final_on_last_syllable_matches(text):
+    assert keywords(KeywordMatcher({1: ["이사"]}), text) == ["이사"]
+
+
+@pytest.mark.parametrize("text", ["이상", "이삭", "이삯", "이삵"])
+def test_other_finals_do_not_match(text):
+    assert keywords(KeywordMatcher({1: ["이사"]}), text) == []
+
+
+def test_particle_final_only_applies_to_last_syllable():
+    # 키워드 중간 음절에 받침이 붙으면 다른 단어
+    assert keywords(KeywordMatcher({0: ["여권"]}), "연권") == []
+    assert keywords(KeywordMatcher({0: ["떼"]}), "뗐어요") == ["떼"]
+
+
+def test_search_continues_after_stripped_syllable():
+    # 받침을 뺀 음절로 키워드를 찾은 뒤에도 원래 음절로 이어지는 키워드를 찾음
+    matcher = KeywordMatcher({1: ["이사"], 0: ["삿짐"]})
+    assert keywords(matcher, "이삿짐") == ["삿짐", "이사"]
+
+
+def test_spaced_keyword_matches_joined_text_but_not_split_differently():
+    matcher = KeywordMatcher({4: ["첫 화면"]})
+    assert keywords(matcher, "첫 화면") == ["첫 화면"]
+    assert keywords(matcher, "첫화면") == ["첫 화면"]
+    assert keywords(matcher, "첫화 면") == []
+
+
+def test_normalization():
+    assert normalize_keyword_text("  여권,   발급!! ") == "여권 발급"
+    assert normalize_keyword_text("PassPort") == "passport"
+    # NFD로 분리된 한글도 음절로 합쳐서 비교
+    assert normalize_keyword_text("\u1112\u1161\u11ab") == "한"
+    assert strip_particle_final("삿") == "사"
+    assert strip_particle_final("상") is None
+    assert strip_particle_final("a") is None
+
+
+def test_confidence_scales_with_share_and_strength():
+    matcher = KeywordMatcher({0: {"등본": 1.0, "떼": 0.5}, 1: {"주소": 1.0}},
+                             default_intent=3, default_confidence=0.6, max_confidence=0.9)
+    assert matcher.predict("날씨 좋네요") == (3, 0.6)
+    assert matcher.predict("등본") == (0, pytest.approx(0.9))
+    # 약한 키워드만 나오면 점수 크기만큼 낮아짐
+    assert matcher.predict("떼") == (0, pytest.approx(0.6 + 0.3 * 0.5))
+    # 다른 의도와 나뉘면 점수 비율만큼 낮아짐
+    assert matcher.predict("등본 떼고 주소") == (0, pytest.approx(0.6 + 0.3 * 1.5 / 2.5))
+    # 동점이면 의도 번호가 작은 쪽
+    assert matcher.predict("등본 주소")[0] == 0
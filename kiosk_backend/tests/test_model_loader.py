@@ -0,0 +1,50 @@
+"""Whisper 모델 사본 테스트 (torch 필요)"""
+
+import pytest
+
+from model_loader import share_weights_copy
+
+torch = pytest.importorskip("torch")
+
+
+def build_model():
+    model = torch.nn.Sequential(torch.nn.Linear(8, 8), torch.nn.ReLU(), torch.nn.Linear(8, 4))
+    model.register_buffer("positional_embedding", torch.randn(3, 8))
+    return model.eval()
+
+
+def test_copy_shares_parameter_and_buffer_storage():
+    model = build_model()
+    replica = share_weights_copy(model)
+
+    assert replica is not model
+    for original, copied in zip(model.modules(), replica.modules()):
+        assert copied is not original
+    for original, copied in zip(model.parameters(), replica.parameters()):
+        assert copied is original
+        assert copied.data_ptr() == original.data_ptr()
+    assert replica.positional_embedding.data_ptr() == model.positional_embedding.data_ptr()
+
+
+def test_copy_keeps_forward_hooks_separate():
+    model = build_model()
+    replica = share_weights_copy(model)
+    calls = []
+    replica[0].register_forward_hook(lambda module, inputs, output: calls.append("replica"))
+
+    x = torch.randn(2, 8)
+    with torch.inference_mode():
+        assert torch.equal(model(x), replica(x))
+    assert calls == ["replica"]
+    assert not model[0]._forward_hooks
+
+
+def test_copy_shares_int8_packed_weights():
+    model = torch.ao.quantization.quantize_dynamic(build_model(), {torch.nn.Linear}, dtype=torch.qint8)
+    replica = share_weights_copy(model)
+
+    assert replica[0] is not model[0]
+    assert replica[0]._packed_params is model[0]._packed_params
+    x = torch.randn(2, 8)
+    with torch.inference_mode():
+        assert torch.equal(model(x), replica(x))
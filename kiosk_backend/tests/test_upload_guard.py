@@ -0,0 +1,194 @@
+"""업로드 제한 테스트 (매직 바이트 판별, 수신 중 크기 제한)"""
+
+import asyncio
+
+import numpy as np
+import pytest
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.testclient import TestClient
+
+from audio_utils import encode_wav
+from upload_guard import MULTIPART_OVERHEAD, BodySizeLimitMiddleware, UploadLimits, UploadRejectedError
+
+FORMATS = ["audio/wav", "audio/mp3", "audio/m4a", "audio/ogg", "audio/webm", "audio/flac", "audio/pcm"]
+MAX_BYTES = 256 * 1024
+BOUNDARY = "kiosk-test-boundary"
+
+
+def build_app(formats=FORMATS, max_bytes=MAX_BYTES, max_seconds=2.0):
+    """main.py의 /voice-to-intent와 같은 방식으로 제한을 거는 스텁 앱"""
+    limits = UploadLimits(max_bytes, max_seconds, formats, chunk_size=4096)
+    app = FastAPI()
+    app.add_middleware(BodySizeLimitMiddleware, max_bytes=max_bytes + MULTIPART_OVERHEAD, paths=["/upload"])
+
+    @app.post("/upload")
+    async def upload(audio: UploadFile = File(...)):
+        try:
+            result = await limits.read(audio)
+        except UploadRejectedError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail, headers=e.headers)
+        return {"format": result.format, "bytes": len(result.content), "duration": result.duration}
+
+    return app
+
+
+def wav_bytes(seconds: float) -> bytes:
+    return encode_wav(np.zeros(int(16000 * seconds), dtype=np.float32))
+
+
+def post(client, data: bytes, content_type: str, filename: str = "voice"):
+    return client.post("/upload", files={"audio": (filename, data, content_type)})
+
+
+def multipart_body(data: bytes, content_type: str = "audio/wav") -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="audio"; filename="voice"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode() + data + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+@pytest.mark.parametrize("head, content_type, expected", [
+    (wav_bytes(0.5), "audio/wav", "wav"),
+    (b"fLaC" + bytes(64), "audio/flac", "flac"),
+    (b"OggS" + bytes(64), "audio/ogg", "ogg"),
+    (b"\x1a\x45\xdf\xa3" + bytes(64), "audio/webm", "webm"),
+    (b"\x00\x00\x00\x20ftypM4A " + bytes(64), "audio/mp4", "m4a"),
+    (b"ID3\x04" + bytes(64), "audio/mpeg", "mp3"),
+    (b"\xff\xfb\x90\x00" + bytes(64), "audio/mpeg", "mp3"),
+    # Content-Type이 달라도 내용 기준
+    (wav_bytes(0.5), "audio/ogg", "wav"),
+    (b"OggS" + bytes(64), "audio/opus", "ogg"),
+    # 원시 PCM은 Content-Type으로 판별 (샘플 값이 다른 형식의 시그니처와 같아도)
+    (b"OggS" + bytes(3196), "audio/L16; rate=16000", "pcm"),
+])
+def test_magic_bytes_decide_format(head, content_type, expected):
+    response = post(TestClient(build_app()), head, content_type)
+    assert response.status_code == 200
+    assert response.json()["format"] == expected
+
+
+@pytest.mark.parametrize("data, content_type", [
+    (b"\x89PNG\r\n\x1a\n" + bytes(64), "audio/wav"),
+    (b"<html>not audio</html>", "audio/mpeg"),
+    (bytes(64), "audio/ogg"),
+])
+def test_non_audio_is_rejected_with_accept_header(data, content_type):
+    response = post(TestClient(build_app()), data, content_type)
+    assert response.status_code == 415
+    assert response.headers["accept"] == ", ".join(sorted(FORMATS))
+
+
+def test_format_outside_allow_list_is_rejected():
+    response = post(TestClient(build_app(formats=["audio/wav"])), b"ID3\x04" + bytes(64), "audio/mpeg")
+    assert response.status_code == 415
+    assert response.headers["accept"] == "audio/wav"
+
+
+@pytest.mark.parametrize("content_type", ["audio/L16; rate=4000", "audio/pcm; rate=abc", "audio/pcm; channels=9"])
+def test_unsupported_pcm_parameters_are_rejected(content_type):
+    response = post(TestClient(build_app()), bytes(3200), content_type)
+    assert response.status_code == 415
+
+
+def test_empty_upload_is_rejected():
+    assert post(TestClient(build_app()), b"", "audio/wav").status_code == 415
+
+
+def test_wav_longer_than_limit_is_rejected_from_header():
+    response = post(TestClient(build_app(max_seconds=2.0)), wav_bytes(3.0), "audio/wav")
+    assert response.status_code == 413
+
+
+def test_pcm_longer_than_limit_is_rejected_while_reading():
+    # 16kHz 16bit mono 3초 = 96000바이트 > 2초 한도
+    response = post(TestClient(build_app(max_seconds=2.0)), bytes(96000), "audio/pcm")
+    assert response.status_code == 413
+
+
+def test_file_over_size_limit_is_rejected():
+    response = post(TestClient(build_app(max_bytes=16 * 1024, max_seconds=0)), b"ID3\x04" + bytes(32 * 1024), "audio/mpeg")
+    assert response.status_code == 413
+
+
+def test_chunked_body_over_limit_is_rejected_without_content_length():
+    body = multipart_body(b"ID3\x04" + bytes(MAX_BYTES + MULTIPART_OVERHEAD))
+
+    def chunks():
+        for offset in range(0, len(body), 16 * 1024):
+            yield body[offset:offset + 16 * 1024]
+
+    response = TestClient(build_app(max_seconds=0)).post(
+        "/upload", content=chunks(), headers={"content-type": f"multipart/form-data; boundary={BOUNDARY}"},
+    )
+    assert response.status_code == 413
+
+
+def test_chunked_body_within_limit_is_accepted():
+    body = multipart_body(wav_bytes(1.0))
+
+    def chunks():
+        for offset in range(0, len(body), 4096):
+            yield body[offset:offset + 4096]
+
+    response = TestClient(build_app()).post(
+        "/upload", content=chunks(), headers={"content-type": f"multipart/form-data; boundary={BOUNDARY}"},
+    )
+    assert response.status_code == 200
+    assert response.json()["format"] == "wav"
+
+
+def run_middleware(messages, headers=(), path="/upload", max_bytes=10_000):
+    """스텁 ASGI 앱이 본문을 끝까지 읽도록 하고 (미들웨어가 넘겨준 메시지 수, 발생한 예외) 반환"""
+    consumed = []
+
+    async def stub_app(scope, receive, send):
+        while True:
+            message = await receive()
+            consumed.append(message)
+            if not message.get("more_body"):
+                return
+
+    queue = list(messages)
+
+    async def receive():
+        return queue.pop(0)
+
+    async def send(message):
+        pass
+
+    middleware = BodySizeLimitMiddleware(stub_app, max_bytes=max_bytes, paths=["/upload"])
+    scope = {"type": "http", "path": path, "headers": list(headers)}
+    try:
+        asyncio.run(middleware(scope, receive, send))
+    except HTTPException as e:
+        return consumed, e
+    return consumed, None
+
+
+def body_messages(count: int, size: int):
+    return [
+        {"type": "http.request", "body": bytes(size), "more_body": i < count - 1}
+        for i in range(count)
+    ]
+
+
+def test_middleware_stops_chunked_body_as_soon_as_limit_is_passed():
+    consumed, error = run_middleware(body_messages(10, 4000), max_bytes=10_000)
+    assert error is not None and error.status_code == 413
+    # 3번째 조각에서 한도(10,000)를 넘으므로 나머지는 읽지 않음
+    assert len(consumed) == 2
+
+
+def test_middleware_rejects_declared_content_length_before_reading():
+    consumed, error = run_middleware(body_messages(10, 4000), headers=[(b"content-length", b"40000")])
+    assert error is not None and error.status_code == 413
+    assert consumed == []
+
+
+def test_middleware_passes_body_within_limit_and_other_paths():
+    consumed, error = run_middleware(body_messages(2, 4000))
+    assert error is None and len(consumed) == 2
+
+    consumed, error = run_middleware(body_messages(10, 4000), path="/text-to-intent")
+    assert error is None and len(consumed) == 10
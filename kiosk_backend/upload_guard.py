@@ -0,0 +1,187 @@
+"""
+음성 업로드 제한
+업로드를 작은 조각으로 나누어 읽으며 크기 제한을 넘는 즉시 중단하고,
+첫 조각의 매직 바이트/WAV 헤더로 포맷과 길이를 확인한 뒤에만 나머지를 읽습니다.
+마이크가 눌린 채 몇 분씩 녹음된 파일이 메모리와 음성 인식 슬롯을 차지하지 않도록 합니다.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Set
+
+from fastapi import HTTPException, UploadFile
+
+from audio_utils import (
+    AUDIO_MIME_FORMATS, AudioDecodeError, parse_content_type, parse_flac_streaminfo, parse_ogg_info,
+    parse_pcm_params, parse_wav_header, sniff_audio_format,
+)
+
+logger = logging.getLogger(__name__)
+
+# multipart 경계/헤더 여유분 (요청 본문 제한 = 파일 크기 제한 + 여유분)
+MULTIPART_OVERHEAD = 64 * 1024
+# WAV 헤더(fmt/LIST/data 청크)를 모두 포함할 만큼의 첫 조각 크기
+HEAD_SIZE = 4096
+
+
+class UploadRejectedError(Exception):
+    """업로드가 제한을 넘거나 형식이 맞지 않을 때 발생 (status_code: 413/415, 415는 허용 형식을 Accept 헤더로 알림)"""
+
+    def __init__(self, status_code: int, detail: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.headers = headers
+
+
+@dataclass
+class AudioUpload:
+    """제한을 통과한 업로드"""
+    content: bytes
+    format: str
+    duration: Optional[float] = None  # WAV/FLAC 헤더, Ogg 마지막 페이지, PCM 길이로 계산한 길이(초), 그 외 압축 포맷은 None
+
+
+def allowed_formats(mime_types: Iterable[str]) -> Set[str]:
+    """설정의 MIME 목록 → 허용 포맷 이름 집합"""
+    return {AUDIO_MIME_FORMATS.get(mime.strip().lower(), mime.strip().lower()) for mime in mime_types}
+
+
+class UploadLimits:
+    """업로드 크기/길이/포맷 제한"""
+
+    def __init__(self, max_bytes: int, max_seconds: float, formats: Iterable[str], chunk_size: int = 64 * 1024):
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.mime_types = sorted({mime.strip().lower() for mime in formats if mime.strip()})
+        self.formats = allowed_formats(self.mime_types)
+        self.chunk_size = chunk_size
+
+    def _unsupported(self, detail: str) -> UploadRejectedError:
+        return UploadRejectedError(415, detail, {"Accept": ", ".join(self.mime_types)})
+
+    def check_duration(self, duration: Optional[float]):
+        if duration is not None and self.max_seconds and duration > self.max_seconds:
+            raise UploadRejectedError(413, f"음성이 너무 깁니다 ({duration:.1f}초, 최대 {self.max_seconds:.0f}초)")
+
+    def check_format(self, head: bytes, content_type: Optional[str]) -> str:
+        """매직 바이트로 포맷 판별 (헤더가 없는 원시 PCM은 Content-Type으로 판별)"""
+        mime, _ = parse_content_type(content_type)
+        declared = AUDIO_MIME_FORMATS.get(mime)
+        detected = sniff_audio_format(head)
+        if declared == "pcm" and detected != "wav":
+            # 원시 PCM은 매직 바이트가 없고 샘플 값이 우연히 다른 형식의 시그니처와 같을 수 있음
+            detected = "pcm"
+        if detected is None:
+            raise self._unsupported("지원하지 않는 오디오 형식입니다.")
+        if detected not in self.formats:
+            raise self._unsupported(f"허용되지 않은 오디오 형식입니다: {detected} (허용: {', '.join(sorted(self.formats))})")
+        if detected == "pcm":
+            # 헤더가 없어 ffmpeg로도 처리할 수 없으므로 읽기 전에 파라미터 확인
+            try:
+                parse_pcm_params(parse_content_type(content_type)[1])
+            except AudioDecodeError as e:
+                raise self._unsupported(str(e))
+        if declared is not None and declared != detected:
+            # 브라우저가 Content-Type을 잘못 붙이는 경우가 많으므로 실제 내용을 기준으로 처리
+            logger.debug("Content-Type(%s)과 실제 형식(%s)이 다릅니다.", mime, detected)
+        return detected
+
+    def byte_budget(self, audio_format: str, head: bytes, content_type: Optional[str]) -> tuple:
+        """(최대 읽을 바이트 수, 헤더 기준 길이) — 비압축 포맷은 최대 길이에 해당하는 바이트 수로 더 줄임"""
+        budget = self.max_bytes
+        duration = None
+        if audio_format == "wav":
+            header = parse_wav_header(head)
+            if header is None:
+                raise self._unsupported("WAV 헤더를 읽을 수 없습니다.")
+            duration = header.duration
+            self.check_duration(duration)
+            # 헤더에 길이가 없거나 틀린 경우에도 최대 길이 이상은 읽지 않음
+            if self.max_seconds and header.byte_rate > 0:
+                budget = min(budget, HEAD_SIZE + int(header.byte_rate * self.max_seconds))
+        elif audio_format == "flac":
+            # STREAMINFO의 전체 샘플 수로 나머지를 읽기 전에 길이 확인
+            info = parse_flac_streaminfo(head)
+            duration = info.duration if info is not None else None
+            self.check_duration(duration)
+        elif audio_format == "pcm" and self.max_seconds:
+            rate, channels = parse_pcm_params(parse_content_type(content_type)[1])
+            byte_rate = rate * channels * 2
+            budget = min(budget, int(byte_rate * self.max_seconds))
+        return budget, duration
+
+    async def read(self, upload: UploadFile) -> AudioUpload:
+        """업로드를 조각 단위로 읽으며 제한 확인"""
+        head = await upload.read(HEAD_SIZE)
+        if not head:
+            raise UploadRejectedError(415, "빈 오디오 파일입니다.")
+        audio_format = self.check_format(head, upload.content_type)
+        budget, duration = self.byte_budget(audio_format, head, upload.content_type)
+
+        buffer = bytearray(head)
+        while True:
+            chunk = await upload.read(self.chunk_size)
+            if not chunk:
+                break
+            buffer += chunk
+            if len(buffer) > budget:
+                if budget < self.max_bytes:
+                    raise UploadRejectedError(413, f"음성이 너무 깁니다 (최대 {self.max_seconds:.0f}초)")
+                raise UploadRejectedError(413, f"파일이 너무 큽니다 (최대 {self.max_bytes / (1024 * 1024):.3g}MB)")
+
+        if audio_format == "pcm":
+            rate, channels = parse_pcm_params(parse_content_type(upload.content_type)[1])
+            duration = len(buffer) / (rate * channels * 2)
+        elif audio_format == "ogg":
+            # Ogg는 길이가 마지막 페이지에 있으므로 모두 읽은 뒤 디코딩 전에 확인
+            info = parse_ogg_info(buffer)
+            duration = info.duration if info is not None else None
+            self.check_duration(duration)
+        return AudioUpload(bytes(buffer), audio_format, duration)
+
+
+class BodySizeLimitMiddleware:
+    """지정 경로의 요청 본문이 제한을 넘으면 수신 도중 413으로 중단 (ASGI 미들웨어)
+
+    FastAPI는 핸들러 호출 전에 multipart 본문을 모두 받아 두므로, 그 전에 수신 단계에서 막아야
+    큰 업로드가 메모리/임시 파일을 차지하지 않습니다. Content-Length가 있으면 본문을 읽기 전에 거절합니다.
+    """
+
+    def __init__(self, app, max_bytes: int, paths: Iterable[str]):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = set(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        declared = None
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    pass
+                break
+        received = 0
+        too_large = HTTPException(
+            status_code=413,
+            detail=f"파일이 너무 큽니다 (최대 {(self.max_bytes - MULTIPART_OVERHEAD) / (1024 * 1024):.3g}MB)",
+        )
+
+        async def limited_receive():
+            nonlocal received
+            # 본문 파싱 중 발생한 HTTPException은 FastAPI가 그대로 응답으로 변환
+            if declared is not None and declared > self.max_bytes:
+                raise too_large
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise too_large
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,161 @@
+"""
+음성 구간 검출 (VAD)
+프레임 에너지(RMS) 기반으로 발화 시작/종료를 판단합니다.
+스트리밍 입력에서 어르신이 말을 멈추는 즉시 발화를 잘라내는 데 사용합니다.
+"""
+
+from collections import deque
+from typing import List, Optional
+
+import numpy as np
+
+from audio_utils import SAMPLE_RATE
+
+SPEECH_START = "speech_start"
+SPEECH_END = "speech_end"
+
+
+def frame_rms(audio: np.ndarray, frame_size: int) -> np.ndarray:
+    """고정 길이 프레임별 RMS 에너지 (마지막 불완전 프레임은 제외)"""
+    n_frames = len(audio) // frame_size
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[:n_frames * frame_size].reshape(n_frames, frame_size)
+    return np.sqrt(np.mean(frames.astype(np.float32) ** 2, axis=1))
+
+
+class EnergyEndpointer:
+    """에너지 기반 발화 끝점 검출기
+
+    push()로 PCM 조각을 넣으면 발화 시작/종료 이벤트를 반환합니다.
+    배경 소음 수준을 추적하여 임계값을 자동으로 올립니다.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        frame_ms: int = 30,
+        threshold: float = 0.01,
+        noise_ratio: float = 3.0,
+        start_ms: int = 90,
+        end_silence_ms: int = 700,
+        pre_roll_ms: int = 300,
+        max_utterance_s: float = 15.0,
+    ):
+        self.sample_rate = sample_rate
+        self.frame_size = int(sample_rate * frame_ms / 1000)
+        self.threshold = threshold
+        self.noise_ratio = noise_ratio
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.end_frames = max(1, end_silence_ms // frame_ms)
+        self.max_frames = max(1, int(max_utterance_s * 1000 // frame_ms))
+        self._pre_roll = deque(maxlen=max(self.start_frames, pre_roll_ms // frame_ms))
+        self._remainder = np.zeros(0, dtype=np.float32)
+        self._noise_floor: Optional[float] = None
+        self.reset()
+
+    def reset(self):
+        """발화 상태 초기화 (배경 소음 추정치는 유지)"""
+        self.in_speech = False
+        self._frames: List[np.ndarray] = []
+        self._voiced_run = 0
+        self._silence_run = 0
+        self._pre_roll.clear()
+
+    @property
+    def utterance_samples(self) -> int:
+        """현재 발화에 모인 샘플 수"""
+        return len(self._frames) * self.frame_size
+
+    def utterance(self) -> np.ndarray:
+        """현재까지 모인 발화 오디오"""
+        if not self._frames:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(self._frames)
+
+    def pop_utterance(self) -> np.ndarray:
+        """발화 오디오를 꺼내고 다음 발화를 기다리는 상태로 초기화"""
+        audio = self.utterance()
+        self.reset()
+        return audio
+
+    def _is_voiced(self, rms: float) -> bool:
+        floor = self._noise_floor if self._noise_floor is not None else 0.0
+        return rms >= max(self.threshold, floor * self.noise_ratio)
+
+    def _update_noise_floor(self, rms: float):
+        if self._noise_floor is None:
+            self._noise_floor = rms
+        else:
+            self._noise_floor = 0.95 * self._noise_floor + 0.05 * rms
+
+    def push(self, samples: np.ndarray) -> List[str]:
+        """PCM 조각(float32)을 넣고 발생한 이벤트 목록을 반환"""
+        events: List[str] = []
+        audio = np.concatenate([self._remainder, samples.astype(np.float32, copy=False)])
+        n_frames = len(audio) // self.frame_size
+        self._remainder = audio[n_frames * self.frame_size:]
+
+        energies = frame_rms(audio, self.frame_size)
+        for i, rms in enumerate(energies):
+            frame = audio[i * self.frame_size:(i + 1) * self.frame_size]
+            voiced = self._is_voiced(float(rms))
+
+            if not self.in_speech:
+                self._pre_roll.append(frame)
+                if voiced:
+                    self._voiced_run += 1
+                else:
+                    self._voiced_run = 0
+                    self._update_noise_floor(float(rms))
+                if self._voiced_run >= self.start_frames:
+                    # 발화 시작: 직전 프리롤부터 포함하여 첫 음절이 잘리지 않도록 함
+                    self.in_speech = True
+                    self._frames = list(self._pre_roll)
+                    self._pre_roll.clear()
+                    self._silence_run = 0
+                    events.append(SPEECH_START)
+                continue
+
+            self._frames.append(frame)
+            self._silence_run = 0 if voiced else self._silence_run + 1
+            if self._silence_run >= self.end_frames or len(self._frames) >= self.max_frames:
+                events.append(SPEECH_END)
+                self.in_speech = False
+                self._voiced_run = 0
+                # 종료 이후 샘플은 pop_utterance() 뒤 다음 push에서 이어서 처리
+                self._remainder = audio[(i + 1) * self.frame_size:]
+                break
+
+        return events
+
+
+def trim_silence(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    frame_ms: int = 30,
+    threshold: float = 0.01,
+    noise_ratio: float = 3.0,
+    min_speech_ms: int = 90,
+    pad_ms: int = 200,
+) -> np.ndarray:
+    """앞뒤 무음을 잘라낸 오디오 반환, 발화가 없으면 빈 배열
+
+    배경 소음 수준은 프레임 에너지의 하위 10% 값으로 추정하고,
+    무음 구간 없이 계속 말하는 경우를 위해 최대 에너지의 절반을 넘지 않도록 합니다.
+    """
+    frame_size = int(sample_rate * frame_ms / 1000)
+    energies = frame_rms(audio, frame_size)
+    if len(energies) == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    noise_floor = float(np.percentile(energies, 10))
+    adaptive = min(noise_floor * noise_ratio, float(energies.max()) * 0.5)
+    voiced = np.flatnonzero(energies >= max(threshold, adaptive))
+    if len(voiced) * frame_ms < min_speech_ms:
+        return np.zeros(0, dtype=np.float32)
+
+    pad = int(sample_rate * pad_ms / 1000)
+    start = max(0, voiced[0] * frame_size - pad)
+    end = min(len(audio), (voiced[-1] + 1) * frame_size + pad)
+    return audio[start:end]
@@ -0,0 +1,110 @@
+"""
+Whisper 단계적 재인식
+작은 모델(tiny)로 먼저 인식하고, 인식 품질이 낮을 때만 더 큰 모델로 다시 인식합니다.
+품질은 Whisper의 평균 로그 확률/무음 확률과 인식된 문장의 의도 분류 신뢰도로 판단합니다.
+"""
+
+import threading
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+# 재인식 사유
+LOW_LOGPROB = "low_avg_logprob"
+HIGH_NO_SPEECH = "high_no_speech_prob"
+LOW_INTENT_CONFIDENCE = "low_intent_confidence"
+EMPTY_TEXT = "empty_text"
+
+
+@dataclass
+class Transcription:
+    """인식 결과와 Whisper 디코딩 품질 지표"""
+    text: str
+    avg_logprob: Optional[float] = None
+    no_speech_prob: Optional[float] = None
+    model_size: Optional[str] = None
+
+
+class EscalationPolicy:
+    """재인식 여부 판단 (기준 중 하나라도 벗어나면 재인식)"""
+
+    def __init__(self, min_avg_logprob: float = -0.8, max_no_speech_prob: float = 0.6,
+                 min_intent_confidence: float = 0.5):
+        self.min_avg_logprob = min_avg_logprob
+        self.max_no_speech_prob = max_no_speech_prob
+        self.min_intent_confidence = min_intent_confidence
+
+    def check(self, transcription: Transcription, intent_confidence: Optional[float]) -> Optional[str]:
+        """재인식 사유 반환, 필요 없으면 None"""
+        if not transcription.text:
+            return EMPTY_TEXT
+        if transcription.avg_logprob is not None and transcription.avg_logprob < self.min_avg_logprob:
+            return LOW_LOGPROB
+        if transcription.no_speech_prob is not None and transcription.no_speech_prob > self.max_no_speech_prob:
+            return HIGH_NO_SPEECH
+        if intent_confidence is not None and intent_confidence < self.min_intent_confidence:
+            return LOW_INTENT_CONFIDENCE
+        return None
+
+    def to_dict(self) -> dict:
+        return {
+            "min_avg_logprob": self.min_avg_logprob,
+            "max_no_speech_prob": self.max_no_speech_prob,
+            "min_intent_confidence": self.min_intent_confidence,
+        }
+
+
+class EscalationStats:
+    """재인식 비율, 사유, 추가 지연 시간"""
+
+    def __init__(self, window: int = 2048):
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.escalated = 0
+        self.text_changed = 0
+        self.failed = 0  # 대기열이 가득 차 재인식하지 못한 경우 (작은 모델 결과 사용)
+        self.total_extra_ms = 0.0
+        self.reasons: Counter = Counter()
+        self._extra_ms = deque(maxlen=window)
+
+    def record_check(self):
+        with self._lock:
+            self.checked += 1
+
+    def record_escalation(self, reason: str, extra_ms: float, text_changed: bool):
+        with self._lock:
+            self.escalated += 1
+            self.text_changed += int(text_changed)
+            self.reasons[reason] += 1
+            self.total_extra_ms += extra_ms
+            self._extra_ms.append(extra_ms)
+
+    def record_failure(self, reason: str):
+        with self._lock:
+            self.failed += 1
+            self.reasons[reason] += 1
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            extra = np.fromiter(self._extra_ms, dtype=np.float64, count=len(self._extra_ms))
+            checked, escalated = self.checked, self.escalated
+            result = {
+                "checked": checked,
+                "escalated": escalated,
+                "escalation_rate": round(escalated / checked, 4) if checked else 0.0,
+                "text_changed": self.text_changed,
+                "failed": self.failed,
+                "reasons": dict(self.reasons),
+                # 전체 요청 기준 평균 추가 비용
+                "avg_extra_ms_per_request": round(self.total_extra_ms / checked, 1) if checked else 0.0,
+            }
+        if len(extra):
+            p50, p95 = np.percentile(extra, [50, 95])
+            result["extra_latency_ms"] = {
+                "avg": round(float(extra.mean()), 1),
+                "p50": round(float(p50), 1),
+                "p95": round(float(p95), 1),
+            }
+        return result